@@ -0,0 +1,66 @@
+"""Serveur local qui sert des réponses synthétiques de l'API de recherche (transport "api").
+
+Répond à `POST /api/fr/search/<tool_id>` avec la page demandée (`page`, `pageSize` du corps JSON)
+d'une réponse de `fixtures/api_search_<n>.json`, sans authentification :
+
+    python -m benchmarks.api_stub --size 50 --port 8765
+    SEARCH_API_URL=http://127.0.0.1:8765/api/fr/search/{tool_id} PARSER_TRANSPORT=api ...
+
+Les requêtes reçues sont affichées pour vérifier le corps envoyé par le Parser.
+"""
+import argparse
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+SEARCH_PATH = re.compile(r"^/api/fr/search/(\d+)$")
+
+
+def make_handler(response: dict) -> type:
+    items = response["results"]["items"]
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            if not SEARCH_PATH.match(self.path):
+                self.send_error(404)
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                page, page_size = int(body.get("page", 1)), int(body.get("pageSize", 24))
+            except ValueError:
+                self.send_error(400, "Corps JSON invalide")
+                return
+
+            start = (page - 1) * page_size
+            payload = json.dumps({"results": {"items": items[start:start + page_size], "total": response["results"]["total"]}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return StubHandler
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description="Sert des réponses synthétiques de l'API de recherche CROUS")
+    arg_parser.add_argument("--size", type=int, default=50, help="Réponse fixtures/api_search_<size>.json à servir")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    args = arg_parser.parse_args()
+
+    response = json.loads((FIXTURES_DIR / f"api_search_{args.size}.json").read_text(encoding="utf-8"))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(response))
+    print(f"API de recherche simulée sur http://{args.host}:{args.port}/api/fr/search/<tool_id> ({args.size} logements)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
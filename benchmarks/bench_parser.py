@@ -0,0 +1,280 @@
+"""Benchmarks hors-ligne du Parser et du NotificationBuilder sur les pages synthétiques de `fixtures/`.
+
+Mesure pour chaque cas le débit, les percentiles de latence et le pic mémoire (tracemalloc),
+puis compare la latence médiane et le pic mémoire à `baseline.json`. La latence est comparée
+en multiple d'une charge de calibration (bibliothèque standard seule) exécutée en alternance
+avec le cas : la vitesse de la machine et ses variations de charge s'annulent, une baseline
+enregistrée ailleurs reste valable.
+
+    python -m benchmarks.bench_parser                     # exécute et compare à la baseline
+    python -m benchmarks.bench_parser --update-baseline   # enregistre les résultats comme nouvelle baseline
+    python -m benchmarks.bench_parser --backend lxml --no-restrict
+    python -m benchmarks.bench_parser --strict            # les latences aussi font échouer
+
+Le code de sortie vaut 1 si le parsing d'une page ne donne plus le résultat attendu (balisage
+CROUS modifié) ou si un pic mémoire dépasse la tolérance. Même rapportées à la calibration,
+les latences varient d'une machine virtuelle à l'autre : leurs régressions sont affichées,
+et ne font échouer qu'avec --strict.
+"""
+import argparse
+import html.parser
+import json
+import logging
+import statistics
+import sys
+import tracemalloc
+from dataclasses import dataclass, asdict
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+from src.api_parser import accommodation_from_api
+from src.models import Accommodation, SearchResults
+from src.notification_builder import NotificationBuilder
+from src.parser import Parser, SEARCH_RESULTS_ONLY, _is_accommodation_card, probe_search_page
+
+BENCH_DIR = Path(__file__).parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+BASELINE_FILE = BENCH_DIR / "baseline.json"
+
+SEARCH_SIZES = (0, 1, 50, 500)
+GALLERY_SIZES = (3, 30)
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    items: int  # éléments traités par itération (cartes, photos, notifications)
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    ops_per_s: float
+    items_per_s: float
+    peak_kib: float
+    relative: Optional[float] = None  # p50 / p50 de la calibration alternée avec le cas
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _calibration_workload() -> Callable[[], object]:
+    """Travail de référence indépendant du code du projet : tokenisation HTML en Python pur."""
+    page = _fixture("search_1.html")
+    return lambda: html.parser.HTMLParser().feed(page)
+
+
+def run_case(
+    name: str,
+    func: Callable[[], object],
+    items: int,
+    min_time: float,
+    max_iterations: int,
+    calibration: Optional[Callable[[], object]] = None,
+) -> BenchResult:
+    func()  # échauffement
+
+    durations: List[float] = []
+    calibration_durations: List[float] = []
+    total = 0.0
+    while (total < min_time or len(durations) < 5) and len(durations) < max_iterations:
+        start = perf_counter()
+        func()
+        elapsed = perf_counter() - start
+        durations.append(elapsed)
+        total += elapsed
+        if calibration is not None:
+            # Juste après le cas : même charge de la machine au même instant
+            start = perf_counter()
+            calibration()
+            calibration_durations.append(perf_counter() - start)
+
+    # Pic mémoire mesuré à part : tracemalloc ralentit fortement l'exécution
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    durations.sort()
+    mean = statistics.fmean(durations)
+    relative = _percentile(durations, 50) / statistics.median(calibration_durations) if calibration_durations else None
+    return BenchResult(
+        name=name,
+        iterations=len(durations),
+        items=items,
+        mean_ms=mean * 1000,
+        p50_ms=_percentile(durations, 50) * 1000,
+        p95_ms=_percentile(durations, 95) * 1000,
+        p99_ms=_percentile(durations, 99) * 1000,
+        ops_per_s=1 / mean if mean else 0.0,
+        items_per_s=items / mean if mean else 0.0,
+        peak_kib=peak / 1024,
+        relative=relative,
+    )
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def _sample_accommodations(count: int, images: int) -> List[Accommodation]:
+    return [
+        Accommodation(
+            id=1000 + i,
+            title=f"Résidence Moulin à Vent - Studio {i}",
+            price=350.5,
+            overview_details="12 Avenue Paul Alduy 66000 Perpignan\nIndividuel\nStudio 18 m²",
+            image_url=f"https://trouverunlogement.lescrous.fr/photos/{1000 + i}/preview.jpg",
+            all_images=[f"https://trouverunlogement.lescrous.fr/photos/{1000 + i}/{k}.jpg" for k in range(images)],
+            detail_url=f"https://trouverunlogement.lescrous.fr/tools/32/accommodations/{1000 + i}",
+        )
+        for i in range(count)
+    ]
+
+
+def run_all(parser: Parser, min_time: float, max_iterations: int) -> tuple[List[BenchResult], List[str]]:
+    results: List[BenchResult] = []
+    errors: List[str] = []
+    measure = partial(run_case, calibration=_calibration_workload())
+
+    for size in SEARCH_SIZES:
+        html = _fixture(f"search_{size}.html")
+        soup = parser._make_soup(html, SEARCH_RESULTS_ONLY)
+
+        # Vérifier que le parsing donne toujours le résultat attendu
+        count = parser._get_accommodations_count(soup)
+        parsed = parser._parse_accommodations(soup)
+        if count != size or len(parsed) != size:
+            errors.append(f"search_{size}: nombre attendu {size}, titre={count}, cartes={len(parsed)}")
+
+        results.append(measure(f"search_page[{size}]", lambda: parser._parse_accommodations(parser._make_soup(html, SEARCH_RESULTS_ONLY)), size, min_time, max_iterations))
+        results.append(measure(f"_parse_accommodations[{size}]", lambda: parser._parse_accommodations(soup), size, min_time, max_iterations))
+        results.append(measure(f"_get_accommodations_count[{size}]", lambda: parser._get_accommodations_count(soup), 1, min_time, max_iterations))
+
+        # La sonde doit voir le même nombre et toutes les cartes, sinon aucun cycle ne serait jamais sauté
+        probe = probe_search_page(html)
+        if probe.count != size or probe.ids_hash is None:
+            errors.append(f"search_{size}: sonde incomplète (titre={probe.count}, hash={probe.ids_hash})")
+        results.append(measure(f"probe_search_page[{size}]", lambda: probe_search_page(html), size, min_time, max_iterations))
+
+    main_list = parser._make_soup(_fixture("search_50.html"), SEARCH_RESULTS_ONLY).find("ul", class_="fr-grid-row fr-grid-row--gutters svelte-11sc5my")
+    card = main_list.find("li", class_=_is_accommodation_card)
+    results.append(measure("_parse_accommodation_card", lambda: parser._parse_accommodation_card(card), 1, min_time, max_iterations))
+
+    for images in GALLERY_SIZES:
+        html = _fixture(f"detail_gallery_{images}.html")
+        expected = min(images, 10)
+        if len(parser._parse_accommodation_images(html)) != expected:
+            errors.append(f"detail_gallery_{images}: {expected} photos attendues")
+        results.append(measure(f"_parse_accommodation_images[{images}]", lambda: parser._parse_accommodation_images(html), expected, min_time, max_iterations))
+
+    html = _fixture("detail_no_slider.html")
+    if len(parser._parse_accommodation_images(html)) != 5:
+        errors.append("detail_no_slider: 5 photos attendues via le fallback")
+    results.append(measure("_parse_accommodation_images[fallback]", lambda: parser._parse_accommodation_images(html), 5, min_time, max_iterations))
+
+    # Transport "api" : conversion du JSON en modèles, sans HTML
+    items = json.loads(_fixture("api_search_50.json"))["results"]["items"]
+    converted = [accommodation_from_api(item, "32") for item in items]
+    if len(converted) != 50 or any(acc is None or acc.latitude is None or not acc.all_images for acc in converted):
+        errors.append("api_search_50: 50 logements avec coordonnées et photos attendus")
+    results.append(measure("accommodation_from_api[50]", lambda: [accommodation_from_api(item, "32") for item in items], 50, min_time, max_iterations))
+
+    builder = NotificationBuilder()
+    for size in (1, 50, 500):
+        search_results = SearchResults(
+            search_url="https://trouverunlogement.lescrous.fr/tools/32/search",
+            count=size,
+            accommodations=_sample_accommodations(size, images=10),
+        )
+        results.append(measure(f"search_results_notification[{size}]", lambda: builder.search_results_notification(search_results), size, min_time, max_iterations))
+
+    return results, errors
+
+
+def compare(results: List[BenchResult], baseline: Dict[str, dict], tolerance: float) -> tuple[List[str], List[str]]:
+    """Retourne (régressions de latence, régressions mémoire)."""
+    slower, regressions = [], []
+    for result in results:
+        reference = baseline.get(result.name)
+        if not reference:
+            continue
+        if result.relative is not None and reference.get("relative"):
+            # Latence en multiples de la calibration : indépendante de la machine
+            if result.relative > reference["relative"] * (1 + tolerance):
+                slower.append(f"{result.name}: p50 {result.relative:.3f}x calibration > baseline {reference['relative']:.3f}x")
+        elif result.p50_ms > reference["p50_ms"] * (1 + tolerance):
+            slower.append(f"{result.name}: p50 {result.p50_ms:.3f}ms > baseline {reference['p50_ms']:.3f}ms")
+        if result.peak_kib > reference["peak_kib"] * (1 + tolerance):
+            regressions.append(f"{result.name}: pic mémoire {result.peak_kib:.0f}KiB > baseline {reference['peak_kib']:.0f}KiB")
+    return slower, regressions
+
+
+def _baseline_entry(result: BenchResult) -> dict:
+    entry = {"p50_ms": round(result.p50_ms, 4), "peak_kib": round(result.peak_kib, 1)}
+    if result.relative is not None:
+        entry["relative"] = round(result.relative, 4)
+    return entry
+
+
+def print_table(results: List[BenchResult], baseline: Dict[str, dict]) -> None:
+    header = f"{'cas':<42}{'iter':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'items/s':>12}{'pic KiB':>10}{'vs base':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        reference = baseline.get(r.name)
+        if reference and r.relative is not None and reference.get("relative"):
+            delta = f"{(r.relative / reference['relative'] - 1) * 100:+.0f}%"
+        else:
+            delta = f"{(r.p50_ms / reference['p50_ms'] - 1) * 100:+.0f}%" if reference and reference["p50_ms"] else "-"
+        print(f"{r.name:<42}{r.iterations:>6}{r.p50_ms:>10.3f}{r.p95_ms:>10.3f}{r.p99_ms:>10.3f}{r.items_per_s:>12.0f}{r.peak_kib:>10.0f}{delta:>9}")
+
+
+def main() -> int:
+    arg_parser = argparse.ArgumentParser(description="Benchmarks hors-ligne du parser CROUS")
+    arg_parser.add_argument("--backend", default="html.parser", help="Backend BeautifulSoup (html.parser, lxml)")
+    arg_parser.add_argument("--no-restrict", action="store_true", help="Parser la page complète (sans SoupStrainer)")
+    arg_parser.add_argument("--min-time", type=float, default=0.5, help="Durée minimale de mesure par cas (s)")
+    arg_parser.add_argument("--max-iterations", type=int, default=2000)
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="Régression tolérée par rapport à la baseline")
+    arg_parser.add_argument("--strict", action="store_true", help="Échouer aussi sur une régression de latence")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="Enregistrer les résultats comme baseline")
+    arg_parser.add_argument("--json", type=Path, help="Écrire aussi les résultats bruts dans ce fichier")
+    args = arg_parser.parse_args()
+
+    # Les logs par carte fausseraient les mesures
+    logging.basicConfig(level=logging.ERROR)
+
+    parser = Parser(None, parser_backend=args.backend, restrict_parsing=not args.no_restrict)
+    results, errors = run_all(parser, args.min_time, args.max_iterations)
+
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    print_table(results, baseline)
+
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2))
+
+    if args.update_baseline:
+        BASELINE_FILE.write_text(json.dumps({r.name: _baseline_entry(r) for r in results}, indent=2) + "\n")
+        print(f"\nBaseline mise à jour : {BASELINE_FILE}")
+
+    for error in errors:
+        print(f"❌ {error}")
+
+    slower, regressions = ([], []) if args.update_baseline else compare(results, baseline, args.tolerance)
+    for regression in slower:
+        print(f"{'📉' if args.strict else '⚠️'} {regression}")
+    for regression in regressions:
+        print(f"📉 {regression}")
+
+    if args.strict:
+        regressions += slower
+    return 1 if errors or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
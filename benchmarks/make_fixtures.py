@@ -0,0 +1,184 @@
+"""Génère les pages HTML de test (résultats de recherche et pages détaillées) utilisées par les benchmarks.
+
+Les gabarits reprennent le balisage relevé sur trouverunlogement.lescrous.fr (classes DSFR +
+classes Svelte hachées), entouré de l'en-tête, du pied de page et des scripts de l'application
+pour que le coût de parsing reste réaliste. Les réponses de l'API de recherche (api_search_*.json)
+reprennent la structure du JSON reçu par l'application et sont servies par `benchmarks.api_stub`.
+La génération est déterministe.
+
+    python -m benchmarks.make_fixtures
+"""
+import json
+import random
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+SEARCH_SIZES = (0, 1, 50, 500)
+GALLERY_SIZES = (3, 30)
+API_SEARCH_SIZES = (0, 1, 50)
+
+RESIDENCES = ["Résidence Moulin à Vent", "Résidence Château Roussillon", "Résidence Le Ponant", "Résidence Saint-Jean"]
+STREETS = ["Avenue Paul Alduy", "Rue Émile Zola", "Boulevard Kennedy", "Chemin de la Passio Vella"]
+TYPES = ["Individuel", "Colocation", "Couple"]
+KINDS = [("Chambre", 9), ("Studio", 18), ("T1", 21), ("T1 bis", 27), ("T2", 38)]
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="fr" data-fr-theme="light">
+<head>
+<meta charset="utf-8">
+<title>Trouver un logement - Crous</title>
+<link rel="stylesheet" href="/_app/immutable/assets/dsfr.min.css">
+<script type="module">import("/_app/immutable/entry/start.js").then(m => m.start());</script>
+</head>
+<body>
+<header role="banner" class="fr-header">
+<div class="fr-header__body"><div class="fr-container"><div class="fr-header__body-row">
+<div class="fr-header__brand fr-enlarge-link"><p class="fr-logo">Crous</p></div>
+<div class="fr-header__tools"><ul class="fr-btns-group">
+<li><a class="fr-btn fr-icon-account-line" href="/mse/account">Mon compte</a></li>
+<li><a class="fr-btn fr-icon-logout-box-r-line" href="/mse/logout">Se déconnecter</a></li>
+</ul></div></div></div></div>
+<nav class="fr-nav" role="navigation"><ul class="fr-nav__list">
+<li class="fr-nav__item"><a class="fr-nav__link" href="/tools/32/search">Rechercher</a></li>
+<li class="fr-nav__item"><a class="fr-nav__link" href="/tools/32/favorites">Mes favoris</a></li>
+</ul></nav>
+</header>
+<main id="main" role="main">
+"""
+
+PAGE_FOOT = """
+</main>
+<footer class="fr-footer" role="contentinfo"><div class="fr-container">
+<ul class="fr-footer__content-list">
+<li class="fr-footer__content-item"><a class="fr-footer__content-link" href="https://www.etudiant.gouv.fr">etudiant.gouv.fr</a></li>
+<li class="fr-footer__content-item"><a class="fr-footer__content-link" href="https://www.service-public.fr">service-public.fr</a></li>
+</ul></div></footer>
+<script>window.__data = {"tool": 32, "locale": "fr", "features": ["map", "favorites"]};</script>
+</body>
+</html>
+"""
+
+CARD = """<li class="fr-col-12 fr-col-sm-6 fr-col-md-4 svelte-11sc5my">
+<div class="fr-card fr-enlarge-link fr-card--horizontal-tier svelte-12dfls6">
+<div class="fr-card__body"><div class="fr-card__content">
+<h3 class="fr-card__title"><a href="/tools/32/accommodations/{id}">{title}</a></h3>
+<p class="fr-card__desc">{address}</p>
+<div class="fr-card__start"><ul class="fr-badges-group"><li><p class="fr-badge">{price}</p></li></ul></div>
+<div class="fr-card__end">
+<p class="fr-card__detail fr-icon-user-line">{type}</p>
+<p class="fr-card__detail fr-icon-ruler-line">{kind} <span>{surface} m²</span></p>
+</div>
+</div></div>
+<div class="fr-card__header"><div class="fr-card__img">
+<img class="fr-responsive-img" src="https://trouverunlogement.lescrous.fr/photos/{id}/preview.jpg" alt="{title}">
+</div></div>
+</div>
+</li>
+"""
+
+
+def _card(rng: random.Random, accommodation_id: int) -> str:
+    kind, surface = rng.choice(KINDS)
+    # Quelques prix non numériques pour couvrir le fallback texte du parser
+    price = "Non communiqué" if rng.random() < 0.05 else f"{rng.randint(200, 650)},{rng.choice(['00', '50', '80'])} €"
+    return CARD.format(
+        id=accommodation_id,
+        title=f"{rng.choice(RESIDENCES)} - {kind}",
+        address=f"{rng.randint(1, 120)} {rng.choice(STREETS)} 66000 Perpignan",
+        price=price,
+        type=rng.choice(TYPES),
+        kind=kind,
+        surface=surface + rng.randint(0, 4),
+    )
+
+
+def search_page(count: int, seed: int = 32) -> str:
+    rng = random.Random(seed + count)
+    ids = rng.sample(range(100, 9999), count)
+    heading = "Aucun logement trouvé" if count == 0 else f"{count} logement{'s' if count > 1 else ''} trouvé{'s' if count > 1 else ''}"
+    cards = "".join(_card(rng, accommodation_id) for accommodation_id in ids)
+    return (
+        PAGE_HEAD
+        + '<div class="fr-container svelte-11sc5my">\n'
+        + f'<h2 class="SearchResults-desktop fr-h4 svelte-11sc5my">{heading}</h2>\n'
+        + '<h2 class="SearchResults-mobile fr-h4 svelte-11sc5my">' + heading + "</h2>\n"
+        + f'<ul class="fr-grid-row fr-grid-row--gutters svelte-11sc5my">\n{cards}</ul>\n'
+        + '<nav class="fr-pagination" aria-label="Pagination"><ul class="fr-pagination__list">'
+        + '<li><a class="fr-pagination__link" aria-current="page" href="?page=1">1</a></li></ul></nav>\n'
+        + "</div>"
+        + PAGE_FOOT
+    )
+
+
+def api_search_response(count: int, seed: int = 32) -> dict:
+    """Tous les logements d'une recherche, au format de l'API (l'api_stub découpe en pages)"""
+    rng = random.Random(seed + count)
+    items = []
+    for accommodation_id in rng.sample(range(100, 9999), count):
+        kind, surface = rng.choice(KINDS)
+        residence = rng.choice(RESIDENCES)
+        modes = rng.sample(["alone", "couple", "house_sharing"], rng.randint(1, 2))
+        items.append({
+            "id": accommodation_id,
+            "label": kind,
+            "residence": {
+                "id": RESIDENCES.index(residence) + 1,
+                "label": residence,
+                "address": f"{rng.randint(1, 120)} {rng.choice(STREETS)} 66000 Perpignan",
+                "location": {"lat": round(rng.uniform(42.65, 42.74), 6), "lon": round(rng.uniform(2.83, 2.98), 6)},
+            },
+            "area": {"min": surface + rng.randint(0, 4), "max": surface + 4},
+            "occupationModes": [{"type": mode, "rent": {"min": rng.randint(200, 650) * 100, "max": 70000}} for mode in modes],
+            "medias": [{"src": f"/photos/{accommodation_id}/{index}.jpg"} for index in range(rng.randint(1, 12))],
+            "available": True,
+        })
+    return {"results": {"items": items, "total": {"value": count}}}
+
+
+def detail_page(images: int, with_slider: bool = True) -> str:
+    slides = "".join(
+        '<li class="svelte-i1xb97"><img class="fr-responsive-img fr-ratio-16x9 svelte-y6vkg0" '
+        f'src="https://trouverunlogement.lescrous.fr/photos/4242/{index}.jpg" alt="Photo {index + 1}"></li>\n'
+        for index in range(images)
+    )
+    if with_slider:
+        gallery = (
+            '<section class="Slider svelte-i1xb97">\n'
+            f'<ul class="Slider-slides scrollbar-hidden svelte-i1xb97">\n{slides}</ul>\n'
+            '<button class="fr-btn fr-icon-arrow-left-line svelte-i1xb97">Précédente</button>\n'
+            '<button class="fr-btn fr-icon-arrow-right-line svelte-i1xb97">Suivante</button>\n'
+            "</section>\n"
+        )
+    else:
+        gallery = "".join(
+            f'<img src="https://trouverunlogement.lescrous.fr/preview/Résidence_{index}.jpg" alt="">\n'
+            for index in range(images)
+        )
+    return (
+        PAGE_HEAD
+        + '<div class="fr-container svelte-1kx5pq2">\n'
+        + '<h1 class="fr-h2">Résidence Moulin à Vent - Studio</h1>\n'
+        + gallery
+        + '<section class="fr-accordion"><h3 class="fr-accordion__title">Équipements</h3>'
+        + '<ul><li>Kitchenette</li><li>Salle d\'eau</li><li>Wifi</li><li>Laverie</li></ul></section>\n'
+        + '<section class="fr-accordion"><h3 class="fr-accordion__title">Loyer</h3><p>De 320 € à 410 €</p></section>\n'
+        + "</div>"
+        + PAGE_FOOT
+    )
+
+
+def main() -> None:
+    FIXTURES_DIR.mkdir(exist_ok=True)
+    for count in SEARCH_SIZES:
+        (FIXTURES_DIR / f"search_{count}.html").write_text(search_page(count), encoding="utf-8")
+    for images in GALLERY_SIZES:
+        (FIXTURES_DIR / f"detail_gallery_{images}.html").write_text(detail_page(images), encoding="utf-8")
+    (FIXTURES_DIR / "detail_no_slider.html").write_text(detail_page(5, with_slider=False), encoding="utf-8")
+    for count in API_SEARCH_SIZES:
+        (FIXTURES_DIR / f"api_search_{count}.json").write_text(json.dumps(api_search_response(count), ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"Fixtures écrites dans {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
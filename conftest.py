@@ -0,0 +1 @@
+# Racine du dépôt : rend le paquet `src` importable depuis tests/ avec un simple `pytest`
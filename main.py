@@ -1,27 +1,45 @@
+# En premier : avec --startup-profile, l'import de src.startup installe le chronométrage des imports suivants
+from src.startup import startup_profile
+
+import sys
 import argparse
 import logging
 import time
-import json
+from time import perf_counter
 import os
 import random
 import tempfile
 import uuid
 import shutil
-import sys
-from typing import List, Set
-
-import telepot
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, ContextManager, List
 
-from src.authenticator import Authenticator, AuthenticationError
+# selenium, webdriver_manager et telepot sont importés à la première utilisation :
+# démarrage plus rapide, et --help ou une configuration invalide ne les chargent pas
+from src.api_parser import ApiParser
+from src.card_diff import diff_cards
+from src.detail_cache import DetailCache
+from src.driver_manager import DriverManager, resolve_chromedriver, tmpfs_profile_root
+from src.exceptions import AuthenticationError
+from src.file_id_cache import FileIdCache
+from src.metrics import AREA_SECONDS, CYCLE_SECONDS, LAST_CYCLE_TIMESTAMP, REGISTRY, SEEN_IDS, UNCHANGED_AREAS
+from src.fetchers import DriverFetcher, HttpFetcher, PageFetcher, SearchApiFetcher
+from src.history import SnapshotHistory, print_listings_report
 from src.parser import Parser
-from src.models import UserConf, Notification, SearchResults
+from src.resource_blocker import ResourceBlocker, blocked_url_patterns
+from src.models import Accommodation, UserConf, UserFilters, Notification, SearchResults
 from src.notification_builder import NotificationBuilder
-from src.settings import Settings
-from src.telegram_notifier import TelegramNotifier
+from src.session_store import SessionStore
+from src.scheduler import AdaptiveScheduler
+from src.search_planner import SearchPlanner
+from src.settings import Settings, get_settings
+from src.storage import StateStore
+from src.user_filters import FilterIndex
+
+if TYPE_CHECKING:
+    import telepot
+    from selenium import webdriver
+    from src.telegram_dispatcher import TelegramDispatcher
 
 # --- Logging config ---
 logging.basicConfig(
@@ -31,34 +49,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger("accommodation_notifier")
 
-# --- JSON stockage pour éviter les doublons ---
-SEEN_FILE = "seen_ids.json"
-
-
-def load_seen_ids(reset: bool = False) -> Set[int]:
-    """Charge les IDs déjà vus, avec option pour reset"""
-    if reset and os.path.exists(SEEN_FILE):
-        logger.info("🗑️ Suppression du fichier seen_ids.json (reset demandé)")
-        os.remove(SEEN_FILE)
-        return set()
-    
-    if os.path.exists(SEEN_FILE):
-        with open(SEEN_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            seen_ids = set(data.get("seen_ids", []))
-            logger.info(f"📂 {len(seen_ids)} logements déjà vus chargés")
-            return seen_ids
-    
-    logger.info("📂 Aucun fichier d'historique trouvé, démarrage propre")
-    return set()
-
-def save_seen_ids(seen_ids: Set[int]) -> None:
-    with open(SEEN_FILE, "w", encoding="utf-8") as f:
-        json.dump({"seen_ids": list(seen_ids)}, f, ensure_ascii=False, indent=2)
+# --- Stockage SQLite pour éviter les doublons ---
+def open_state_store(settings: Settings, reset: bool = False) -> StateStore:
+    """Ouvre la base d'état (migre seen_ids.json au premier lancement), avec option pour reset"""
+    state_store = StateStore(settings.STATE_DB)
+    if reset:
+        state_store.reset()
+    return state_store
 
 # --- Config utilisateurs ---
 def load_users_conf() -> List[UserConf]:
-    settings = Settings()
+    settings = get_settings()
     
     users = [
         UserConf(
@@ -66,6 +67,7 @@ def load_users_conf() -> List[UserConf]:
             telegram_id=settings.MY_TELEGRAM_ID,
             search_url=settings.RESIDENCES_URL,
             ignored_ids=[2755],
+            filters=settings.USER_FILTERS.get(settings.MY_TELEGRAM_ID, UserFilters()),
         )
     ]
     
@@ -92,13 +94,20 @@ def load_users_conf() -> List[UserConf]:
                 telegram_id=telegram_id,
                 search_url=settings.RESIDENCES_URL,
                 ignored_ids=[],  # Peut avoir ses propres IDs ignorés
+                filters=settings.USER_FILTERS.get(telegram_id, UserFilters()),
             ))
     
     logger.info(f"📱 {len(users)} utilisateur(s) configuré(s)")
     return users
 
 # --- Selenium driver ---
-def create_driver(headless: bool = True) -> webdriver.Chrome:
+def create_driver(headless: bool = True, profile_root: str | None = None) -> "webdriver.Chrome":
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    settings = get_settings()
     chrome_options = Options()
     if headless:
         logger.info("Running in headless mode")
@@ -108,7 +117,7 @@ def create_driver(headless: bool = True) -> webdriver.Chrome:
         logger.info("Running in non-headless mode")
 
     # Créer un répertoire temporaire unique pour le profil Chrome
-    temp_dir = tempfile.mkdtemp(prefix=f"chrome_profile_{uuid.uuid4().hex[:8]}_")
+    temp_dir = tempfile.mkdtemp(prefix=f"chrome_profile_{uuid.uuid4().hex[:8]}_", dir=profile_root)
     chrome_options.add_argument(f"--user-data-dir={temp_dir}")
     logger.info(f"Utilisation du profil Chrome temporaire : {temp_dir}")
 
@@ -133,9 +142,22 @@ def create_driver(headless: bool = True) -> webdriver.Chrome:
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
 
+    # Journal réseau (CDP) lu par le ResourceBlocker pour compter les requêtes bloquées
+    if settings.BLOCK_RESOURCES or settings.BLOCKED_URL_PATTERNS:
+        chrome_options.set_capability("goog:loggingPrefs", ResourceBlocker.logging_prefs)
+
     try:
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        # Chemin de chromedriver mis en cache entre les redémarrages (pas de vérification de version à chaque lancement)
+        driver_path = resolve_chromedriver(settings.CHROMEDRIVER_CACHE_FILE, settings.CHROMEDRIVER_CACHE_MAX_AGE, settings.CHROMEDRIVER_PATH)
+        try:
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+        except SessionNotCreatedException:
+            if settings.CHROMEDRIVER_PATH:
+                raise
+            # Chrome a probablement été mis à jour depuis la mise en cache : résoudre à nouveau
+            logger.info("chromedriver en cache incompatible avec Chrome, nouvelle résolution")
+            driver_path = resolve_chromedriver(settings.CHROMEDRIVER_CACHE_FILE, settings.CHROMEDRIVER_CACHE_MAX_AGE, refresh=True)
+            driver = webdriver.Chrome(service=Service(driver_path), options=chrome_options)
         
         # Masquer les traces de webdriver
         driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
@@ -154,7 +176,7 @@ def create_driver(headless: bool = True) -> webdriver.Chrome:
             pass
         raise e
 
-def cleanup_driver(driver: webdriver.Chrome) -> None:
+def cleanup_driver(driver: "webdriver.Chrome") -> None:
     """Ferme proprement le driver et nettoie le profil temporaire"""
     try:
         temp_dir = getattr(driver, '_temp_profile_dir', None)
@@ -168,6 +190,79 @@ def cleanup_driver(driver: webdriver.Chrome) -> None:
     except Exception as e:
         logger.warning(f"Erreur lors du nettoyage du driver : {e}")
 
+# Pages chargées par un login MSE complet (login, connexion, Messervices, identifiants, règles, redirection)
+LOGIN_PAGE_LOADS = 6
+
+def authenticate(driver: "webdriver.Chrome", settings: Settings, session_store: SessionStore) -> int:
+    """Réutilise la session enregistrée si elle est encore valide, sinon rejoue le login MSE complet.
+
+    Renvoie le nombre (estimé pour le login) de pages chargées, décompté du budget de l'ordonnanceur.
+    """
+    page_loads = 0
+    if session_store.restore(driver):
+        page_loads += 1
+        if session_store.is_valid(driver, settings.RESIDENCES_URL):
+            logger.info("♻️ Session CROUS toujours valide, login MSE évité")
+            return page_loads
+        session_store.clear()
+
+    from src.authenticator import Authenticator
+
+    Authenticator(settings.MSE_EMAIL, settings.MSE_PASSWORD).authenticate_driver(driver)
+    session_store.save(driver)
+    return page_loads + LOGIN_PAGE_LOADS
+
+def create_resource_blocker(settings: Settings) -> ResourceBlocker:
+    return ResourceBlocker(blocked_url_patterns(settings.BLOCK_RESOURCES, settings.BLOCKED_URL_PATTERNS))
+
+def create_fetcher(driver: "webdriver.Chrome", settings: Settings) -> PageFetcher:
+    """Choisit le transport du Parser selon PARSER_TRANSPORT"""
+    if settings.PARSER_TRANSPORT == "api":
+        logger.info("🛰️ Transport API : résultats lus dans l'API JSON de recherche")
+        return SearchApiFetcher.from_driver(driver, settings.SEARCH_API_URL, pool_size=settings.HTTP_POOL_SIZE, timeout=settings.HTTP_TIMEOUT)
+    if settings.PARSER_TRANSPORT == "http":
+        logger.info("🌐 Transport HTTP : pages récupérées sans rendu navigateur")
+        return HttpFetcher.from_driver(driver, pool_size=settings.HTTP_POOL_SIZE, timeout=settings.HTTP_TIMEOUT)
+    return DriverFetcher(driver)
+
+def create_parser(driver: "webdriver.Chrome", settings: Settings, detail_cache: DetailCache) -> Parser:
+    fetcher = create_fetcher(driver, settings)
+    options = dict(
+        detail_concurrency=settings.DETAIL_CONCURRENCY,
+        detail_timeout=settings.DETAIL_TIMEOUT,
+        detail_cache=detail_cache,
+        parser_backend=settings.PARSER_BACKEND,
+        page_concurrency=settings.SEARCH_PAGE_CONCURRENCY,
+        max_pages=settings.SEARCH_MAX_PAGES,
+    )
+    if isinstance(fetcher, SearchApiFetcher):
+        return ApiParser(driver, fetcher, page_size=settings.SEARCH_API_PAGE_SIZE, **options)
+    return Parser(driver, fetcher, **options)
+
+def create_detail_cache(settings: Settings) -> DetailCache:
+    return DetailCache(
+        settings.DETAIL_CACHE_FILE,
+        ttl=settings.DETAIL_CACHE_TTL,
+        max_entries=settings.DETAIL_CACHE_MAX_ENTRIES,
+    )
+
+def create_bot(settings: Settings) -> "telepot.Bot":
+    import telepot
+
+    return telepot.Bot(token=settings.TELEGRAM_BOT_TOKEN)
+
+def create_dispatcher(bot: "telepot.Bot", settings: Settings, file_id_cache: FileIdCache) -> "TelegramDispatcher":
+    """Envoi concurrent vers toutes les conversations, dans les limites de débit Telegram"""
+    from src.telegram_dispatcher import TelegramDispatcher
+    from src.telegram_notifier import TelegramNotifier
+
+    return TelegramDispatcher(
+        TelegramNotifier(bot, file_id_cache=file_id_cache),
+        chat_rate=settings.TELEGRAM_CHAT_RATE,
+        global_rate=settings.TELEGRAM_GLOBAL_RATE,
+        media_group_rate=settings.TELEGRAM_MEDIA_GROUP_RATE,
+    )
+
 def random_sleep(base_delay: float, variance_percent: float = 0.3) -> None:
     """Sleep avec une variation aléatoire pour simuler un comportement humain"""
     variance = base_delay * variance_percent
@@ -175,51 +270,226 @@ def random_sleep(base_delay: float, variance_percent: float = 0.3) -> None:
     time.sleep(max(0.5, actual_delay))  # Minimum 0.5 seconde
 
 # --- NOUVELLE LOGIQUE OPTIMISÉE CORRIGÉE VRAIMENT ---
-def process_users_optimized(driver, parser_obj, notification_builder, notifier, user_confs, seen_ids, id_to_name):
+def create_search_planner(parser_obj, settings: Settings) -> SearchPlanner:
+    """Fusion des zones seulement si les logements ont des coordonnées pour les redistribuer"""
+    coalesce = settings.SEARCH_COALESCE and parser_obj.fetcher.provides_coordinates
+    return SearchPlanner(coalesce=coalesce, merge_margin=settings.SEARCH_MERGE_MARGIN, max_growth=settings.SEARCH_MERGE_MAX_GROWTH)
+
+
+def export_metrics(settings: Settings) -> None:
+    """Réécrit le fichier de métriques (textfile collector) si METRICS_TEXTFILE est défini"""
+    if not settings.METRICS_TEXTFILE:
+        return
+    try:
+        REGISTRY.write_textfile(settings.METRICS_TEXTFILE)
+    except OSError as e:
+        logger.warning(f"Impossible d'écrire les métriques dans {settings.METRICS_TEXTFILE} : {e}")
+
+
+def create_cycle_profiler(output_dir: str | None) -> ContextManager:
+    """Profil du cycle si --profile est passé (import différé : cProfile et tracemalloc seulement dans ce cas)"""
+    if not output_dir:
+        return nullcontext()
+    from src.profiling import CycleProfiler
+
+    return CycleProfiler(output_dir)
+
+
+def create_history(settings: Settings) -> SnapshotHistory | None:
+    return SnapshotHistory(settings.HISTORY_DIR) if settings.HISTORY_DIR else None
+
+
+def history_dir(cli_dir: str | None) -> str | None:
+    """Dossier de l'historique pour la sous-commande `history`, sans charger les Settings (ni identifiants MSE / Telegram)."""
+    if cli_dir:
+        return cli_dir
+    from dotenv import dotenv_values
+
+    for source in (os.environ, dotenv_values(".env")):
+        if "HISTORY_DIR" in source:
+            return source["HISTORY_DIR"]
+    return Settings.model_fields["HISTORY_DIR"].default
+
+
+def create_scheduler(settings: Settings) -> AdaptiveScheduler:
+    return AdaptiveScheduler(
+        # Même plancher de 20 minutes que l'attente fixe : le rythme du budget par défaut en découle
+        base_interval=max(1200, settings.FREQUENCE_VERIF),
+        min_interval=settings.SCHEDULER_MIN_INTERVAL,
+        max_interval=settings.SCHEDULER_MAX_INTERVAL,
+        max_page_loads_per_hour=settings.MAX_PAGE_LOADS_PER_HOUR,
+        burst_window=settings.SCHEDULER_BURST_WINDOW,
+        budget_window=settings.SCHEDULER_BUDGET_WINDOW,
+        history_days=settings.SCHEDULER_HISTORY_DAYS,
+    )
+
+
+def report_unchanged_area(search_plan, search_results, seen_ids, state_store, notifier, history=None):
+    """Bilan d'une zone dont les résultats n'ont pas changé : rien de nouveau, rien de disparu"""
+    area_ids = state_store.area_snapshot(search_plan.search_url)
+    state_store.touch(area_ids & seen_ids)
+    if history:
+        history.record_presence(search_plan.search_url, area_ids)
+    # Cartes du dernier passage (non reparsées) : réparties par rectangle comme dans un passage complet
+    positions = state_store.area_positions(search_plan.search_url)
+    accommodations = [
+        Accommodation(id=listing_id, title=None, price=None, latitude=latitude, longitude=longitude)
+        for listing_id, (latitude, longitude) in positions.items()
+    ]
+    for user_conf in search_plan.users:
+        if search_results.count == 0 or (accommodations and not search_plan.route(user_conf, accommodations)):
+            logger.info(f"❌ Aucun logement disponible pour {user_conf.conf_title}")
+            notifier.send_notifications(user_conf.telegram_id, [
+                Notification(message="❌ Aucun logement disponible actuellement.")
+            ])
+        else:
+            logger.info(f"✋ Aucun nouveau logement pour {user_conf.conf_title}")
+    report = notifier.join()
+    if report.failures:
+        logger.warning(f"⚠️ {report.failures} notification(s) non envoyée(s) après plusieurs tentatives")
+
+
+def settle_deliveries(notifier, state_store, deliveries, accommodations, search_url, seen_ids, id_to_name):
+    """Attend la fin des envois puis enregistre ceux qui sont partis.
+
+    Un logement est marqué vu seulement si tous ses envois ont réussi : sinon il reste nouveau et
+    repart au prochain cycle, uniquement vers les utilisateurs qui ne l'ont pas reçu.
+    Retourne les logements marqués vus.
     """
-    Version optimisée qui fait UN SEUL appel par URL unique, mais envoie les notifications à TOUS les utilisateurs.
+    report = notifier.join()
+    if report.failures:
+        logger.warning(f"⚠️ {report.failures} notification(s) non envoyée(s) après plusieurs tentatives")
+    state_store.record_deliveries([
+        (listing_id, telegram_id) for listing_id, telegram_id in deliveries if report.delivered(telegram_id, listing_id)
+    ])
+
+    failed_ids = {listing_id for _, listing_id in report.failed}
+    sent = [acc for acc in accommodations if acc.id not in failed_ids]
+    if failed_ids:
+        logger.warning(f"🔁 {len(failed_ids)} logement(s) non reçu(s) par tous leurs destinataires, renvoyé(s) au prochain cycle: {failed_ids}")
+    if sent:
+        logger.info(f"💾 Marquage de {len(sent)} nouveau(x) logement(s) comme vus")
+        state_store.mark_seen(sent, search_url)
+        for acc in sent:
+            seen_ids.add(acc.id)
+            id_to_name[acc.id] = acc.title
+            logger.info(f"✅ Logement {acc.id} ({acc.title}) ajouté aux IDs vus")
+    return sent
+
+
+def process_users_optimized(driver, parser_obj, notification_builder, notifier, search_planner, user_confs, seen_ids, id_to_name, state_store, scheduler=None, history=None, notify_price_changes=False):
     """
-    # 1️⃣ Grouper les utilisateurs par URL de recherche
-    urls_to_users = {}
-    for conf in user_confs:
-        url = str(conf.search_url)
-        if url not in urls_to_users:
-            urls_to_users[url] = []
-        urls_to_users[url].append(conf)
-    
-    logger.info(f"🔗 {len(urls_to_users)} URL(s) unique(s) à traiter pour {len(user_confs)} utilisateur(s)")
+    Version optimisée qui fait UN SEUL appel par zone de recherche, mais envoie les notifications à TOUS les utilisateurs.
+    Le même instantané des cartes (ID, empreinte, prix) sert à détecter les nouveaux logements, les logements
+    disparus et les cartes modifiées ; avec `notify_price_changes`, un changement de prix est signalé.
+    Avec un `scheduler`, seules les zones arrivées à échéance sont vérifiées.
+    Avec un `history`, les cartes de chaque passage sont ajoutées à l'historique.
+    Retourne (zones vérifiées, zones inchangées depuis leur dernier passage).
+    """
+    page_loads_before = parser_obj.fetcher.page_loads
+
+    # 1️⃣ Grouper les utilisateurs par zone de recherche (URLs identiques ou rectangles fusionnés)
+    all_search_plans = search_planner.plan(user_confs)
+    search_plans = scheduler.due(all_search_plans) if scheduler else all_search_plans
+    if len(search_plans) < len(all_search_plans):
+        logger.info(f"🗓️ {len(search_plans)}/{len(all_search_plans)} zone(s) à vérifier ce cycle")
+    unchanged_areas = 0
     
-    # 2️⃣ Traiter chaque URL UNE SEULE FOIS
-    for search_url, users_for_this_url in urls_to_users.items():
-        logger.info(f"🔍 Traitement de: {search_url}")
+    # 2️⃣ Traiter chaque zone UNE SEULE FOIS
+    for search_plan in search_plans:
+        search_url = search_plan.search_url
+        users_for_this_url = search_plan.users
+        area_page_loads_before = parser_obj.fetcher.page_loads
+        area_started = perf_counter()
+        # Premier passage sur la zone : ses logements ne sont pas des arrivées
+        known_area = state_store.has_area_snapshot(search_url)
+        arrivals = 0
+        logger.info(f"🔍 Traitement de: {search_url}{' (zones fusionnées)' if search_plan.merged else ''}")
         logger.info(f"👥 Utilisateurs concernés: {[u.conf_title for u in users_for_this_url]}")
         
+        # Logements déjà annoncés : marqués vus même si la recherche échoue ensuite (s'ils sont bien partis)
+        notified_accommodations = []
+        deliveries = []
         try:
-            # UN SEUL APPEL de scraping complet par URL
-            search_results = parser_obj.get_accommodations(search_url)
-            current_ids = {acc.id for acc in search_results.accommodations if acc.id}
-            
-            logger.info(f"📊 Trouvé {len(current_ids)} logements sur cette URL")
+            # UN SEUL APPEL de scraping complet par URL, consommé au fil de l'eau
+            search_results, stream = parser_obj.stream_accommodations(search_url, state_store.probe(search_url))
+            if search_results.unchanged:
+                # Même empreinte qu'au dernier passage complet : ni parsing, ni photos, ni notifications
+                unchanged_areas += 1
+                UNCHANGED_AREAS.inc()
+                report_unchanged_area(search_plan, search_results, seen_ids, state_store, notifier, history)
+                continue
             
-            # 3️⃣ Identifier les VRAIMENT nouveaux logements GLOBALEMENT
+            # 3️⃣ Identifier les VRAIMENT nouveaux logements GLOBALEMENT dès que leur carte est parsée
+            # Destinataires de chaque nouveau logement : filtres de chaque utilisateur et sa propre zone
+            filter_index = FilterIndex(users_for_this_url)
             new_accommodations = []
-            for acc in search_results.accommodations:
-                if acc.id and acc.id not in seen_ids:
+            recipients = {}
+
+            def new_accommodations_to_notify():
+                for acc in stream:
+                    if not acc.id or acc.id in seen_ids:
+                        continue
                     new_accommodations.append(acc)
+                    # Envoi qui avait échoué pour certains : seulement ceux qui ne l'ont pas reçu
+                    already_sent = state_store.recipients(acc.id)
+                    recipients[acc.id] = [
+                        user_conf for user_conf in filter_index.match(acc)
+                        if search_plan.wants(user_conf, acc) and user_conf.telegram_id not in already_sent
+                    ]
+                    # Récupérer les photos uniquement des logements qui seront notifiés à au moins un utilisateur
+                    if recipients[acc.id]:
+                        yield acc
+
+            # 4️⃣ Chaque nouveau logement part dès que ses photos sont prêtes, sans attendre les autres
+            for acc in parser_obj.iter_enriched(new_accommodations_to_notify()):
+                notifications = notification_builder.search_results_notification(
+                    SearchResults(
+                        search_url=search_url,
+                        count=1,
+                        accommodations=[acc]
+                    )
+                )
+                for user_conf in recipients[acc.id]:
+                    logger.info(f"📤 Envoi notification pour logement ID {acc.id} à {user_conf.conf_title}")
+                    notifier.send_notifications(user_conf.telegram_id, notifications, listing_id=acc.id)
+                    deliveries.append((acc.id, user_conf.telegram_id))
+                notified_accommodations.append(acc)
+
+            current_ids = {acc.id for acc in search_results.accommodations if acc.id}
+            state_store.touch(current_ids & seen_ids)
+            if history:
+                history.record(search_url, search_results.accommodations)
             
+            logger.info(f"📊 Trouvé {len(current_ids)} logements sur cette URL")
             logger.info(f"🆕 {len(new_accommodations)} logement(s) VRAIMENT nouveaux détectés")
             
-            # Vérifier les logements disparus GLOBALEMENT
-            removed_ids = seen_ids - current_ids
+            # Logements disparus et cartes modifiées de CETTE zone depuis son dernier passage
+            card_diff = diff_cards(state_store.area_cards(search_url), search_results.accommodations)
+            removed_ids = card_diff.removed
+            state_store.replace_area_snapshot(search_url, search_results.accommodations)
             if removed_ids:
                 logger.info(f"📉 {len(removed_ids)} logement(s) disparu(s): {removed_ids}")
+            if card_diff.modified:
+                logger.info(f"✏️ {len(card_diff.modified)} logement(s) modifié(s): {[acc.id for acc, _ in card_diff.modified]}")
+            if notify_price_changes:
+                # Seulement aux utilisateurs de cette zone qui ont reçu le logement
+                for acc, previous_price in card_diff.price_changes():
+                    delivered_to = state_store.recipients(acc.id) if acc.id in seen_ids else set()
+                    if not delivered_to:
+                        continue
+                    logger.info(f"💶 Prix modifié pour {acc.id} ({acc.title}) : {previous_price} → {acc.price}")
+                    for telegram_id in sorted({user_conf.telegram_id for user_conf in users_for_this_url} & delivered_to):
+                        notifier.send_notifications(telegram_id, [notification_builder.price_change_notification(acc, previous_price)])
             
-            # 4️⃣ Traiter chaque utilisateur pour cette URL
+            # 5️⃣ Bilan par utilisateur, une fois la recherche complète
+            removed_recipients = {removed_id: state_store.recipients(removed_id) for removed_id in removed_ids}
             for user_conf in users_for_this_url:
                 logger.info(f"👤 Traitement pour: {user_conf.conf_title}")
+                user_notified = sum(1 for acc in notified_accommodations if user_conf in recipients[acc.id])
                 
                 # CAS 1: Aucun logement disponible
-                if not search_results.accommodations:
+                if not search_plan.route(user_conf, search_results.accommodations):
                     logger.info(f"❌ Aucun logement disponible pour {user_conf.conf_title}")
                     notifier.send_notifications(user_conf.telegram_id, [
                         Notification(message="❌ Aucun logement disponible actuellement.")
@@ -227,57 +497,38 @@ def process_users_optimized(driver, parser_obj, notification_builder, notifier,
                 
                 # CAS 2: Il y a des nouveaux logements
                 elif new_accommodations:
-                    # Filtrer selon les IDs ignorés de cet utilisateur
-                    user_new_accommodations = [
-                        acc for acc in new_accommodations 
-                        if acc.id not in user_conf.ignored_ids
-                    ]
-                    
-                    if user_new_accommodations:
-                        logger.info(f"✅ {len(user_new_accommodations)} nouveau(x) logement(s) à notifier pour {user_conf.conf_title}")
-                        
-                        for acc in user_new_accommodations:
-                            logger.info(f"📤 Envoi notification pour logement ID {acc.id} à {user_conf.conf_title}")
-                            notifications = notification_builder.search_results_notification(
-                                SearchResults(
-                                    search_url=search_url,
-                                    count=1,
-                                    accommodations=[acc]
-                                )
-                            )
-                            
-                            for notif in notifications:
-                                notifier.send_notifications(user_conf.telegram_id, [notif])
-                                random_sleep(1.5, 0.5)
+                    if user_notified:
+                        logger.info(f"✅ {user_notified} nouveau(x) logement(s) notifié(s) à {user_conf.conf_title}")
                     else:
-                        logger.info(f"🚫 Tous les nouveaux logements sont ignorés pour {user_conf.conf_title}")
+                        logger.info(f"🚫 Tous les nouveaux logements sont ignorés ou filtrés pour {user_conf.conf_title}")
                         
                 # CAS 3: Pas de nouveaux logements
                 else:
                     logger.info(f"✋ Aucun nouveau logement pour {user_conf.conf_title}")
                 
-                # 5️⃣ Notifier les logements disparus
-                if removed_ids:
-                    logger.info(f"📉 Notification de {len(removed_ids)} logement(s) disparu(s) pour {user_conf.conf_title}")
-                    for removed_id in removed_ids:
+                # Notifier les logements disparus, seulement à ceux qui les avaient reçus
+                user_removed_ids = [removed_id for removed_id in removed_ids if user_conf.telegram_id in removed_recipients[removed_id]]
+                if user_removed_ids:
+                    logger.info(f"📉 Notification de {len(user_removed_ids)} logement(s) disparu(s) pour {user_conf.conf_title}")
+                    for removed_id in user_removed_ids:
                         removed_title = id_to_name.get(removed_id)
                         msg = f"⚠️ Le logement n'est plus disponible : {removed_title or 'ID ' + str(removed_id)}"
                         notifier.send_notifications(user_conf.telegram_id, [Notification(message=msg)])
-                        random_sleep(1, 0.3)
-                
-                # Petit délai entre utilisateurs
-                random_sleep(1, 0.3)
             
-            # 6️⃣ Marquer les nouveaux logements comme vus APRÈS avoir notifié TOUS les utilisateurs
-            if new_accommodations:
-                logger.info(f"💾 Marquage de {len(new_accommodations)} nouveau(x) logement(s) comme vus")
-                for acc in new_accommodations:
-                    seen_ids.add(acc.id)
-                    id_to_name[acc.id] = acc.title
-                    logger.info(f"✅ Logement {acc.id} ({acc.title}) ajouté aux IDs vus")
+            # 6️⃣ Attendre les envois (en parallèle sur toutes les conversations), puis marquer vus
+            # les nouveaux logements reçus par TOUS leurs destinataires
+            sent = settle_deliveries(notifier, state_store, deliveries, new_accommodations, search_url, seen_ids, id_to_name)
+            if sent and known_area:
+                state_store.record_arrivals([acc.id for acc in sent], search_url)
+                arrivals = len(sent)
+            if search_results.probe:
+                state_store.save_probe(search_url, search_results.probe)
             
         except Exception as e:
             logger.error(f"❌ Erreur lors du traitement de {search_url}: {e}")
+            if notified_accommodations:
+                # Déjà envoyés avant l'erreur : ne pas les renvoyer au prochain cycle
+                settle_deliveries(notifier, state_store, deliveries, notified_accommodations, search_url, seen_ids, id_to_name)
             # Notifier tous les utilisateurs de cette URL de l'erreur
             for user_conf in users_for_this_url:
                 try:
@@ -285,46 +536,75 @@ def process_users_optimized(driver, parser_obj, notification_builder, notifier,
                     notifier.send_notifications(user_conf.telegram_id, [error_notif])
                 except:
                     logger.error(f"Impossible de notifier l'erreur à {user_conf.conf_title}")
-        
-        # Délai entre URLs différentes
-        random_sleep(3, 0.4)
-    
-    # 7️⃣ Nettoyer les IDs disparus (une seule fois à la fin)
-    all_current_ids = set()
-    for search_url in urls_to_users.keys():
-        try:
-            # Récupération légère des IDs actuels
-            current_ids = set(parser_obj.get_accommodation_ids(search_url))
-            all_current_ids.update(current_ids)
-        except Exception as e:
-            logger.warning(f"Impossible de vérifier les IDs pour {search_url}: {e}")
+
+        finally:
+            AREA_SECONDS.observe(perf_counter() - area_started, search_url=search_url)
+            if scheduler:
+                scheduler.record(search_url, parser_obj.fetcher.page_loads - area_page_loads_before, arrivals)
+            # Délai entre URLs différentes
+            random_sleep(3, 0.4)
     
-    # Supprimer les IDs qui n'existent plus nulle part
-    removed_ids = seen_ids - all_current_ids
+    logger.info(f"📄 {parser_obj.fetcher.page_loads - page_loads_before} chargement(s) de page ce cycle")
+    if unchanged_areas:
+        logger.info(f"⏭️ {unchanged_areas}/{len(search_plans)} zone(s) inchangée(s) ce cycle, parsing ignoré")
+
+    # 7️⃣ Nettoyer les IDs disparus (une seule fois à la fin, à partir du dernier instantané de chaque zone)
+    search_urls = [search_plan.search_url for search_plan in all_search_plans]
+    never_crawled = [search_url for search_url in search_urls if not state_store.has_area_snapshot(search_url)]
+    if never_crawled:
+        # Sans instantané de chaque zone on oublierait à tort des logements encore en ligne
+        logger.warning(f"⚠️ Nettoyage des IDs ignoré : {len(never_crawled)} zone(s) jamais vérifiée(s) entièrement")
+        return len(search_plans), unchanged_areas
+
+    # Supprimer les IDs qui n'existent plus dans aucune zone
+    removed_ids = seen_ids - state_store.listed_ids(search_urls)
     if removed_ids:
         logger.info(f"🧹 Nettoyage: suppression de {len(removed_ids)} ID(s) disparus définitivement")
+        state_store.mark_removed(removed_ids)
         for removed_id in removed_ids:
             seen_ids.remove(removed_id)
             id_to_name.pop(removed_id, None)
             logger.info(f"🗑️ ID {removed_id} supprimé de la mémoire")
+    return len(search_plans), unchanged_areas
 
 # --- Boucle principale ---
 def main_loop(reset_data: bool = False):
-    settings = Settings()
-    bot = telepot.Bot(token=settings.TELEGRAM_BOT_TOKEN)
-    bot.getMe()  # test token valide
+    settings = get_settings()
+    with startup_profile.step("bot Telegram"):
+        bot = create_bot(settings)
+        bot.getMe()  # test token valide
 
     user_confs = load_users_conf()
-    seen_ids = load_seen_ids(reset=reset_data)
-    # Dictionnaire pour associer ID -> Nom
-    id_to_name = {}
+    with startup_profile.step("base d'état"):
+        state_store = open_state_store(settings, reset=reset_data)
+    seen_ids = state_store.seen_ids()
+    session_store = SessionStore(settings.SESSION_FILE, max_age=settings.SESSION_MAX_AGE)
+    detail_cache = create_detail_cache(settings)
+    # Conservé entre les cycles : les photos déjà envoyées sont réutilisées par file_id
+    file_id_cache = FileIdCache(max_age=settings.FILE_ID_CACHE_MAX_AGE)
+    resource_blocker = create_resource_blocker(settings)
+    if settings.METRICS_PORT:
+        REGISTRY.serve(settings.METRICS_PORT)
+    scheduler = create_scheduler(settings) if settings.SCHEDULER_ADAPTIVE else None
+    history = create_history(settings)
+    # Dictionnaire pour associer ID -> Nom (persisté : survit aux redémarrages)
+    id_to_name = state_store.titles()
+    # Chrome reste ouvert entre les cycles (profil sur tmpfs si possible)
+    driver_manager = DriverManager(
+        lambda: create_driver(headless=True, profile_root=tmpfs_profile_root(settings.CHROME_PROFILE_DIR)),
+        cleanup_driver,
+        max_cycles=settings.DRIVER_MAX_CYCLES,
+        max_rss_mb=settings.DRIVER_MAX_RSS_MB,
+    )
 
     loop_count = 0
+    checked_areas = unchanged_areas = 0
 
     while True:
-        driver = None  # Initialiser à None
+        parser_obj = None
         try:
             loop_count += 1
+            cycle_started = perf_counter()
             logger.info(f"🔄 Début du cycle {loop_count}")
             
             # Délai aléatoire au début pour varier le timing
@@ -332,62 +612,88 @@ def main_loop(reset_data: bool = False):
             logger.info(f"⏱️ Délai initial aléatoire: {initial_delay:.1f}s")
             time.sleep(initial_delay)
             
-            driver = create_driver(headless=True)
+            if scheduler:
+                scheduler.learn(state_store.arrival_history(since=time.time() - settings.SCHEDULER_HISTORY_DAYS * 86400))
+
+            with startup_profile.step("démarrage de Chrome"):
+                driver = driver_manager.acquire()
             
             # GESTION DE L'ERREUR D'AUTHENTIFICATION CRITIQUE
             try:
-                Authenticator(settings.MSE_EMAIL, settings.MSE_PASSWORD).authenticate_driver(driver)
+                with startup_profile.step("authentification"):
+                    auth_page_loads = authenticate(driver, settings, session_store)
+                if scheduler:
+                    scheduler.record_page_loads(auth_page_loads)
             except AuthenticationError as e:
                 logger.error(f"🚨 Erreur d'authentification critique: {e}")
-                if driver is not None:
-                    try:
-                        cleanup_driver(driver)
-                    except Exception as cleanup_error:
-                        logger.warning(f"Erreur lors du nettoyage du driver : {cleanup_error}")
+                driver_manager.close()
                 # Arrêter complètement le programme
                 sys.exit(1)
             
             # Petit délai aléatoire après l'authentification
             random_sleep(5, 0.5)  # Augmenté de 3 à 5
             
-            parser_obj = Parser(driver)
+            parser_obj = create_parser(driver, settings, detail_cache)
             notification_builder = NotificationBuilder()
-            notifier = TelegramNotifier(bot)
 
             # 🚀 NOUVELLE LOGIQUE OPTIMISÉE CORRIGÉE
-            process_users_optimized(driver, parser_obj, notification_builder, notifier, user_confs, seen_ids, id_to_name)
+            with create_dispatcher(bot, settings, file_id_cache) as notifier:
+                startup_profile.log_report(logger)
+                # Images, polices et tiers bloqués pendant le scraping uniquement (login non affecté)
+                with resource_blocker.blocking(driver):
+                    checked, unchanged = process_users_optimized(driver, parser_obj, notification_builder, notifier, create_search_planner(parser_obj, settings), user_confs, seen_ids, id_to_name, state_store, scheduler, history, settings.NOTIFY_PRICE_CHANGES)
+            checked_areas += checked
+            unchanged_areas += unchanged
+            SEEN_IDS.set(len(seen_ids))
+            logger.info(f"📊 Depuis le démarrage : {loop_count} cycle(s), {unchanged_areas}/{checked_areas} vérification(s) de zone sans changement")
+            file_id_cache.evict()
 
-            save_seen_ids(seen_ids)
-            cleanup_driver(driver)  # Utiliser la nouvelle fonction
-            driver = None  # Réinitialiser pour éviter le double nettoyage
+            # Le navigateur reste ouvert pour le cycle suivant
+            driver_manager.park()
+            driver_manager.log_report()
+            CYCLE_SECONDS.observe(perf_counter() - cycle_started)
+            LAST_CYCLE_TIMESTAMP.set(time.time())
             
-            # Petit délai après fermeture du driver
+            # Petit délai après le cycle
             random_sleep(2, 0.3)
             
         except AuthenticationError:
             # Cette exception est déjà gérée plus haut avec sys.exit(1)
             # Ne devrait pas arriver ici, mais au cas où
-            if driver is not None:
-                try:
-                    cleanup_driver(driver)
-                except Exception as cleanup_error:
-                    logger.warning(f"Erreur lors du nettoyage du driver : {cleanup_error}")
+            driver_manager.close()
             sys.exit(1)
             
         except Exception as e:
             logger.error(f"Erreur pendant le scraping : {e}")
             
-            # S'assurer que le driver est fermé même en cas d'erreur
-            if driver is not None:
-                try:
-                    cleanup_driver(driver)
-                except Exception as cleanup_error:
-                    logger.warning(f"Erreur lors du nettoyage du driver : {cleanup_error}")
+            # Navigateur dans un état inconnu : le fermer, le prochain cycle en démarre un neuf
+            try:
+                driver_manager.discard()
+            except Exception as cleanup_error:
+                logger.warning(f"Erreur lors du nettoyage du driver : {cleanup_error}")
             
             # Délai plus long en cas d'erreur pour éviter de spam
             error_delay = random.uniform(30, 60)
             logger.info(f"⚠️ Attente de {error_delay:.1f}s après erreur")
             time.sleep(error_delay)
+            if scheduler:
+                # Pas de nouvelle tentative avant l'intervalle minimal
+                scheduler.postpone(settings.SCHEDULER_MIN_INTERVAL)
+
+        finally:
+            # Session HTTP / API du cycle (connexions keep-alive) fermée même après une erreur
+            if parser_obj is not None:
+                parser_obj.fetcher.close()
+
+        export_metrics(settings)
+
+        if scheduler:
+            # Réveil à l'échéance de la prochaine zone (au moins 1 minute entre deux cycles)
+            actual_delay = max(60.0, scheduler.seconds_until_due())
+            logger.info(f"⏰ Attente de {actual_delay / 60:.1f} minutes avant le prochain check...")
+            logger.info(f"📊 Prochaine vérification vers {time.strftime('%H:%M:%S', time.localtime(time.time() + actual_delay))}")
+            time.sleep(actual_delay)
+            continue
 
         # Calcul du délai principal avec randomisation
         base_delay = settings.FREQUENCE_VERIF
@@ -409,25 +715,50 @@ if __name__ == "__main__":
     parser.add_argument("--loop", action="store_true", help="Run the script in loop mode (every 30min)")
     parser.add_argument("--no-headless", action="store_true", help="Run Chrome in non-headless mode")
     parser.add_argument("--reset", action="store_true", help="Reset seen IDs (clear history)")
+    parser.add_argument("--startup-profile", action="store_true", help="Log import and initialization time per module at startup")
+    parser.add_argument(
+        "--profile", nargs="?", const="profiles", metavar="DIR",
+        help="Run a single cycle under cProfile, a stack sampler and tracemalloc; write the reports to DIR (default: profiles)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    history_parser = subparsers.add_parser("history", help="Query the listing history (HISTORY_DIR)")
+    history_parser.add_argument("--area", help="Only search areas whose URL contains this text (e.g. a bounds value)")
+    history_parser.add_argument("--days", type=int, default=30, help="Period to query, in days (default: 30)")
+    history_parser.add_argument("--dir", help="History directory (default: HISTORY_DIR from the environment or .env)")
     args = parser.parse_args()
 
-    settings = Settings()
+    if args.command == "history":
+        directory = history_dir(args.dir)
+        if not directory:
+            parser.error("HISTORY_DIR est vide : l'historique est désactivé")
+        print_listings_report(SnapshotHistory(directory), args.days, args.area)
+        sys.exit(0)
 
-    if args.loop:
+    with startup_profile.step("settings"):
+        settings = get_settings()
+
+    if args.loop and args.profile:
+        logger.info("🔬 --profile : un seul cycle est exécuté, --loop est ignoré")
+
+    if args.loop and not args.profile:
         main_loop(reset_data=args.reset)
     else:
         driver = None  # Initialiser à None
+        parser_obj = None
         try:
             # Délai aléatoire initial même en mode one-shot
             initial_delay = random.uniform(1, 4)
             logger.info(f"⏱️ Délai initial aléatoire: {initial_delay:.1f}s")
             time.sleep(initial_delay)
             
-            driver = create_driver(headless=not args.no_headless)
+            with startup_profile.step("démarrage de Chrome"):
+                driver = create_driver(headless=not args.no_headless, profile_root=tmpfs_profile_root(settings.CHROME_PROFILE_DIR))
             
             # GESTION DE L'ERREUR D'AUTHENTIFICATION CRITIQUE
             try:
-                Authenticator(settings.MSE_EMAIL, settings.MSE_PASSWORD).authenticate_driver(driver)
+                session_store = SessionStore(settings.SESSION_FILE, max_age=settings.SESSION_MAX_AGE)
+                with startup_profile.step("authentification"):
+                    authenticate(driver, settings, session_store)
             except AuthenticationError as e:
                 logger.error(f"🚨 Erreur d'authentification critique: {e}")
                 if driver is not None:
@@ -440,18 +771,27 @@ if __name__ == "__main__":
             
             random_sleep(5, 0.4)  # Augmenté de 2 à 5
             
-            parser_obj = Parser(driver)
+            parser_obj = create_parser(driver, settings, create_detail_cache(settings))
             notification_builder = NotificationBuilder()
-            notifier = TelegramNotifier(telepot.Bot(token=settings.TELEGRAM_BOT_TOKEN))
 
             user_confs = load_users_conf()
-            seen_ids = load_seen_ids(reset=args.reset)
-            id_to_name = {}
+            state_store = open_state_store(settings, reset=args.reset)
+            seen_ids = state_store.seen_ids()
+            id_to_name = state_store.titles()
 
             # 🚀 NOUVELLE LOGIQUE OPTIMISÉE CORRIGÉE (mode one-shot)
-            process_users_optimized(driver, parser_obj, notification_builder, notifier, user_confs, seen_ids, id_to_name)
+            file_id_cache = FileIdCache(max_age=settings.FILE_ID_CACHE_MAX_AGE)
+            resource_blocker = create_resource_blocker(settings)
+            with create_dispatcher(create_bot(settings), settings, file_id_cache) as notifier:
+                startup_profile.log_report(logger)
+                # Images, polices et tiers bloqués pendant le scraping uniquement (login non affecté)
+                with resource_blocker.blocking(driver), create_cycle_profiler(args.profile):
+                    process_users_optimized(driver, parser_obj, notification_builder, notifier, create_search_planner(parser_obj, settings), user_confs, seen_ids, id_to_name, state_store, history=create_history(settings), notify_price_changes=settings.NOTIFY_PRICE_CHANGES)
+            SEEN_IDS.set(len(seen_ids))
+            LAST_CYCLE_TIMESTAMP.set(time.time())
+            export_metrics(settings)
 
-            save_seen_ids(seen_ids)
+            state_store.close()
             cleanup_driver(driver)  # Utiliser la nouvelle fonction
             
         except AuthenticationError as e:
@@ -474,4 +814,8 @@ if __name__ == "__main__":
                 except Exception as cleanup_error:
                     logger.warning(f"Erreur lors du nettoyage du driver : {cleanup_error}")
             
-            raise e
\ No newline at end of file
+            raise e
+
+        finally:
+            if parser_obj is not None:
+                parser_obj.fetcher.close()
\ No newline at end of file
@@ -0,0 +1,149 @@
+import logging
+import math
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from pydantic import HttpUrl
+
+from src.fetchers import FetchError, SearchApiFetcher
+from src.metrics import PAGE_FETCH_SECONDS, PAGE_PARSE_SECONDS
+from src.models import Accommodation, SearchProbe, SearchResults
+from src.parser import Parser, _with_page, card_hash, card_ids_hash, same_results
+from src.search_planner import Bounds
+
+logger = logging.getLogger(__name__)
+
+SITE_URL = "https://trouverunlogement.lescrous.fr"
+TOOL_ID_PATTERN = re.compile(r"/tools/(\d+)/")
+
+# Modes d'occupation de l'API -> libellés affichés sur les cartes du site
+OCCUPATION_LABELS = {"alone": "Individuel", "couple": "Couple", "house_sharing": "Colocation"}
+
+
+def search_payload(search_url: str, page: int, page_size: int) -> Tuple[str, Dict[str, Any]]:
+    """Retourne (identifiant de l'outil, corps de la requête) pour une URL de recherche du site."""
+    parts = urlsplit(search_url)
+    tool_match = TOOL_ID_PATTERN.search(parts.path)
+    if not tool_match:
+        raise FetchError(f"Identifiant d'outil introuvable dans {search_url}")
+
+    params = dict(parse_qsl(parts.query))
+    bounds = Bounds.from_param(params.get("bounds", ""))
+    ignored = sorted(set(params) - {"bounds", "page"})
+    if ignored:
+        logger.warning(f"Paramètres de recherche ignorés par le transport api : {', '.join(ignored)} (utiliser USER_FILTERS)")
+
+    payload: Dict[str, Any] = {
+        "idTool": int(tool_match.group(1)),
+        "need_aggregation": False,
+        "page": page,
+        "pageSize": page_size,
+        "sector": None,
+        "occupationModes": [],
+        "location": None,
+        "residence": None,
+        "precision": 6,
+        "equipment": [],
+        "price": {"max": 10000000},
+        "area": {"min": 0},
+        "toolMechanism": "flow",
+    }
+    if bounds:
+        # Même ordre que le paramètre bounds : coin nord-ouest puis sud-est
+        payload["location"] = [{"lon": bounds.west, "lat": bounds.north}, {"lon": bounds.east, "lat": bounds.south}]
+    return tool_match.group(1), payload
+
+
+def accommodation_from_api(item: Dict[str, Any], tool_id: str) -> Optional[Accommodation]:
+    """Convertit un logement de la réponse JSON, None s'il est inexploitable."""
+    if item.get("id") is None:
+        logger.warning("Logement sans identifiant dans la réponse de l'API")
+        return None
+
+    residence = item.get("residence") or {}
+    location = residence.get("location") or {}
+    title = " - ".join(part for part in (residence.get("label"), item.get("label")) if part) or None
+
+    # Loyers en centimes ; le plus bas des modes d'occupation, comme le badge des cartes
+    modes = item.get("occupationModes") or []
+    rents = [mode["rent"]["min"] for mode in modes if (mode.get("rent") or {}).get("min") is not None]
+    price = min(rents) / 100 if rents else None
+
+    area = (item.get("area") or {}).get("min")
+    details = [residence.get("address")]
+    details.append(" / ".join(OCCUPATION_LABELS.get(mode.get("type"), mode.get("type") or "") for mode in modes) or None)
+    details.append(f"{item.get('label') or ''} {area:g} m²".strip() if area is not None else item.get("label"))
+
+    images = [media["src"] for media in item.get("medias") or [] if media.get("src")]
+    images = [src if src.startswith("http") else SITE_URL + src for src in images][:10]
+    overview_details = "\n".join(detail for detail in details if detail)
+    image_url = images[0] if images else None
+
+    return Accommodation(
+        id=item["id"],
+        title=title,
+        price=price,
+        overview_details=overview_details,
+        image_url=image_url,
+        all_images=images,
+        detail_url=f"{SITE_URL}/tools/{tool_id}/accommodations/{item['id']}",
+        latitude=location.get("lat"),
+        longitude=location.get("lon"),
+        card_hash=card_hash(title, price, overview_details, image_url),
+    )
+
+
+class ApiParser(Parser):
+    """Parser du transport "api" : résultats lus dans le JSON de l'API de recherche.
+
+    Ni rendu, ni parsing HTML, ni pages détaillées : la réponse contient déjà les photos et
+    les coordonnées. La pagination, la déduplication et la sonde de changement sont celles
+    du Parser HTML.
+    """
+
+    def __init__(self, authenticated_driver, fetcher: SearchApiFetcher, page_size: int = 24, **kwargs):
+        super().__init__(authenticated_driver, fetcher, **kwargs)
+        self.page_size = page_size
+
+    def stream_accommodations(
+        self, search_url: HttpUrl, previous_probe: Optional[SearchProbe] = None
+    ) -> Tuple[SearchResults, Iterator[Accommodation]]:
+        search_url = str(search_url)
+        count, first_page = self._search(search_url)
+        logger.info(f"Found {count} accommodations (API)")
+
+        ids_hash = card_ids_hash(count, [str(acc.id) for acc in first_page])
+        cards_hash = card_ids_hash(count, [acc.card_hash for acc in first_page]) if ids_hash else None
+        probe = SearchProbe(count=count, ids_hash=ids_hash, cards_hash=cards_hash)
+        if same_results(probe, previous_probe):
+            logger.info(f"⏭️ Résultats inchangés ({probe.count} logement(s), mêmes IDs) : {search_url}")
+            return self._unchanged_results(search_url, probe)
+
+        last_page = math.ceil(count / self.page_size) if count else 1
+        if last_page > self.max_pages:
+            logger.warning(f"⚠️ {last_page} pages de résultats, seules les {self.max_pages} premières sont récupérées")
+            last_page = self.max_pages
+        page_urls = [_with_page(search_url, page) for page in range(2, last_page + 1)]
+
+        search_results = SearchResults(search_url=search_url, count=count, accommodations=[], probe=probe)
+        return search_results, self._stream_pages(search_results, first_page, page_urls)
+
+    def _get_result_page(self, page_url: str) -> List[Accommodation]:
+        return self._search(page_url)[1]
+
+    def _search(self, search_url: str) -> Tuple[Optional[int], List[Accommodation]]:
+        page = int(dict(parse_qsl(urlsplit(search_url).query)).get("page", 1))
+        tool_id, payload = search_payload(search_url, page, self.page_size)
+        with PAGE_FETCH_SECONDS.time(kind="api_search"):
+            results = self.fetcher.search(tool_id, payload).get("results") or {}
+        with PAGE_PARSE_SECONDS.time(kind="api_search"):
+            items = results.get("items") or []
+            count = (results.get("total") or {}).get("value")
+            accommodations = [acc for acc in (accommodation_from_api(item, tool_id) for item in items) if acc]
+        logger.info(f"Trouvé {len(accommodations)} logement(s) page {page} (API)")
+        return count, accommodations
+
+    def iter_enriched(self, accommodations: Iterable[Accommodation]) -> Iterator[Accommodation]:
+        """Les photos viennent de la réponse de l'API : aucune page détaillée à charger."""
+        yield from accommodations
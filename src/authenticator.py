@@ -5,33 +5,42 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, UnexpectedAlertPresentException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, UnexpectedAlertPresentException, NoAlertPresentException
 from time import sleep
 import telepot
 
-from src.settings import Settings
-
-settings = Settings()
+from src.exceptions import AuthenticationError
+from src.metrics import AUTHENTICATE_SECONDS
+from src.settings import get_settings
+from src.timing import StepTimer
 
 logger = logging.getLogger(__name__)
 
-
-class AuthenticationError(Exception):
-    """Exception levée en cas d'erreur critique d'authentification"""
-    pass
+# État du widget altcha : validé quand data-state="verified" ou quand le champ caché reçoit la preuve
+ALTCHA_VERIFIED_JS = """
+const widget = document.querySelector('altcha-widget');
+const root = widget ? (widget.shadowRoot || widget) : document;
+const state = root.querySelector('[data-state]');
+if (state && state.getAttribute('data-state') === 'verified') return true;
+const proof = document.querySelector("input[name='login[altcha]']");
+return !!(proof && proof.value);
+"""
 
 
 class Authenticator:
     """Class that handles the authentication to the CROUS website and returns a WebDriver object that is authenticated."""
 
-    def __init__(self, email: str, password: str, delay: int = 2):
+    def __init__(self, email: str, password: str, delay: int = 2, step_timeout: int = 30):
         self.email = email
         self.password = password
         self.delay = delay
+        self.step_timeout = step_timeout
+        self.timer = StepTimer()
 
     def _send_error_notification(self, error_message: str) -> None:
         """Envoie une notification d'erreur au Telegram principal"""
         try:
+            settings = get_settings()
             bot = telepot.Bot(token=settings.TELEGRAM_BOT_TOKEN)
             full_message = f"🚨 ERREUR D'AUTHENTIFICATION CRITIQUE 🚨\n\n{error_message}\n\nLe programme s'est arrêté automatiquement."
             bot.sendMessage(
@@ -59,61 +68,79 @@ class Authenticator:
         """Authenticates the given WebDriver object to the CROUS website."""
 
         logger.info("Authenticating to the CROUS website...")
+        self.timer = StepTimer()
 
         sleep(self.delay)
 
+        try:
+            with AUTHENTICATE_SECONDS.time():
+                self._authenticate_steps(driver)
+        finally:
+            self.timer.log_report(logger, "Durée du login par étape")
+
+        # Done
+        logger.info("Successfully authenticated to the CROUS website")
+
+    def _authenticate_steps(self, driver: WebDriver) -> None:
+        settings = get_settings()
+
         # Step 1: Go to the login page
         logger.info(f"Going to the login page: {settings.MSE_LOGIN_URL}")
         try:
-            driver.get(settings.MSE_LOGIN_URL)
-            sleep(self.delay)
+            with self.timer.step("page de login"):
+                driver.get(settings.MSE_LOGIN_URL)
+                sleep(self.delay)
         except Exception as e:
             self._critical_error("Accès page de login", "Page MSE non accessible", e)
 
         # Step 1.5: Vérifier et forcer la langue française
-        self._ensure_french_language(driver)
+        with self.timer.step("langue"):
+            self._ensure_french_language(driver)
 
         # Step 2: Click on "Connexion"
         logger.info("Clicking Connexion link")
         try:
-            wait = WebDriverWait(driver, 20)
-            connexion_link = wait.until(
-                EC.element_to_be_clickable((By.LINK_TEXT, "Connexion"))
-            )
-            driver.execute_script("arguments[0].click();", connexion_link)
-            sleep(self.delay)
+            with self.timer.step("clic connexion"):
+                wait = WebDriverWait(driver, 20)
+                connexion_link = wait.until(
+                    EC.element_to_be_clickable((By.LINK_TEXT, "Connexion"))
+                )
+                driver.execute_script("arguments[0].click();", connexion_link)
+                sleep(self.delay)
         except TimeoutException as e:
             self._critical_error("Clic Connexion", "Lien 'Connexion' non trouvé", e)
 
         # Step 2.5: Choose Messervices (logo)
         logger.info("Choosing Messervices login")
         try:
-            wait = WebDriverWait(driver, 20)
-            mse_connect_button = wait.until(
-                EC.element_to_be_clickable((By.CLASS_NAME, "logo-mse-connect-fr"))
-            )
-            driver.execute_script("arguments[0].click();", mse_connect_button)
-            sleep(self.delay)
+            with self.timer.step("choix messervices"):
+                wait = WebDriverWait(driver, 20)
+                mse_connect_button = wait.until(
+                    EC.element_to_be_clickable((By.CLASS_NAME, "logo-mse-connect-fr"))
+                )
+                driver.execute_script("arguments[0].click();", mse_connect_button)
+                sleep(self.delay)
         except TimeoutException as e:
             self._critical_error("Choix Messervices", "Logo MSE Connect non trouvé", e)
 
         # Step 3: Input credentials and submit
         logger.info("Inputting credentials")
         try:
-            wait = WebDriverWait(driver, 20)
-            username_input = wait.until(
-                EC.presence_of_element_located((By.ID, "login_login"))
-            )
-            password_input = wait.until(
-                EC.presence_of_element_located((By.ID, "login_password"))
-            )
+            with self.timer.step("saisie identifiants"):
+                wait = WebDriverWait(driver, 20)
+                username_input = wait.until(
+                    EC.presence_of_element_located((By.ID, "login_login"))
+                )
+                password_input = wait.until(
+                    EC.presence_of_element_located((By.ID, "login_password"))
+                )
 
-            username_input.send_keys(self.email)
-            password_input.send_keys(self.password)
+                username_input.send_keys(self.email)
+                password_input.send_keys(self.password)
 
-            logger.info("Submitting the form")
-            password_input.send_keys(Keys.RETURN)
-            sleep(self.delay)
+                logger.info("Submitting the form")
+                password_input.send_keys(Keys.RETURN)
+                sleep(self.delay)
         except TimeoutException as e:
             self._critical_error("Saisie identifiants", "Champs login/password non trouvés", e)
 
@@ -122,13 +149,22 @@ class Authenticator:
 
         # Step 5: Force update the auth status
         try:
-            driver.get("https://trouverunlogement.lescrous.fr/mse/discovery/connect")
-            sleep(3)
+            with self.timer.step("redirection auth"):
+                driver.get("https://trouverunlogement.lescrous.fr/mse/discovery/connect")
+                self._wait_page_ready(driver)
         except Exception as e:
             self._critical_error("Redirection auth", "Impossible d'accéder à la page de découverte", e)
 
-        # Done
-        logger.info("Successfully authenticated to the CROUS website")
+    def _wait_page_ready(self, driver: WebDriver, timeout: int = None) -> bool:
+        """Attend que le document courant soit chargé. Retourne False si le délai est dépassé."""
+        try:
+            WebDriverWait(driver, timeout or self.step_timeout).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+            return True
+        except TimeoutException:
+            logger.warning("⚠️ Page toujours en chargement après le délai d'attente")
+            return False
 
     def _ensure_french_language(self, driver: WebDriver) -> None:
         """Vérifie que la page est en français et force le changement si nécessaire."""
@@ -164,7 +200,9 @@ class Authenticator:
             
             logger.info("Changement vers la langue française...")
             driver.execute_script("arguments[0].click();", french_link)
-            sleep(3)  # Attendre le rechargement de la page
+            # Attendre le rechargement de la page
+            WebDriverWait(driver, 20).until(EC.staleness_of(french_link))
+            self._wait_page_ready(driver)
             
             logger.info("✅ Langue changée vers le français")
             
@@ -177,76 +215,81 @@ class Authenticator:
             # Continuer quand même pour le changement de langue (non critique)
 
     def _validate_rules(self, driver: WebDriver) -> None:
-        """Handle captcha and final login submit with improved waiting."""
+        """Handle captcha and final login submit, waiting on page conditions instead of fixed delays."""
         logger.info("Handling captcha and submitting login")
 
         wait = WebDriverWait(driver, 20)
         
-        # Step 1: Gérer le captcha avec attente
-        try:
-            logger.info("Recherche de la checkbox captcha...")
-            # Attendre que la checkbox soit présente et cliquable
-            checkbox = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "input[id*='login[altcha]_checkbox']"))
-            )
-            driver.execute_script("arguments[0].click();", checkbox)
-            logger.info(f"Captcha checkbox trouvée et cliquée avec ID: {checkbox.get_attribute('id')}")
-            
-            # Attendre plus longtemps que le captcha se valide
-            logger.info("Attente de la validation du captcha...")
-            sleep(10)  # Délai plus long pour la validation du captcha
-            
-        except TimeoutException:
-            logger.warning("Captcha checkbox non trouvée dans les 20 secondes")
-            # Essayer l'ancienne méthode en fallback
+        # Step 1: Gérer le captcha puis attendre que le widget altcha soit validé
+        with self.timer.step("captcha"):
             try:
-                checkbox = driver.find_element(By.ID, "login[altcha]_checkbox")
+                logger.info("Recherche de la checkbox captcha...")
+                # Attendre que la checkbox soit présente et cliquable
+                checkbox = wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "input[id*='login[altcha]_checkbox']"))
+                )
                 driver.execute_script("arguments[0].click();", checkbox)
-                sleep(10)
-                logger.info("Captcha checkbox trouvée avec ID fixe (fallback)")
-            except NoSuchElementException:
-                # Le captcha peut ne pas être présent parfois
-                logger.info("Aucune checkbox captcha trouvée, peut-être déjà validée")
-
-        # Step 2: Soumettre le formulaire de login
+                logger.info(f"Captcha checkbox trouvée et cliquée avec ID: {checkbox.get_attribute('id')}")
+                self._wait_captcha_verified(driver)
+
+            except TimeoutException:
+                logger.warning("Captcha checkbox non trouvée dans les 20 secondes")
+                # Essayer l'ancienne méthode en fallback
+                try:
+                    checkbox = driver.find_element(By.ID, "login[altcha]_checkbox")
+                    driver.execute_script("arguments[0].click();", checkbox)
+                    logger.info("Captcha checkbox trouvée avec ID fixe (fallback)")
+                    self._wait_captcha_verified(driver)
+                except NoSuchElementException:
+                    # Le captcha peut ne pas être présent parfois
+                    logger.info("Aucune checkbox captcha trouvée, peut-être déjà validée")
+
+        # Step 2: Soumettre le formulaire de login et attendre le changement d'URL
         try:
-            logger.info("Recherche du bouton de soumission...")
-            submit_button = wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//button[@type='submit' and contains(text(), \"S'identifier\")]"))
-            )
-            driver.execute_script("arguments[0].click();", submit_button)
-            logger.info("Formulaire de login soumis")
-            
-            # Attendre que la page se charge après soumission
-            sleep(15)  # Délai plus long après soumission
+            with self.timer.step("soumission login"):
+                logger.info("Recherche du bouton de soumission...")
+                submit_button = wait.until(
+                    EC.element_to_be_clickable((By.XPATH, "//button[@type='submit' and contains(text(), \"S'identifier\")]"))
+                )
+                url_before_submit = driver.current_url
+                driver.execute_script("arguments[0].click();", submit_button)
+                logger.info("Formulaire de login soumis")
             
         except TimeoutException as e:
             self._critical_error("Soumission login", "Bouton \"S'identifier\" non trouvé", e)
 
         # Attendre que la redirection se fasse complètement
-        logger.info("Attente de la redirection complète...")
-        sleep(10)
-        
-        # Gérer les éventuelles alertes de vérification
-        self._handle_verification_alert(driver)
+        with self.timer.step("redirection post-login"):
+            logger.info("Attente de la redirection complète...")
+            try:
+                WebDriverWait(driver, self.step_timeout).until(EC.url_changes(url_before_submit))
+            except UnexpectedAlertPresentException:
+                pass  # L'alerte de vérification est gérée juste après
+            except TimeoutException:
+                logger.warning(f"⚠️ URL inchangée après {self.step_timeout}s, on continue")
+            self._handle_verification_alert(driver)
+            self._wait_page_ready(driver)
 
         # Étapes de navigation post-login avec attentes améliorées
         try:
-            logger.info("Recherche de l'image 'En résidence'...")
-            # Gérer les alertes avant de chercher l'élément
-            self._handle_verification_alert(driver)
-            
-            residence_img = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "img[alt*='En résidence']"))
-            )
-            driver.execute_script("arguments[0].click();", residence_img)
-            sleep(self.delay)
-            logger.info("Image 'En résidence' trouvée et cliquée")
+            with self.timer.step("clic En résidence"):
+                logger.info("Recherche de l'image 'En résidence'...")
+                # Gérer les alertes avant de chercher l'élément
+                self._handle_verification_alert(driver)
+
+                known_handles = driver.window_handles
+                residence_img = wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "img[alt*='En résidence']"))
+                )
+                driver.execute_script("arguments[0].click();", residence_img)
+                sleep(self.delay)
+                logger.info("Image 'En résidence' trouvée et cliquée")
         except UnexpectedAlertPresentException:
             logger.warning("Alerte de vérification détectée, gestion de l'alerte...")
             self._handle_verification_alert(driver)
             # Réessayer après avoir géré l'alerte
             try:
+                known_handles = driver.window_handles
                 residence_img = wait.until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, "img[alt*='En résidence']"))
                 )
@@ -259,113 +302,128 @@ class Authenticator:
             self._critical_error("Navigation - En résidence", "Image 'En résidence' non trouvée", e)
 
         # Gérer les fenêtres/onglets
-        self._switch_to_latest_window(driver)
+        with self.timer.step("changement de fenêtre 1"):
+            self._switch_to_latest_window(driver, known_handles)
 
         # Sélectionner l'année courante
         try:
-            logger.info("Recherche du bouton radio année prochaine...")
-            current_year_radio = wait.until(
-                EC.element_to_be_clickable((By.ID, "PeriodField-currentSchoolYear"))
-            )
-            driver.execute_script("arguments[0].click();", current_year_radio)
-            sleep(self.delay)
-            logger.info("Année courante sélectionnée")
+            with self.timer.step("sélection année"):
+                logger.info("Recherche du bouton radio année prochaine...")
+                current_year_radio = wait.until(
+                    EC.element_to_be_clickable((By.ID, "PeriodField-currentSchoolYear"))
+                )
+                driver.execute_script("arguments[0].click();", current_year_radio)
+                sleep(self.delay)
+                logger.info("Année courante sélectionnée")
         except TimeoutException as e:
             self._critical_error("Sélection année", "Radio bouton 'PeriodField-currentSchoolYear' non trouvé", e) 
 
-        # Remplir le champ ville
-        try:
-            logger.info("Recherche du champ ville...")
-            city_input = wait.until(
-                EC.element_to_be_clickable((By.ID, "PlaceAutocompletearia-autocomplete-1-input"))
-            )
-            city_input.clear()
-            city_input.send_keys(settings.RESIDENCES_VILLE)
-            sleep(10)  # Attendre que l'autocomplétion se charge
-            logger.info(f"Ville '{settings.RESIDENCES_VILLE}' saisie")
-        except TimeoutException as e:
-            self._critical_error("Saisie ville", f"Champ ville 'PlaceAutocompletearia-autocomplete-1-input' non trouvé", e)
-
-        # Sélectionner la première option
-        try:
-            logger.info("Recherche de la première option ville...")
-            first_option = wait.until(
-                EC.element_to_be_clickable((By.ID, "PlaceAutocompletearia-autocomplete-1-option--0"))
-            )
-            driver.execute_script("arguments[0].click();", first_option)
-            sleep(self.delay)
-            logger.info("Première option ville sélectionnée")
-        except TimeoutException as e:
-            self._critical_error("Sélection option ville", "Première option ville 'PlaceAutocompletearia-autocomplete-1-option--0' non trouvée", e)
+        # Remplir le champ ville et sélectionner la première option dès qu'elle est affichée
+        self._fill_city_autocomplete(driver, "Saisie ville", "Sélection option ville")
 
         # Lancer la recherche
         try:
-            logger.info("Recherche du bouton 'Lancer une recherche'...")
-            search_button = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button.fr-btn.svelte-w11odb"))
-            )
-            driver.execute_script("arguments[0].click();", search_button)
-            sleep(self.delay)
-            logger.info("Bouton 'Lancer une recherche' cliqué")
+            with self.timer.step("lancement recherche"):
+                logger.info("Recherche du bouton 'Lancer une recherche'...")
+                known_handles = driver.window_handles
+                search_button = wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "button.fr-btn.svelte-w11odb"))
+                )
+                driver.execute_script("arguments[0].click();", search_button)
+                sleep(self.delay)
+                logger.info("Bouton 'Lancer une recherche' cliqué")
         except TimeoutException as e:
             self._critical_error("Lancement recherche", "Bouton 'Lancer une recherche' (button.fr-btn.svelte-w11odb) non trouvé", e)
 
         # Gérer les fenêtres/onglets à nouveau
-        self._switch_to_latest_window(driver)
+        with self.timer.step("changement de fenêtre 2"):
+            self._switch_to_latest_window(driver, known_handles)
 
         # Passer à la recherche de logements
         try:
-            logger.info("Recherche du bouton 'Passer à la recherche de logements'...")
-            submit_search = wait.until(
-                EC.element_to_be_clickable((By.NAME, "searchSubmit"))
-            )
-            driver.execute_script("arguments[0].click();", submit_search)
-            sleep(self.delay)
-            logger.info("Bouton 'Passer à la recherche de logements' cliqué")
+            with self.timer.step("passage recherche logements"):
+                logger.info("Recherche du bouton 'Passer à la recherche de logements'...")
+                known_handles = driver.window_handles
+                submit_search = wait.until(
+                    EC.element_to_be_clickable((By.NAME, "searchSubmit"))
+                )
+                driver.execute_script("arguments[0].click();", submit_search)
+                sleep(self.delay)
+                logger.info("Bouton 'Passer à la recherche de logements' cliqué")
         except TimeoutException as e:
             self._critical_error("Passage recherche logements", "Bouton 'searchSubmit' non trouvé", e)
 
         # Gérer les fenêtres/onglets une dernière fois
-        self._switch_to_latest_window(driver)
+        with self.timer.step("changement de fenêtre 3"):
+            self._switch_to_latest_window(driver, known_handles)
 
         # Remplir le champ ville final
+        self._fill_city_autocomplete(driver, "Saisie ville finale", "Sélection option ville finale")
+        
+        logger.info("Navigation post-login terminée, prêt pour le scraping")
+
+    def _wait_captcha_verified(self, driver: WebDriver) -> None:
+        """Attend que le widget altcha signale la validation (au lieu d'un délai fixe)."""
+        logger.info("Attente de la validation du captcha...")
         try:
-            logger.info("Recherche du champ ville final...")
-            final_city_input = wait.until(
-                EC.element_to_be_clickable((By.ID, "PlaceAutocompletearia-autocomplete-1-input"))
+            WebDriverWait(driver, self.step_timeout, poll_frequency=0.25).until(
+                lambda d: d.execute_script(ALTCHA_VERIFIED_JS)
             )
-            final_city_input.clear()
-            final_city_input.send_keys(settings.RESIDENCES_VILLE)
-            sleep(10)  # Attendre l'autocomplétion
-            logger.info(f"Ville finale '{settings.RESIDENCES_VILLE}' saisie")
+            logger.info("Captcha validé")
+        except TimeoutException:
+            logger.warning(f"⚠️ Captcha non confirmé après {self.step_timeout}s, on tente la soumission")
+
+    def _fill_city_autocomplete(self, driver: WebDriver, input_step: str, option_step: str) -> None:
+        """Saisit la ville puis clique sur la première suggestion dès qu'elle est rendue."""
+        wait = WebDriverWait(driver, 20)
+
+        try:
+            with self.timer.step(input_step.lower()):
+                logger.info(f"{input_step}: recherche du champ ville...")
+                city_input = wait.until(
+                    EC.element_to_be_clickable((By.ID, "PlaceAutocompletearia-autocomplete-1-input"))
+                )
+                city_input.clear()
+                city = get_settings().RESIDENCES_VILLE
+                city_input.send_keys(city)
+                logger.info(f"Ville '{city}' saisie")
         except TimeoutException as e:
-            self._critical_error("Saisie ville finale", "Champ ville final 'PlaceAutocompletearia-autocomplete-1-input' non trouvé", e)
+            self._critical_error(input_step, "Champ ville 'PlaceAutocompletearia-autocomplete-1-input' non trouvé", e)
 
-        # Sélectionner la première option finale
         try:
-            logger.info("Recherche de la première option ville finale...")
-            final_first_option = wait.until(
-                EC.element_to_be_clickable((By.ID, "PlaceAutocompletearia-autocomplete-1-option--0"))
-            )
-            driver.execute_script("arguments[0].click();", final_first_option)
-            sleep(self.delay)
-            logger.info("Première option ville finale sélectionnée")
+            with self.timer.step(option_step.lower()):
+                logger.info("Attente de la première option ville...")
+                # L'attente se termine dès que l'autocomplétion a rendu l'option
+                first_option = WebDriverWait(driver, self.step_timeout, poll_frequency=0.25).until(
+                    EC.element_to_be_clickable((By.ID, "PlaceAutocompletearia-autocomplete-1-option--0"))
+                )
+                driver.execute_script("arguments[0].click();", first_option)
+                sleep(self.delay)
+                logger.info("Première option ville sélectionnée")
         except TimeoutException as e:
-            self._critical_error("Sélection option ville finale", "Première option ville finale 'PlaceAutocompletearia-autocomplete-1-option--0' non trouvée", e)
-        
-        logger.info("Navigation post-login terminée, prêt pour le scraping")
+            self._critical_error(option_step, "Première option ville 'PlaceAutocompletearia-autocomplete-1-option--0' non trouvée", e)
 
-    def _switch_to_latest_window(self, driver: WebDriver) -> None:
-        """Switch to the latest opened window/tab."""
+    def _switch_to_latest_window(self, driver: WebDriver, known_handles: list = None) -> None:
+        """Switch to the newly opened window/tab as soon as its handle is available."""
         try:
+            if known_handles is not None:
+                try:
+                    # Un nouvel onglet apparaît quasi immédiatement après le clic
+                    WebDriverWait(driver, 5, poll_frequency=0.2).until(
+                        lambda d: len(d.window_handles) > len(known_handles)
+                    )
+                except TimeoutException:
+                    pass
+
             windows = driver.window_handles
+            new_windows = [w for w in windows if known_handles is None or w not in known_handles]
             if len(windows) > 1:
-                driver.switch_to.window(windows[-1])
+                driver.switch_to.window(new_windows[-1] if new_windows else windows[-1])
                 logger.info(f"Basculé vers la fenêtre {len(windows)}")
-                sleep(10)  # Attendre que la nouvelle fenêtre se charge
-                
-                # Gérer les alertes éventuelles dans la nouvelle fenêtre
-                self._handle_verification_alert(driver)
+
+            # Attendre que la fenêtre courante soit chargée
+            self._handle_verification_alert(driver)
+            self._wait_page_ready(driver)
         except Exception as e:
             logger.warning(f"Erreur lors du changement de fenêtre: {e}")
 
@@ -383,9 +441,9 @@ class Authenticator:
                 alert.accept()
                 logger.info("✅ Alerte de vérification acceptée")
                 
-                # Attendre plus longtemps pour que la vérification se termine
-                sleep(20)
-                logger.info("⏳ Attente supplémentaire de 20s pour la vérification...")
+                # Attendre la fin de la vérification : nouvelle alerte ou page chargée
+                with self.timer.step("alerte de vérification"):
+                    self._wait_alert_or_ready(driver)
                 
                 # Vérifier s'il y a d'autres alertes en cascade
                 self._handle_verification_alert(driver)
@@ -394,8 +452,21 @@ class Authenticator:
                 # Autre type d'alerte, l'accepter quand même
                 logger.warning(f"⚠️ Alerte inattendue détectée: '{alert_text}'")
                 alert.accept()
-                sleep(5)
+                self._wait_alert_or_ready(driver)
                 
         except Exception:
             # Pas d'alerte présente, c'est normal
-            pass
\ No newline at end of file
+            pass
+
+    def _wait_alert_or_ready(self, driver: WebDriver) -> None:
+        def alert_or_ready(d: WebDriver) -> bool:
+            try:
+                d.switch_to.alert
+                return True
+            except NoAlertPresentException:
+                return d.execute_script("return document.readyState") == "complete"
+
+        try:
+            WebDriverWait(driver, self.step_timeout, poll_frequency=0.5).until(alert_or_ready)
+        except TimeoutException:
+            logger.warning(f"⚠️ Vérification toujours en cours après {self.step_timeout}s")
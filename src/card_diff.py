@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.models import Accommodation
+
+PreviousCards = Dict[int, Tuple[Optional[str], Optional[str]]]  # ID -> (empreinte, prix)
+
+
+@dataclass
+class CardDiff:
+    """Différence entre deux passages complets sur une zone"""
+    added: List[Accommodation] = field(default_factory=list)
+    removed: Set[int] = field(default_factory=set)
+    modified: List[Tuple[Accommodation, Optional[str]]] = field(default_factory=list)  # (carte, prix précédent)
+
+    def price_changes(self) -> List[Tuple[Accommodation, str]]:
+        """Cartes modifiées dont le prix a changé, avec le prix précédent"""
+        return [
+            (acc, previous_price)
+            for acc, previous_price in self.modified
+            if previous_price is not None and acc.price is not None and str(acc.price) != previous_price
+        ]
+
+
+def diff_cards(previous: PreviousCards, accommodations: Iterable[Accommodation]) -> CardDiff:
+    """Compare les cartes d'un passage au dernier instantané de la zone, en un seul parcours.
+
+    Une carte est modifiée quand son empreinte change ; sans empreinte précédente (instantané
+    antérieur aux empreintes), elle est considérée inchangée.
+    """
+    diff = CardDiff()
+    current: Set[int] = set()
+    for acc in accommodations:
+        if not acc.id or acc.id in current:
+            continue
+        current.add(acc.id)
+        if acc.id not in previous:
+            diff.added.append(acc)
+            continue
+        previous_hash, previous_price = previous[acc.id]
+        if previous_hash and acc.card_hash and previous_hash != acc.card_hash:
+            diff.modified.append((acc, previous_price))
+    diff.removed = set(previous) - current
+    return diff
@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class DetailCache:
+    """Cache disque des photos des pages détaillées, indexé par ID de logement.
+
+    Les entrées expirent après `ttl` secondes et les plus anciennes sont évincées
+    au-delà de `max_entries`. Une entrée enregistrée avec l'empreinte de la carte n'est
+    plus servie quand la carte change (prix, descriptif, photo principale).
+    """
+
+    def __init__(self, path: str = "detail_cache.json", ttl: int = 7 * 24 * 3600, max_entries: int = 2000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, dict] = self._load()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            logger.info(f"📂 {len(entries)} pages détaillées en cache")
+            return entries
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cache des pages détaillées illisible, ignoré : {e}")
+            return {}
+
+    def get(self, accommodation_id: int, card_hash: Optional[str] = None) -> Optional[List[str]]:
+        """Retourne les URLs des photos en cache, ou None si absentes, expirées ou d'une autre version de la carte."""
+        entry = self._entries.get(str(accommodation_id))
+        if entry and card_hash and entry.get("card_hash") not in (None, card_hash):
+            self.invalidate(accommodation_id)
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="detail", result="stale")
+            return None
+        if entry and time.time() - entry["cached_at"] <= self.ttl:
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="detail", result="hit")
+            return entry["images"]
+        self.misses += 1
+        CACHE_REQUESTS.inc(cache="detail", result="miss")
+        return None
+
+    def put(self, accommodation_id: int, images: List[str], card_hash: Optional[str] = None) -> None:
+        self._entries[str(accommodation_id)] = {"images": [str(url) for url in images], "cached_at": time.time(), "card_hash": card_hash}
+        self._dirty = True
+
+    def invalidate(self, accommodation_id: int) -> None:
+        if self._entries.pop(str(accommodation_id), None) is not None:
+            self._dirty = True
+
+    def _evict(self) -> None:
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if now - entry["cached_at"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            oldest = sorted(self._entries, key=lambda key: self._entries[key]["cached_at"])[:overflow]
+            for key in oldest:
+                del self._entries[key]
+
+        if expired or overflow > 0:
+            self._dirty = True
+
+    def save(self) -> None:
+        """Évince les entrées expirées/en trop puis écrit le cache de façon atomique."""
+        self._evict()
+        if not self._dirty:
+            return
+
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
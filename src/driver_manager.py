@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from src.metrics import CHROME_RSS_MB
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_chromedriver(cache_file: str, max_age: int, pinned_path: Optional[str] = None, refresh: bool = False) -> str:
+    """Chemin de chromedriver : épinglé, sinon en cache (exécutable et récent), sinon résolu par webdriver_manager puis mis en cache.
+
+    `refresh=True` ignore le cache (ex. Chrome mis à jour depuis la dernière résolution).
+    """
+    if pinned_path:
+        return pinned_path
+
+    cache_path = Path(cache_file)
+    if not refresh:
+        try:
+            entry = json.loads(cache_path.read_text(encoding="utf-8"))
+            if os.access(entry["path"], os.X_OK) and time.time() - entry["resolved_at"] <= max_age:
+                return entry["path"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    # Import coûteux (et vérification des versions en ligne) seulement si le cache ne suffit pas
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    started = perf_counter()
+    driver_path = ChromeDriverManager().install()
+    logger.info(f"🔧 chromedriver résolu en {perf_counter() - started:.1f}s : {driver_path}")
+
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps({"path": driver_path, "resolved_at": time.time()}), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+    return driver_path
+
+
+def tmpfs_profile_root(path: Optional[str], min_free_mb: int = 256) -> Optional[str]:
+    """Retourne `path` s'il peut accueillir les profils Chrome (tmpfs assez grand), sinon None (dossier temporaire par défaut)."""
+    if not path or not os.path.isdir(path) or not os.access(path, os.W_OK):
+        return None
+    free_mb = shutil.disk_usage(path).free / 1024 / 1024
+    if free_mb < min_free_mb:
+        logger.info(f"{path} trop petit pour le profil Chrome ({free_mb:.0f} Mo libres), dossier temporaire par défaut utilisé")
+        return None
+    return path
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """RSS cumulée (Mo) d'un processus et de ses descendants, lue dans /proc. None hors Linux."""
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    children: dict[int, List[int]] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            # Le nom du processus (2e champ) peut contenir des espaces : découper après la parenthèse fermante
+            stat = (entry / "stat").read_text()
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry.name))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            resident_pages = int((proc / str(current) / "statm").read_text().split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        total += resident_pages * page_size
+        pending.extend(children.get(current, []))
+    return total / 1024 / 1024
+
+
+class DriverManager:
+    """Garde un Chrome « chaud » entre les cycles du mode --loop.
+
+    Avant chaque cycle le navigateur est vérifié (il doit répondre à un script) ; il est
+    recyclé après `max_cycles` cycles, si sa mémoire (chromedriver + Chrome) dépasse
+    `max_rss_mb` ou s'il ne répond plus. `discard()` le ferme après une erreur de cycle.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], "WebDriver"],
+        cleanup: Callable[["WebDriver"], None],
+        max_cycles: int = 20,
+        max_rss_mb: float = 1500,
+    ):
+        self.factory = factory
+        self.cleanup = cleanup
+        self.max_cycles = max_cycles
+        self.max_rss_mb = max_rss_mb
+        self.driver: Optional["WebDriver"] = None
+        self.cycles = 0  # cycles servis par le navigateur courant
+        self.starts = 0
+        self.reuses = 0
+        self.startup_seconds = 0.0
+        self.peak_rss_mb = 0.0
+
+    def acquire(self) -> "WebDriver":
+        """Retourne le navigateur chaud s'il est sain, sinon en démarre un nouveau."""
+        if self.driver is not None:
+            reason = self._recycle_reason()
+            if reason:
+                logger.info(f"♻️ Recyclage de Chrome : {reason}")
+                self.discard()
+            else:
+                self.reuses += 1
+                logger.info(f"🔥 Chrome réutilisé (cycle {self.cycles + 1}/{self.max_cycles})")
+
+        if self.driver is None:
+            started = perf_counter()
+            self.driver = self.factory()
+            elapsed = perf_counter() - started
+            self.starts += 1
+            self.startup_seconds += elapsed
+            logger.info(f"🚀 Chrome démarré en {elapsed:.1f}s")
+
+        self.cycles += 1
+        return self.driver
+
+    def rss_mb(self) -> Optional[float]:
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        if process is None:
+            return None
+        rss = process_tree_rss_mb(process.pid)
+        if rss is not None:
+            CHROME_RSS_MB.set(rss)
+        return rss
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self.cycles >= self.max_cycles:
+            return f"{self.cycles} cycles effectués"
+        if not self._healthy():
+            return "le navigateur ne répond plus"
+        rss = self.rss_mb()
+        if rss is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+            if rss > self.max_rss_mb:
+                return f"mémoire {rss:.0f} Mo > {self.max_rss_mb:.0f} Mo"
+        return None
+
+    def _healthy(self) -> bool:
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            return self.driver.execute_script("return 1") == 1 and bool(self.driver.window_handles)
+        except WebDriverException:
+            return False
+
+    def park(self) -> None:
+        """Entre deux cycles : page vide pour que Chrome n'exécute plus rien en attendant."""
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            self.driver.get("about:blank")
+        except WebDriverException as e:
+            logger.warning(f"Chrome ne répond plus après le cycle, il sera recyclé : {e}")
+            self.discard()
+
+    def discard(self) -> None:
+        """Ferme le navigateur courant (le prochain acquire() en démarre un nouveau)."""
+        if self.driver is not None:
+            self.cleanup(self.driver)
+        self.driver = None
+        self.cycles = 0
+
+    def close(self) -> None:
+        self.discard()
+
+    def log_report(self) -> None:
+        if not self.starts:
+            return
+        average_startup = self.startup_seconds / self.starts
+        rss = self.rss_mb() if self.driver is not None else None
+        rss_info = f", mémoire actuelle {rss:.0f} Mo (pic {max(self.peak_rss_mb, rss):.0f} Mo)" if rss is not None else ""
+        logger.info(
+            f"📊 Chrome : {self.starts} démarrage(s) (moyenne {average_startup:.1f}s), {self.reuses} réutilisation(s) "
+            f"soit ~{self.reuses * average_startup:.0f}s de démarrage évités{rss_info}"
+        )
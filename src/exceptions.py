@@ -0,0 +1,3 @@
+class AuthenticationError(Exception):
+    """Exception levée en cas d'erreur critique d'authentification"""
+    pass
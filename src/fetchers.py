@@ -0,0 +1,196 @@
+import logging
+import threading
+from time import sleep
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.metrics import PAGE_LOADS
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+
+class FetchError(Exception):
+    """Exception levée quand une page ne peut pas être récupérée correctement"""
+    pass
+
+
+class PageFetcher:
+    """Transport utilisé par le Parser pour récupérer le HTML d'une page."""
+
+    # True si fetch() peut être appelé depuis plusieurs threads en parallèle
+    supports_concurrency = False
+    # True si les logements récupérés ont leurs coordonnées (fusion des zones de recherche)
+    provides_coordinates = False
+    # Nom du transport dans les métriques (PARSER_TRANSPORT)
+    transport = "driver"
+
+    def __init__(self):
+        self.page_loads = 0
+        self._page_loads_lock = threading.Lock()
+
+    def _record_page_load(self) -> None:
+        with self._page_loads_lock:
+            self.page_loads += 1
+        PAGE_LOADS.inc(transport=self.transport)
+
+    def fetch(self, url: str, settle_delay: float | None = None, timeout: float | None = None) -> Tuple[str, str]:
+        """Retourne (URL finale après redirections, HTML de la page)."""
+        raise NotImplementedError
+
+    def fetch_if_modified(self, url: str, validators: Dict[str, str]) -> Tuple[str, Optional[str], Dict[str, str]]:
+        """Comme fetch(), avec les validateurs HTTP du passage précédent.
+
+        Retourne (URL finale, HTML ou None si la page n'a pas changé, nouveaux validateurs).
+        Sans requête conditionnelle possible, la page est toujours chargée.
+        """
+        current_url, html = self.fetch(url)
+        return current_url, html, {}
+
+    def close(self) -> None:
+        pass
+
+
+class DriverFetcher(PageFetcher):
+    """Charge les pages dans le navigateur authentifié (rendu complet)."""
+
+    def __init__(self, driver: "WebDriver", settle_delay: float = 2):
+        super().__init__()
+        self.driver = driver
+        self.settle_delay = settle_delay
+
+    def fetch(self, url: str, settle_delay: float | None = None, timeout: float | None = None) -> Tuple[str, str]:
+        self._record_page_load()
+        if timeout is None:
+            self.driver.get(url)
+        else:
+            previous_timeout = self.driver.timeouts.page_load
+            self.driver.set_page_load_timeout(timeout)
+            try:
+                self.driver.get(url)
+            finally:
+                self.driver.set_page_load_timeout(previous_timeout)
+        sleep(self.settle_delay if settle_delay is None else settle_delay)
+        return self.driver.current_url, self.driver.page_source
+
+
+class HttpFetcher(PageFetcher):
+    """Récupère les pages par simple GET HTTP avec les cookies de la session authentifiée.
+
+    La session requests garde les connexions ouvertes (keep-alive) dans un pool,
+    Chrome n'est alors nécessaire que pour le login.
+    """
+
+    supports_concurrency = True
+    transport = "http"
+
+    def __init__(self, session: requests.Session, timeout: float = 15):
+        super().__init__()
+        self.session = session
+        self.timeout = timeout
+
+    @classmethod
+    def from_driver(cls, driver: "WebDriver", pool_size: int = 10, timeout: float = 15, **options: Any) -> "HttpFetcher":
+        """Construit une session HTTP qui reprend les cookies et l'User-Agent du driver connecté."""
+        session = requests.Session()
+
+        retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        session.headers.update({
+            "User-Agent": driver.execute_script("return navigator.userAgent"),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "fr-FR,fr;q=0.9",
+        })
+
+        # get_cookies() ne renvoie que les cookies du domaine courant : passer par CDP
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        for cookie in cookies:
+            session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+                secure=cookie.get("secure", False),
+            )
+        logger.info(f"🍪 {len(cookies)} cookies copiés du navigateur vers la session HTTP")
+
+        return cls(session, timeout=timeout, **options)
+
+    def fetch(self, url: str, settle_delay: float | None = None, timeout: float | None = None) -> Tuple[str, str]:
+        # Pas de rendu JavaScript à attendre : settle_delay est ignoré
+        response = self._get(url, timeout=timeout or self.timeout)
+        return response.url, response.text
+
+    def fetch_if_modified(self, url: str, validators: Dict[str, str]) -> Tuple[str, Optional[str], Dict[str, str]]:
+        headers = {}
+        if validators.get("ETag"):
+            headers["If-None-Match"] = validators["ETag"]
+        if validators.get("Last-Modified"):
+            headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        response = self._get(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304:
+            return response.url, None, validators
+        new_validators = {name: response.headers[name] for name in ("ETag", "Last-Modified") if name in response.headers}
+        return response.url, response.text, new_validators
+
+    def _get(self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        self._record_page_load()
+        response = self.session.get(url, timeout=timeout, headers=headers)
+        response.raise_for_status()
+        if "charset" not in response.headers.get("Content-Type", ""):
+            # Sans charset explicite, requests suppose ISO-8859-1 : les pages CROUS sont en UTF-8
+            response.encoding = "utf-8"
+
+        # Une redirection hors du site CROUS signifie que la session n'est plus authentifiée
+        if urlsplit(response.url).netloc != urlsplit(url).netloc:
+            raise FetchError(f"Redirigé vers {response.url}, session HTTP probablement expirée")
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class SearchApiFetcher(HttpFetcher):
+    """Interroge directement l'API JSON de recherche qu'appelle l'application Svelte du site.
+
+    Même session authentifiée que HttpFetcher (fetch() reste disponible pour les pages HTML) ;
+    la réponse donne les coordonnées et les photos de chaque logement.
+    """
+
+    provides_coordinates = True
+    transport = "api"
+
+    def __init__(self, session: requests.Session, api_url: str, timeout: float = 15):
+        super().__init__(session, timeout=timeout)
+        # Endpoint POST JSON (Settings.SEARCH_API_URL), {tool_id} = identifiant de l'outil dans /tools/<id>/search
+        self.api_url = api_url
+
+    @classmethod
+    def from_driver(cls, driver: "WebDriver", api_url: str, pool_size: int = 10, timeout: float = 15) -> "SearchApiFetcher":
+        return super().from_driver(driver, pool_size=pool_size, timeout=timeout, api_url=api_url)
+
+    def search(self, tool_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Une page de résultats de l'outil `tool_id` (la requête compte comme un chargement de page)."""
+        self._record_page_load()
+        response = self.session.post(
+            self.api_url.format(tool_id=tool_id),
+            json=payload,
+            timeout=self.timeout,
+            headers={"Accept": "application/json"},
+        )
+        response.raise_for_status()
+        try:
+            return response.json()
+        except ValueError as e:
+            # Page HTML de connexion au lieu du JSON : session expirée
+            raise FetchError(f"Réponse non JSON de l'API de recherche ({response.url}) : {e}") from e
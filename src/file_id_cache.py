@@ -0,0 +1,67 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.metrics import CACHE_REQUESTS
+
+
+class FileIdCache:
+    """Associe l'URL d'une photo au file_id Telegram obtenu au premier envoi.
+
+    Les envois suivants réutilisent le file_id : Telegram ne retélécharge pas la photo
+    depuis le site CROUS pour chaque destinataire. Les entrées expirent après `max_age`
+    secondes. Thread-safe (utilisé depuis le pool du TelegramDispatcher).
+    """
+
+    def __init__(self, max_age: int = 24 * 3600):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._upload_locks: Dict[Tuple[str, ...], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry and time.time() - entry[1] <= self.max_age:
+                self.hits += 1
+                CACHE_REQUESTS.inc(cache="file_id", result="hit")
+                return entry[0]
+            if entry:
+                del self._entries[url]
+            self.misses += 1
+            CACHE_REQUESTS.inc(cache="file_id", result="miss")
+            return None
+
+    def has(self, url: str) -> bool:
+        """Comme get() mais sans compter de hit/miss."""
+        with self._lock:
+            entry = self._entries.get(url)
+            return bool(entry) and time.time() - entry[1] <= self.max_age
+
+    def put(self, url: str, file_id: str) -> None:
+        with self._lock:
+            self._entries[url] = (file_id, time.time())
+
+    def invalidate(self, urls: Iterable[str]) -> None:
+        with self._lock:
+            for url in urls:
+                self._entries.pop(url, None)
+
+    def upload_lock(self, urls: Iterable[str]) -> threading.Lock:
+        """Verrou par lot de photos : un seul envoi télécharge les photos, les autres attendent son file_id."""
+        key = tuple(urls)
+        with self._lock:
+            return self._upload_locks.setdefault(key, threading.Lock())
+
+    def evict(self) -> int:
+        """Supprime les entrées expirées et les verrous inutilisés. Retourne le nombre d'entrées supprimées."""
+        now = time.time()
+        with self._lock:
+            expired = [url for url, (_, cached_at) in self._entries.items() if now - cached_at > self.max_age]
+            for url in expired:
+                del self._entries[url]
+            for key in [key for key, lock in self._upload_locks.items() if not lock.locked()]:
+                del self._upload_locks[key]
+        return len(expired)
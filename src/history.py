@@ -0,0 +1,272 @@
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import statistics
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from src.models import Accommodation
+
+logger = logging.getLogger(__name__)
+
+# Une ligne par logement et par passage. Les lignes de présence (zone inchangée, cartes non
+# parsées) n'ont que seen_at et id : le logement était encore en ligne à cet instant.
+COLUMNS = ("seen_at", "id", "title", "price", "overview_details", "image_url", "detail_url", "latitude", "longitude")
+AREAS_FILE = "areas.json"
+
+
+def area_key(search_url: str) -> str:
+    """Nom court et stable d'une zone de recherche, utilisé dans les noms de fichiers."""
+    return hashlib.sha1(search_url.encode()).hexdigest()[:12]
+
+
+def complete_members_length(data: bytes) -> int:
+    """Longueur des membres gzip complets en tête de `data` : ce qui suit est un membre tronqué."""
+    view = memoryview(data)
+    offset = 0
+    while offset < len(data):
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        try:
+            # Sortie limitée : seule la fin du membre compte, pas son contenu
+            decompressor.decompress(view[offset:], 1)
+            while not decompressor.eof and decompressor.unconsumed_tail:
+                decompressor.decompress(decompressor.unconsumed_tail, 1 << 16)
+        except zlib.error:
+            break
+        if not decompressor.eof:
+            break
+        offset = len(data) - len(decompressor.unused_data)
+    return offset
+
+
+@dataclass
+class ListingHistory:
+    """Agrégat d'un logement sur la période demandée : une entrée par logement, pas par ligne."""
+    id: int
+    search_url: str
+    first_seen: float
+    last_seen: float
+    observations: int = 0
+    title: Optional[str] = None
+    prices: List[str] = field(default_factory=list)  # prix successifs distincts
+
+    @property
+    def lifetime(self) -> float:
+        return self.last_seen - self.first_seen
+
+
+class SnapshotHistory:
+    """Historique en ajout seul de chaque carte parsée, partitionné par jour.
+
+    `<root>/day=AAAA-MM-JJ/area=<clé>.csv.gz` : CSV à colonnes fixes (`COLUMNS`) compressé en
+    gzip, un membre gzip par passage ajouté en fin de fichier (jamais réécrit). Les partitions
+    `day=` / `area=` se lisent telles quelles avec DuckDB ou Polars (hive partitioning) ;
+    `areas.json` associe chaque clé à son URL de recherche. Une requête n'ouvre que les jours et
+    les zones demandés et lit les lignes au fil de l'eau : la mémoire dépend du nombre de
+    logements distincts, pas de la durée de l'historique, et chaque jour passé est résumé une fois.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._areas: Dict[str, str] = self._load_areas()
+        self._checked: Set[Path] = set()  # partitions dont la fin a été vérifiée par ce processus
+
+    def _load_areas(self) -> Dict[str, str]:
+        try:
+            return json.loads((self.root / AREAS_FILE).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Index des zones de l'historique illisible ({e}), il sera reconstruit")
+            return {}
+
+    def _register_area(self, search_url: str) -> str:
+        key = area_key(search_url)
+        if self._areas.get(key) != search_url:
+            self._areas[key] = search_url
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.root / f"{AREAS_FILE}.tmp"
+            tmp_path.write_text(json.dumps(self._areas, indent=2, sort_keys=True), encoding="utf-8")
+            tmp_path.replace(self.root / AREAS_FILE)
+        return key
+
+    def _partition(self, day: date, key: str) -> Path:
+        return self.root / f"day={day.isoformat()}" / f"area={key}.csv.gz"
+
+    def _append(self, search_url: str, rows: List[list], seen_at: float) -> None:
+        if not rows:
+            return
+        path = self._partition(date.fromtimestamp(seen_at), self._register_area(search_url))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        new_file = not path.exists()
+        if not new_file and path not in self._checked:
+            self._truncate_torn_tail(path)
+        # Mode "a" : nouveau membre gzip en fin de fichier, les passages précédents ne sont pas relus
+        self._checked.discard(path)
+        with gzip.open(path, "at", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(COLUMNS)
+            writer.writerows(rows)
+        self._checked.add(path)
+
+    @staticmethod
+    def _truncate_torn_tail(path: Path) -> None:
+        """Retire le membre tronqué laissé par un arrêt pendant une écriture, avant d'en ajouter un autre.
+
+        Sans cela, le lecteur gzip s'arrêterait à ce membre et ignorerait tous les passages suivants du jour.
+        """
+        data = path.read_bytes()
+        length = complete_members_length(data)
+        if length < len(data):
+            logger.warning(f"Fin de partition tronquée retirée ({len(data) - length} octets) : {path}")
+            with open(path, "r+b") as f:
+                f.truncate(length)
+
+    def record(self, search_url: str, accommodations: Iterable[Accommodation], seen_at: Optional[float] = None) -> None:
+        """Ajoute les cartes parsées d'un passage complet sur une zone."""
+        seen_at = time.time() if seen_at is None else seen_at
+        timestamp = int(seen_at)
+        rows = [
+            [timestamp, acc.id, acc.title, acc.price, acc.overview_details, acc.image_url, acc.detail_url, acc.latitude, acc.longitude]
+            for acc in accommodations
+            if acc.id
+        ]
+        self._append(search_url, rows, seen_at)
+
+    def record_presence(self, search_url: str, listing_ids: Iterable[int], seen_at: Optional[float] = None) -> None:
+        """Zone inchangée depuis son dernier passage : ses logements sont encore en ligne."""
+        seen_at = time.time() if seen_at is None else seen_at
+        timestamp = int(seen_at)
+        self._append(search_url, [[timestamp, listing_id] + [None] * (len(COLUMNS) - 2) for listing_id in listing_ids], seen_at)
+
+    def areas(self, pattern: Optional[str] = None) -> Dict[str, str]:
+        """Zones connues (clé -> URL), filtrées par une sous-chaîne de l'URL."""
+        return {key: url for key, url in self._areas.items() if not pattern or pattern in url}
+
+    def _summary_path(self, data_path: Path) -> Path:
+        return data_path.with_name(data_path.name.replace(".csv.gz", ".summary.json.gz"))
+
+    def day_summary(self, day: date, key: str) -> Dict[int, list]:
+        """Résumé d'une partition : ID -> [première vue, dernière vue, observations, titre, prix successifs].
+
+        Les jours passés ne reçoivent plus de lignes : leur résumé est calculé une fois puis
+        relu, une requête sur un an lit 365 petits résumés par zone au lieu de toutes les lignes.
+        """
+        path = self._partition(day, key)
+        if not path.exists():
+            return {}
+        summary_path = self._summary_path(path)
+        closed = day < date.today()
+        if closed and summary_path.exists() and summary_path.stat().st_mtime >= path.stat().st_mtime:
+            with gzip.open(summary_path, "rt", encoding="utf-8") as f:
+                return {int(listing_id): entry for listing_id, entry in json.load(f).items()}
+
+        summary: Dict[int, list] = {}
+        for row in self._read(path):
+            seen_at, listing_id, title, price = float(row[0]), int(row[1]), row[2], row[3]
+            entry = summary.get(listing_id)
+            if entry is None:
+                entry = summary[listing_id] = [seen_at, seen_at, 0, None, []]
+            entry[0] = min(entry[0], seen_at)
+            entry[1] = max(entry[1], seen_at)
+            entry[2] += 1
+            if title:
+                entry[3] = title
+            if price and (not entry[4] or entry[4][-1] != price):
+                entry[4].append(price)
+        if closed:
+            tmp_path = summary_path.with_name(f"{summary_path.name}.tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(summary, f)
+            tmp_path.replace(summary_path)
+        return summary
+
+    @staticmethod
+    def _read(path: Path) -> Iterator[list]:
+        """Lignes d'une partition au fil de l'eau (sans l'en-tête)."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+                rows = csv.reader(f)
+                next(rows, None)
+                yield from rows
+        except (EOFError, gzip.BadGzipFile) as e:
+            # Dernier membre tronqué (arrêt pendant une écriture, retiré au prochain ajout) : les passages précédents restent lisibles
+            logger.warning(f"Fin de partition illisible, ignorée : {path} ({e})")
+
+    def listings(self, days: int, pattern: Optional[str] = None, today: Optional[date] = None) -> Dict[int, ListingHistory]:
+        """Logements vus sur les `days` derniers jours (aujourd'hui compris) dans les zones dont l'URL contient `pattern`."""
+        today = date.today() if today is None else today
+        area_keys = sorted(self.areas(pattern))
+        listings: Dict[int, ListingHistory] = {}
+        for offset in range(days - 1, -1, -1):
+            day = today - timedelta(days=offset)
+            for key in area_keys:
+                for listing_id, (first_seen, last_seen, observations, title, prices) in self.day_summary(day, key).items():
+                    listing = listings.get(listing_id)
+                    if listing is None:
+                        listing = listings[listing_id] = ListingHistory(listing_id, self._areas[key], first_seen, last_seen)
+                    listing.first_seen = min(listing.first_seen, first_seen)
+                    listing.last_seen = max(listing.last_seen, last_seen)
+                    listing.observations += observations
+                    listing.title = title or listing.title
+                    for price in prices:
+                        if not listing.prices or listing.prices[-1] != price:
+                            listing.prices.append(price)
+        return listings
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds >= 86400:
+        return f"{seconds / 86400:.1f} j"
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 60:.0f} min"
+
+
+def print_listings_report(history: SnapshotHistory, days: int, pattern: Optional[str] = None) -> None:
+    """Sous-commande `history` : logements vus sur la période et durée médiane de mise en ligne.
+
+    Un logement vu au dernier passage de sa zone est encore en ligne : sa durée est minorée et
+    n'entre pas dans la médiane, comme celle des logements déjà en ligne au début de la période.
+    """
+    listings = history.listings(days, pattern)
+    if not listings:
+        print(f"Aucun logement dans l'historique sur {days} jour(s){f' pour les zones contenant « {pattern} »' if pattern else ''}")
+        return
+
+    last_pass: Dict[str, float] = {}
+    first_pass: Dict[str, float] = {}
+    for listing in listings.values():
+        last_pass[listing.search_url] = max(last_pass.get(listing.search_url, 0.0), listing.last_seen)
+        first_pass[listing.search_url] = min(first_pass.get(listing.search_url, listing.first_seen), listing.first_seen)
+
+    print(f"{'ID':>8}  {'première vue':16}  {'dernière vue':16}  {'durée':>8}  {'prix':18}  titre")
+    completed = []
+    for listing in sorted(listings.values(), key=lambda listing: listing.first_seen):
+        online = listing.last_seen >= last_pass[listing.search_url]
+        # Déjà présent au premier passage de la période sur sa zone : date d'arrivée inconnue
+        truncated = listing.first_seen <= first_pass[listing.search_url]
+        if not online and not truncated:
+            completed.append(listing.lifetime)
+        duration = ("≥ " if online or truncated else "") + _format_duration(listing.lifetime)
+        print(
+            f"{listing.id:>8}  {datetime.fromtimestamp(listing.first_seen):%Y-%m-%d %H:%M}  "
+            f"{'en ligne' if online else f'{datetime.fromtimestamp(listing.last_seen):%Y-%m-%d %H:%M}':16}  "
+            f"{duration:>8}  {' → '.join(listing.prices[-3:]):18}  {listing.title or ''}"
+        )
+
+    online_count = sum(1 for listing in listings.values() if listing.last_seen >= last_pass[listing.search_url])
+    price_changes = sum(1 for listing in listings.values() if len(listing.prices) > 1)
+    print()
+    print(f"{len(listings)} logement(s) vu(s) sur {days} jour(s), {online_count} encore en ligne, {price_changes} changement(s) de prix")
+    if completed:
+        print(f"Durée médiane de mise en ligne : {_format_duration(statistics.median(completed))} ({len(completed)} logement(s) apparu(s) puis disparu(s))")
+    else:
+        print("Durée médiane de mise en ligne : aucun logement apparu puis disparu sur la période")
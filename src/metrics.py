@@ -0,0 +1,214 @@
+import logging
+import math
+import os
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# Secondes : du parsing d'une page (ms) au login complet (minutes)
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], lock: threading.Lock):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = lock
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} attend les labels {self.labelnames}, reçu {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str], lock: threading.Lock, buckets: Sequence[float]):
+        super().__init__(name, help_text, labelnames, lock)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Par jeu de labels : [compte par bucket (non cumulé), somme, nombre]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total, count = self._values.get(key) or [[0] * len(self.buckets), 0.0, 0]
+            counts[index] += 1
+            self._values[key] = [counts, total + value, count + 1]
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe la durée du bloc, y compris s'il lève une exception."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{self._labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Métriques au format texte Prometheus, sans dépendance.
+
+    Exportées par fichier (`write_textfile`, pour le textfile collector de node_exporter)
+    et/ou par HTTP (`serve`, GET /metrics). Thread-safe : les métriques sont mises à jour
+    depuis le pool de pages, de pages détaillées et d'envois Telegram.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrique déjà déclarée : {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames, self._lock))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames, self._lock))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, self._lock, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Écriture atomique : le collector ne lit jamais un fichier à moitié écrit."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> None:
+        """Expose /metrics en HTTP depuis un thread démon."""
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                payload = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format: str, *args) -> None:
+                # Pas une ligne de log par scrape
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"📈 Métriques Prometheus exposées sur http://{host}:{port}/metrics")
+
+
+REGISTRY = MetricsRegistry()
+
+# Étapes du cycle
+AUTHENTICATE_SECONDS = REGISTRY.histogram(
+    "crous_authenticate_seconds", "Durée de Authenticator.authenticate_driver", buckets=(5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+)
+CYCLE_SECONDS = REGISTRY.histogram(
+    "crous_cycle_seconds", "Durée d'un cycle complet (driver, login, zones, envois)", buckets=(30, 60, 120, 300, 600, 900, 1200, 1800, 3600)
+)
+AREA_SECONDS = REGISTRY.histogram("crous_area_seconds", "Traitement complet d'une zone de recherche", ["search_url"])
+LAST_CYCLE_TIMESTAMP = REGISTRY.gauge("crous_last_cycle_timestamp_seconds", "Fin du dernier cycle réussi (epoch)")
+
+# Pages : transport et parsing
+PAGE_FETCH_SECONDS = REGISTRY.histogram("crous_page_fetch_seconds", "Chargement d'une page par le transport", ["kind"])
+PAGE_PARSE_SECONDS = REGISTRY.histogram("crous_page_parse_seconds", "Parsing d'une page de résultats ou détaillée", ["kind"])
+DETAIL_ENRICH_SECONDS = REGISTRY.histogram("crous_detail_enrich_seconds", "Récupération des photos d'un logement (page détaillée)")
+PAGE_LOADS = REGISTRY.counter("crous_page_loads_total", "Pages chargées sur le site CROUS", ["transport"])
+UNCHANGED_AREAS = REGISTRY.counter("crous_unchanged_areas_total", "Zones sautées car inchangées depuis le dernier passage")
+CACHE_REQUESTS = REGISTRY.counter("crous_cache_requests_total", "Consultations des caches", ["cache", "result"])
+
+# Telegram
+TELEGRAM_SEND_SECONDS = REGISTRY.histogram("crous_telegram_send_seconds", "Latence d'un envoi Telegram (une tentative)", ["kind"])
+TELEGRAM_RATE_LIMITS = REGISTRY.counter("crous_telegram_rate_limits_total", "TooManyRequestsError reçues de Telegram")
+MEDIA_GROUP_FALLBACKS = REGISTRY.counter("crous_media_group_fallbacks_total", "Carrousels remplacés par une photo ou du texte", ["fallback"])
+TELEGRAM_FAILURES = REGISTRY.counter("crous_telegram_failures_total", "Notifications abandonnées après toutes les tentatives")
+
+# État
+SEEN_IDS = REGISTRY.gauge("crous_seen_ids", "Logements déjà vus (en mémoire)")
+CHROME_RSS_MB = REGISTRY.gauge("crous_chrome_rss_megabytes", "Mémoire résidente de chromedriver + Chrome")
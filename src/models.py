@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import Field, HttpUrl, BaseModel
 
 
@@ -10,12 +10,25 @@ class Accommodation(BaseModel):
     image_url: HttpUrl | None = None  # Photo principale (miniature)
     all_images: List[HttpUrl] = Field(default_factory=list)  # NOUVEAU: toutes les photos
     detail_url: HttpUrl | None = None  # NOUVEAU: URL vers l'annonce complète
+    latitude: float | None = None  # Connues seulement si le transport les fournit
+    longitude: float | None = None
+    card_hash: str | None = None  # Empreinte de la carte (titre, prix, descriptif, photo principale)
+
+
+class SearchProbe(BaseModel):
+    """Empreinte de la première page de résultats, comparée d'un passage à l'autre"""
+    count: Optional[int] = None  # nombre annoncé dans le titre
+    ids_hash: Optional[str] = None  # hash des IDs des cartes dans l'ordre (None si les résultats tiennent sur plusieurs pages)
+    cards_hash: Optional[str] = None  # hash du contenu des cartes (prix, descriptifs...), seulement avec ids_hash
+    validators: Dict[str, str] = Field(default_factory=dict)  # ETag / Last-Modified (transport HTTP)
 
 
 class SearchResults(BaseModel):
     search_url: HttpUrl
     count: Optional[int]
     accommodations: List[Accommodation]
+    probe: Optional[SearchProbe] = None
+    unchanged: bool = False  # Empreinte identique au passage précédent : cartes non parsées
 
 
 class Notification(BaseModel):
@@ -24,8 +37,24 @@ class Notification(BaseModel):
     photo_urls: List[HttpUrl] = Field(default_factory=list)  # NOUVEAU: pour carrousel
 
 
+class UserFilters(BaseModel):
+    """Règles de filtrage d'un utilisateur, appliquées localement sur les résultats partagés"""
+    max_price: Optional[float] = None
+    min_surface: Optional[float] = None  # m²
+    types: List[str] = Field(default_factory=list)  # ex. ["Studio", "T1"] : au moins un
+    keywords: List[str] = Field(default_factory=list)  # au moins un, recherché dans overview_details
+    ignored_ids: List[int] = Field(default_factory=list)
+
+
 class UserConf(BaseModel):
     conf_title: Optional[str]
     telegram_id: str
     search_url: HttpUrl
-    ignored_ids: List[int] = Field(default_factory=list)
\ No newline at end of file
+    ignored_ids: List[int] = Field(default_factory=list)
+    filters: UserFilters = Field(default_factory=UserFilters)
+
+
+class StepTiming(BaseModel):
+    step: str
+    duration: float  # secondes
+    success: bool = True
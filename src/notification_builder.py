@@ -42,4 +42,16 @@ class NotificationBuilder:
                 photo_urls=photo_urls
             ))
 
-        return notifications
\ No newline at end of file
+        return notifications
+
+    def price_change_notification(self, acc: Accommodation, previous_price: str) -> Notification:
+        """Notification d'un changement de prix sur un logement déjà annoncé."""
+        price_str = f"{acc.price}€" if isinstance(acc.price, float) else acc.price
+        previous_str = f"{previous_price}€" if previous_price.replace(".", "", 1).isdigit() else previous_price
+        message_parts = [
+            f"💶 <b>Prix modifié</b> : {escape(acc.title or '')}",
+            f"{escape(previous_str)} → {escape(str(price_str))}",
+        ]
+        if acc.detail_url:
+            message_parts.append(f"🔗 {acc.detail_url}")
+        return Notification(message="\n".join(message_parts))
@@ -1,78 +1,254 @@
+import hashlib
 import logging
-from time import sleep
-from typing import List, Optional
-from bs4 import BeautifulSoup
+import math
+import re
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 from pydantic import HttpUrl
-from selenium.webdriver.chrome.webdriver import WebDriver
 
-from src.models import Accommodation, SearchResults
+from src.detail_cache import DetailCache
+from src.fetchers import DriverFetcher, PageFetcher
+from src.metrics import DETAIL_ENRICH_SECONDS, PAGE_FETCH_SECONDS, PAGE_PARSE_SECONDS
+from src.models import Accommodation, SearchProbe, SearchResults
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
 
 logger = logging.getLogger(__name__)
 
+# Parsing restreint : seuls ces éléments (et leurs descendants) sont construits dans l'arbre
+SEARCH_RESULTS_ONLY = SoupStrainer(["h2", "ul"])  # titre avec le nombre de résultats + liste des cartes
+DETAIL_SLIDER_ONLY = SoupStrainer("section")  # section Slider de la page détaillée
+DETAIL_IMAGES_ONLY = SoupStrainer("img")  # fallback quand le slider est absent
+
+# Sonde de changement : nombre annoncé et IDs des cartes lus dans le HTML brut, sans construire d'arbre
+PROBE_COUNT_PATTERN = re.compile(r'<h2[^>]*class="SearchResults-desktop[^"]*"[^>]*>\s*(\w+)')
+PROBE_CARD_ID_PATTERN = re.compile(r'class="fr-card__title"[^>]*>\s*<a[^>]*href="[^"]*/(\d+)"')
+PROBE_CARDS_START = 'class="fr-grid-row fr-grid-row--gutters'
+PROBE_CARDS_END = ('class="fr-pagination', "<footer")
+
+
+def resolve_parser_backend(backend: str) -> str:
+    """Retourne le backend BeautifulSoup demandé s'il est installé, sinon html.parser"""
+    if builder_registry.lookup(backend) is None:
+        logger.warning(f"Backend de parsing '{backend}' indisponible, utilisation de html.parser")
+        return "html.parser"
+    return backend
+
+
+def _is_accommodation_card(css_class: Optional[str]) -> bool:
+    return bool(css_class) and "fr-col-12" in css_class
+
+
+def card_ids_hash(count: Optional[int], card_ids: List[str]) -> Optional[str]:
+    """Hash des IDs des cartes dans l'ordre, seulement s'ils couvrent tous les résultats annoncés"""
+    # Une page suivante pourrait changer seule : pas d'empreinte pour des résultats sur plusieurs pages
+    if count is None or len(card_ids) != count:
+        return None
+    return hashlib.sha1(",".join(card_ids).encode()).hexdigest()
+
+
+def card_hash(title: Optional[str], price, overview_details: Optional[str], image_url) -> str:
+    """Empreinte stable d'une carte : change avec le titre, le prix, le descriptif ou la photo principale"""
+    fields = (title, price, overview_details, image_url)
+    return hashlib.sha1("\x1f".join("" if value is None else str(value) for value in fields).encode()).hexdigest()[:16]
+
+
+def _cards_markup_hash(html: str) -> Optional[str]:
+    """Hash du balisage brut de la liste des cartes (jusqu'à la pagination ou au pied de page)"""
+    start = html.find(PROBE_CARDS_START)
+    if start < 0:
+        return None
+    ends = [end for end in (html.find(marker, start) for marker in PROBE_CARDS_END) if end >= 0]
+    return hashlib.sha1(html[start:min(ends, default=len(html))].encode()).hexdigest()
+
+
+def probe_search_page(html: str, validators: Optional[Dict[str, str]] = None) -> SearchProbe:
+    """Empreinte d'une première page de résultats : nombre annoncé, hash des IDs des cartes dans l'ordre et de leur contenu"""
+    count = None
+    count_match = PROBE_COUNT_PATTERN.search(html)
+    if count_match:
+        word = count_match.group(1)
+        count = 0 if word == "Aucun" else int(word) if word.isdigit() else None
+
+    ids_hash = card_ids_hash(count, PROBE_CARD_ID_PATTERN.findall(html))
+    cards_hash = _cards_markup_hash(html) if ids_hash else None
+    return SearchProbe(count=count, ids_hash=ids_hash, cards_hash=cards_hash, validators=validators or {})
+
+
+def same_results(probe: SearchProbe, previous_probe: Optional[SearchProbe]) -> bool:
+    """Mêmes résultats qu'au passage précédent : même nombre, mêmes cartes dans le même ordre, même contenu"""
+    if not previous_probe or not probe.ids_hash:
+        return False
+    return (probe.count, probe.ids_hash, probe.cards_hash) == (previous_probe.count, previous_probe.ids_hash, previous_probe.cards_hash)
+
+
+@lru_cache(maxsize=4096)
+def _card_model(accommodation_id: Optional[int], title: str, image_url, detail_url, price, overview_details: str, fingerprint: str) -> Accommodation:
+    """Modèle validé d'une carte, construit une seule fois tant que son empreinte ne change pas"""
+    return Accommodation(
+        id=accommodation_id,
+        title=title,
+        image_url=image_url,
+        detail_url=detail_url,
+        price=price,
+        overview_details=overview_details,
+        card_hash=fingerprint,
+    )
+
+
+def _with_page(url: str, page: int) -> str:
+    """URL de la page `page` des résultats (paramètre `page=`)"""
+    parts = urlsplit(url)
+    params = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != "page"]
+    params.append(("page", str(page)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(params, safe="_"), parts.fragment))
+
 
 class Parser:
     """Class to parse the CROUS website and get the available accommodations"""
 
-    def __init__(self, authenticated_driver: WebDriver):
+    def __init__(
+        self,
+        authenticated_driver: "WebDriver",
+        fetcher: Optional[PageFetcher] = None,
+        detail_concurrency: int = 1,
+        detail_timeout: Optional[float] = None,
+        detail_cache: Optional[DetailCache] = None,
+        parser_backend: str = "html.parser",
+        restrict_parsing: bool = True,
+        page_concurrency: int = 1,
+        max_pages: int = 20,
+    ):
         self.driver = authenticated_driver
+        # Par défaut les pages sont chargées dans le navigateur authentifié
+        self.fetcher = fetcher or DriverFetcher(authenticated_driver)
+        self.detail_concurrency = max(1, detail_concurrency)
+        self.detail_timeout = detail_timeout
+        self.detail_cache = detail_cache
+        self.parser_backend = resolve_parser_backend(parser_backend)
+        self.restrict_parsing = restrict_parsing
+        self.page_concurrency = max(1, page_concurrency)
+        self.max_pages = max_pages
 
-    def get_accommodation_ids(self, search_url: HttpUrl) -> List[int]:
-        """NOUVEAU: Récupère rapidement juste les IDs des logements disponibles (parsing léger)"""
-        self.driver.get(str(search_url))
-        sleep(2)
+    def _make_soup(self, html: str, parse_only: SoupStrainer) -> BeautifulSoup:
+        if self.restrict_parsing:
+            return BeautifulSoup(html, self.parser_backend, parse_only=parse_only)
+        return BeautifulSoup(html, self.parser_backend)
 
-        current_url = self.driver.current_url
-        logger.info(f"Getting accommodation IDs from: {current_url}")
+    def get_accommodations(self, search_url: HttpUrl) -> SearchResults:
+        """Returns the accommodations found on the CROUS website for the given search URL.
 
-        html = self.driver.page_source
-        soup = BeautifulSoup(html, "html.parser")
-        
-        # Trouver la liste principale des logements
-        main_list = soup.find("ul", class_="fr-grid-row fr-grid-row--gutters svelte-11sc5my")
-        if not main_list:
-            logger.warning("Liste principale des logements non trouvée")
-            return []
-            
-        # Trouver tous les éléments <li> des logements
-        accommodation_items = main_list.find_all("li", class_=lambda x: x and "fr-col-12" in x)
-        logger.info(f"Trouvé {len(accommodation_items)} éléments de logement")
-        
-        accommodation_ids = []
-        
-        for item in accommodation_items:
-            # Récupérer juste l'ID à partir de l'URL
-            title_tag = item.find("h3", class_="fr-card__title")
-            if title_tag:
-                link_tag = title_tag.find("a")
-                if link_tag and link_tag.get("href"):
-                    url = link_tag["href"]
-                    try:
-                        accommodation_id = int(url.split("/")[-1])
-                        accommodation_ids.append(accommodation_id)
-                    except (ValueError, IndexError):
-                        logger.warning(f"Impossible d'extraire l'ID depuis l'URL: {url}")
-        
-        logger.info(f"IDs récupérés: {accommodation_ids}")
-        return accommodation_ids
+        All result pages are fetched (concurrently when the transport allows it) and the
+        cards are deduplicated. Only the search cards are parsed: call enrich_accommodations()
+        on the listings that will actually be notified to fetch their photos.
+        """
+        search_results, stream = self.stream_accommodations(search_url)
+        for _ in stream:
+            pass
+        return search_results
 
-    def get_accommodations(self, search_url: HttpUrl) -> SearchResults:
-        """Returns the accommodations found on the CROUS website for the given search URL"""
-        self.driver.get(str(search_url))
-        sleep(2)
+    def stream_accommodations(
+        self, search_url: HttpUrl, previous_probe: Optional[SearchProbe] = None
+    ) -> Tuple[SearchResults, Iterator[Accommodation]]:
+        """Streaming version of get_accommodations().
+
+        The first page is loaded right away. The iterator yields each deduplicated card as soon
+        as its page is parsed, and fills `search_results.accommodations` along the way: the
+        list is complete once the iterator is exhausted.
+
+        With the `previous_probe` of the last pass, an unchanged first page (HTTP 304 or same
+        fingerprint) is not parsed: `search_results.unchanged` is set and the iterator is empty.
+        """
+        # Requête conditionnelle seulement si l'empreinte précédente couvrait tous les résultats
+        validators = previous_probe.validators if previous_probe and previous_probe.ids_hash else {}
+        with PAGE_FETCH_SECONDS.time(kind="search"):
+            current_url, html, validators = self.fetcher.fetch_if_modified(str(search_url), validators)
+        if html is None:
+            logger.info(f"⏭️ Page de résultats non modifiée (HTTP 304) : {current_url}")
+            return self._unchanged_results(current_url, previous_probe)
 
-        current_url = self.driver.current_url
+        probe = probe_search_page(html, validators)
+        if same_results(probe, previous_probe):
+            logger.info(f"⏭️ Résultats inchangés ({probe.count} logement(s), mêmes cartes) : {current_url}")
+            return self._unchanged_results(current_url, probe)
         logger.info(f"Getting accommodations from the current page: {current_url}")
 
-        html = self.driver.page_source
-        soup = BeautifulSoup(html, "html.parser")
-        num_accommodations = self._get_accommodations_count(soup)
-        logger.info(f"Found {num_accommodations} accommodations")
+        with PAGE_PARSE_SECONDS.time(kind="search"):
+            soup = self._make_soup(html, SEARCH_RESULTS_ONLY)
+            num_accommodations = self._get_accommodations_count(soup)
+            logger.info(f"Found {num_accommodations} accommodations")
+            first_page = self._parse_accommodations(soup)
+        page_urls = self._get_page_urls(soup, current_url, num_accommodations, len(first_page))
+        search_results = SearchResults(search_url=current_url, count=num_accommodations, accommodations=[], probe=probe)
+        return search_results, self._stream_pages(search_results, first_page, page_urls)
 
-        return SearchResults(
-            search_url=current_url,
-            count=num_accommodations,
-            accommodations=self._parse_accommodations(soup),
-        )
+    def _unchanged_results(self, current_url: str, probe: SearchProbe) -> Tuple[SearchResults, Iterator[Accommodation]]:
+        search_results = SearchResults(search_url=current_url, count=probe.count, accommodations=[], probe=probe, unchanged=True)
+        return search_results, iter(())
+
+    def _stream_pages(self, search_results: SearchResults, first_page: List[Accommodation], page_urls: List[str]) -> Iterator[Accommodation]:
+        # Un logement peut glisser d'une page à l'autre entre deux chargements
+        seen_keys: Set[Tuple[Optional[int], Optional[str]]] = set()
+        for page in chain([first_page], self._iter_result_pages(page_urls)):
+            for acc in page:
+                key = (acc.id, None) if acc.id is not None else (None, acc.title)
+                if key in seen_keys:
+                    continue
+                seen_keys.add(key)
+                search_results.accommodations.append(acc)
+                yield acc
+
+        found, announced = len(search_results.accommodations), search_results.count
+        if announced is not None and found != announced:
+            logger.warning(f"⚠️ {found} logement(s) récupéré(s) sur {announced} annoncé(s) pour {search_results.search_url}")
+
+    def _get_page_urls(self, soup: BeautifulSoup, current_url: str, count: Optional[int], first_page_size: int) -> List[str]:
+        """URLs des pages de résultats après la première : liens fr-pagination, sinon nombre annoncé / taille de page"""
+        links: Dict[int, str] = {}
+        for link in soup.select("ul.fr-pagination__list a.fr-pagination__link[href]"):
+            page = dict(parse_qsl(urlsplit(link["href"]).query)).get("page") or link.get_text(strip=True)
+            if page.isdigit():
+                links[int(page)] = urljoin(current_url, link["href"])
+
+        last_page = max(links, default=1)
+        if count and first_page_size and count > first_page_size:
+            last_page = max(last_page, math.ceil(count / first_page_size))
+        if last_page > self.max_pages:
+            logger.warning(f"⚠️ {last_page} pages de résultats, seules les {self.max_pages} premières sont récupérées")
+            last_page = self.max_pages
+
+        # Les liens ne listent souvent que les pages voisines (1 2 3 … 10) : compléter les autres
+        return [links.get(page) or _with_page(current_url, page) for page in range(2, last_page + 1)]
+
+    def _iter_result_pages(self, page_urls: List[str]) -> Iterator[List[Accommodation]]:
+        """Charge et parse les pages de résultats supplémentaires (en parallèle si le transport le permet), dans l'ordre d'arrivée"""
+        if not page_urls:
+            return
+
+        workers = min(self.page_concurrency, len(page_urls))
+        logger.info(f"📑 {len(page_urls)} page(s) de résultats supplémentaire(s) ({workers} worker(s))")
+        if workers <= 1 or not self.fetcher.supports_concurrency:
+            for url in page_urls:
+                yield self._get_result_page(url)
+            return
+
+        # Une page en erreur fait échouer toute la recherche : un résultat partiel ferait croire à des disparitions
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pages") as executor:
+            for future in as_completed([executor.submit(self._get_result_page, url) for url in page_urls]):
+                yield future.result()
+
+    def _get_result_page(self, page_url: str) -> List[Accommodation]:
+        with PAGE_FETCH_SECONDS.time(kind="search"):
+            _, html = self.fetcher.fetch(page_url)
+        with PAGE_PARSE_SECONDS.time(kind="search"):
+            return self._parse_accommodations(self._make_soup(html, SEARCH_RESULTS_ONLY))
 
     def _get_accommodations_count(self, soup: BeautifulSoup) -> Optional[int]:
         results_heading = soup.find("h2", class_="SearchResults-desktop fr-h4 svelte-11sc5my")
@@ -94,7 +270,7 @@ class Parser:
             return []
             
         # Trouver tous les éléments <li> des logements
-        accommodation_items = main_list.find_all("li", class_=lambda x: x and "fr-col-12" in x)
+        accommodation_items = main_list.find_all("li", class_=_is_accommodation_card)
         logger.info(f"Trouvé {len(accommodation_items)} éléments de logement")
         
         accommodations: List[Accommodation] = []
@@ -103,11 +279,60 @@ class Parser:
             logger.info(f"Parsing logement {i+1}/{len(accommodation_items)}")
             acc = self._parse_accommodation_card(item)
             if acc:
-                # NOUVEAU: Récupérer toutes les photos de l'annonce
-                acc = self._get_accommodation_details(acc)
                 accommodations.append(acc)
         return accommodations
 
+    def enrich_accommodations(self, accommodations: List[Accommodation]) -> List[Accommodation]:
+        """Complète les logements avec toutes leurs photos (cache disque, sinon pages détaillées)"""
+        for _ in self.iter_enriched(accommodations):
+            pass
+        return accommodations
+
+    def iter_enriched(self, accommodations: Iterable[Accommodation]) -> Iterator[Accommodation]:
+        """Comme enrich_accommodations(), mais produit chaque logement dès que ses photos sont prêtes.
+
+        `accommodations` peut être un flux (ex. stream_accommodations()) : les pages détaillées
+        sont lancées au fil de l'eau, en parallèle si le transport le permet, et les logements
+        sortent dans l'ordre où leurs photos arrivent.
+        """
+        cache_hits = 0
+        concurrent = self.detail_concurrency > 1 and self.fetcher.supports_concurrency
+        executor = ThreadPoolExecutor(max_workers=self.detail_concurrency, thread_name_prefix="details") if concurrent else None
+        pending: Set[Future] = set()
+        try:
+            for acc in accommodations:
+                # Une carte modifiée (autre empreinte) invalide les photos en cache
+                cached_images = self.detail_cache.get(acc.id, acc.card_hash) if self.detail_cache and acc.id else None
+                if cached_images is not None:
+                    acc.all_images = cached_images
+                    cache_hits += 1
+                    yield acc
+                elif executor is None:
+                    yield self._cache_details(self._get_accommodation_details(acc))
+                else:
+                    pending.add(executor.submit(self._get_accommodation_details, acc))
+                    # Livrer tout de suite les pages déjà arrivées, sans attendre la fin du flux
+                    for future in [future for future in pending if future.done()]:
+                        pending.discard(future)
+                        yield self._cache_details(future.result())
+
+            for future in as_completed(pending):
+                yield self._cache_details(future.result())
+            pending.clear()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if cache_hits:
+                logger.info(f"🗃️ {cache_hits} logement(s) servis depuis le cache des pages détaillées")
+            if self.detail_cache:
+                self.detail_cache.save()
+
+    def _cache_details(self, acc: Accommodation) -> Accommodation:
+        # Une page en erreur ne renvoie aucune photo : ne pas la mettre en cache
+        if self.detail_cache and acc.id and acc.all_images:
+            self.detail_cache.put(acc.id, acc.all_images, acc.card_hash)
+        return acc
+
     def _parse_accommodation_card(self, accommodation_item: BeautifulSoup) -> Optional[Accommodation]:
         # Nom et URL
         title_tag = accommodation_item.find("h3", class_="fr-card__title")
@@ -151,14 +376,10 @@ class Parser:
 
         logger.info(f"Logement parsé: {title} (ID: {accommodation_id})")
 
-        return Accommodation(
-            id=accommodation_id,
-            title=title,
-            image_url=image_url,
-            detail_url=detail_url,
-            price=price,
-            overview_details="\n".join([address] + overview_details) if address else "\n".join(overview_details)
-        )
+        overview = "\n".join([address] + overview_details) if address else "\n".join(overview_details)
+        # Carte inchangée depuis un passage précédent : modèle déjà validé, copié avec sa propre liste de photos
+        model = _card_model(accommodation_id, title, image_url, detail_url, price, overview, card_hash(title, price, overview, image_url))
+        return model.model_copy(update={"all_images": list(model.all_images)})
 
     def _get_accommodation_details(self, acc: Accommodation) -> Accommodation:
         """NOUVEAU: Navigue vers la page détaillée pour récupérer toutes les photos"""
@@ -166,81 +387,84 @@ class Parser:
             logger.warning(f"Pas d'URL détaillée pour {acc.title}")
             return acc
 
+        with DETAIL_ENRICH_SECONDS.time():
+            return self._fetch_detail_images(acc)
+
+    def _fetch_detail_images(self, acc: Accommodation) -> Accommodation:
         try:
             logger.info(f"Récupération des photos pour: {acc.title}")
             
-            # Sauvegarder l'URL actuelle
-            current_url = self.driver.current_url
+            # Charger la page détaillée (attendre un peu plus pour le chargement)
+            with PAGE_FETCH_SECONDS.time(kind="detail"):
+                _, html = self.fetcher.fetch(str(acc.detail_url), settle_delay=3, timeout=self.detail_timeout)
             
-            # Naviguer vers la page détaillée
-            self.driver.get(str(acc.detail_url))
-            sleep(3)  # Attendre un peu plus pour le chargement
-            
-            # Parser les images dans la galerie
-            html = self.driver.page_source
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # Trouver la section slider avec les photos
-            slider_section = soup.find("section", class_="Slider svelte-i1xb97")
-            
-            image_urls = []
-            if slider_section:
-                logger.info("Section slider trouvée")
-                # Trouver la liste des slides
-                slides_list = slider_section.find("ul", class_="Slider-slides scrollbar-hidden svelte-i1xb97")
-                if slides_list:
-                    logger.info("Liste des slides trouvée")
-                    # Trouver tous les éléments <li> contenant des photos
-                    photo_items = slides_list.find_all("li")
-                    logger.info(f"Trouvé {len(photo_items)} éléments photo")
-                    
-                    for item in photo_items:
-                        # Chercher l'image dans chaque item
-                        img_tag = item.find("img", class_="fr-responsive-img fr-ratio-16x9 svelte-y6vkg0")
-                        if img_tag and img_tag.get("src"):
-                            image_urls.append(img_tag["src"])
-                else:
-                    logger.warning("Liste des slides non trouvée")
-            else:
-                logger.warning("Section slider non trouvée")
-            
-            # Si pas de slider, essayer de trouver des images autrement
-            if not image_urls:
-                logger.info("Fallback: recherche d'images alternatives")
-                # Fallback: chercher toutes les images qui semblent être des photos de logement
-                all_images = soup.find_all("img")
-                for img in all_images:
-                    src = img.get("src", "")
-                    if src and "preview" in src and "Résidence" in src:
-                        image_urls.append(src)
-            
-            # Nettoyer et convertir en URLs absolues
-            clean_urls = []
-            for url in image_urls:
-                if url.startswith("//"):
-                    url = "https:" + url
-                elif url.startswith("/"):
-                    url = "https://trouverunlogement.lescrous.fr" + url
-                elif not url.startswith("http"):
-                    continue
-                clean_urls.append(url)
-            
-            # Supprimer les doublons tout en gardant l'ordre
-            seen = set()
-            unique_urls = []
-            for url in clean_urls:
-                if url not in seen:
-                    seen.add(url)
-                    unique_urls.append(url)
-            
-            acc.all_images = unique_urls[:10]  # Limiter à 10 photos max
+            with PAGE_PARSE_SECONDS.time(kind="detail"):
+                acc.all_images = self._parse_accommodation_images(html)
             logger.info(f"Trouvé {len(acc.all_images)} photos pour {acc.title}")
             
-            # Retourner à la page de résultats
-            self.driver.get(current_url)
-            sleep(2)
-            
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des photos pour {acc.title}: {e}")
             
-        return acc
\ No newline at end of file
+        return acc
+
+    def _parse_accommodation_images(self, html: str) -> List[str]:
+        """Extrait les URLs des photos (10 max) de la galerie d'une page détaillée"""
+        # Parser les images dans la galerie
+        soup = self._make_soup(html, DETAIL_SLIDER_ONLY)
+
+        # Trouver la section slider avec les photos
+        slider_section = soup.find("section", class_="Slider svelte-i1xb97")
+
+        image_urls = []
+        if slider_section:
+            logger.info("Section slider trouvée")
+            # Trouver la liste des slides
+            slides_list = slider_section.find("ul", class_="Slider-slides scrollbar-hidden svelte-i1xb97")
+            if slides_list:
+                logger.info("Liste des slides trouvée")
+                # Trouver tous les éléments <li> contenant des photos
+                photo_items = slides_list.find_all("li")
+                logger.info(f"Trouvé {len(photo_items)} éléments photo")
+                
+                for item in photo_items:
+                    # Chercher l'image dans chaque item
+                    img_tag = item.find("img", class_="fr-responsive-img fr-ratio-16x9 svelte-y6vkg0")
+                    if img_tag and img_tag.get("src"):
+                        image_urls.append(img_tag["src"])
+            else:
+                logger.warning("Liste des slides non trouvée")
+        else:
+            logger.warning("Section slider non trouvée")
+        
+        # Si pas de slider, essayer de trouver des images autrement
+        if not image_urls:
+            logger.info("Fallback: recherche d'images alternatives")
+            # Fallback: chercher toutes les images qui semblent être des photos de logement
+            if self.restrict_parsing:
+                soup = self._make_soup(html, DETAIL_IMAGES_ONLY)
+            all_images = soup.find_all("img")
+            for img in all_images:
+                src = img.get("src", "")
+                if src and "preview" in src and "Résidence" in src:
+                    image_urls.append(src)
+        
+        # Nettoyer et convertir en URLs absolues
+        clean_urls = []
+        for url in image_urls:
+            if url.startswith("//"):
+                url = "https:" + url
+            elif url.startswith("/"):
+                url = "https://trouverunlogement.lescrous.fr" + url
+            elif not url.startswith("http"):
+                continue
+            clean_urls.append(url)
+        
+        # Supprimer les doublons tout en gardant l'ordre
+        seen = set()
+        unique_urls = []
+        for url in clean_urls:
+            if url not in seen:
+                seen.add(url)
+                unique_urls.append(url)
+        
+        return unique_urls[:10]  # Limiter à 10 photos max
\ No newline at end of file
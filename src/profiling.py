@@ -0,0 +1,205 @@
+import cProfile
+import linecache
+import logging
+import os
+import pstats
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fonctions dont le temps cumulé (thread principal, cProfile) est de l'attente et non du CPU Python
+WAIT_FUNCTIONS = {
+    "sleep": lambda filename, name: name == "<built-in method time.sleep>",
+    "webdriver": lambda filename, name: name == "execute" and filename.endswith(os.path.join("selenium", "webdriver", "remote", "webdriver.py")),
+    "http": lambda filename, name: name == "request" and filename.endswith(os.path.join("requests", "sessions.py")),
+    "lock": lambda filename, name: name == "<method 'acquire' of '_thread.lock' objects>",
+}
+
+# Fichiers où un thread bloqué attend du travail (pool, boucle asyncio) : « idle » dans les échantillons
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", os.path.join("concurrent", "futures", "thread.py"))
+NETWORK_FILES = ("socket.py", "ssl.py", os.path.join("http", "client.py"))
+
+
+def _module_of(filename: str) -> str:
+    """Nom court d'un fichier : paquet tiers, module du projet ou module de la bibliothèque standard."""
+    path = Path(filename)
+    if "site-packages" in path.parts:
+        return path.parts[path.parts.index("site-packages") + 1].removesuffix(".py")
+    for root in (Path.cwd(), Path(sysconfig.get_paths()["stdlib"])):
+        try:
+            return str(path.resolve().relative_to(root.resolve()))
+        except ValueError:
+            continue
+    return path.name
+
+
+class StackSampler:
+    """Échantillonne les piles Python de tous les threads (format « collapsed » des flamegraphs).
+
+    Chaque échantillon est classé d'après la frame la plus profonde : `sleep` (ligne qui appelle
+    sleep()), `webdriver` (commande Selenium en cours), `network` (socket/SSL), `idle` (thread
+    en attente de travail ou d'un verrou) ou `cpu`. La catégorie est la racine de la pile.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.categories: Dict[str, Counter] = {}  # nom du thread -> catégorie -> échantillons
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._sample(names.get(thread_id, str(thread_id)), frame)
+
+    def _sample(self, thread_name: str, leaf) -> None:
+        frames = []
+        in_webdriver = False
+        frame = leaf
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+            in_webdriver = in_webdriver or os.path.join("selenium", "webdriver", "remote") in code.co_filename
+            frame = frame.f_back
+
+        category = self._classify(leaf, in_webdriver)
+        self.stacks[";".join([f"[{category}]", thread_name] + frames[::-1])] += 1
+        self.categories.setdefault(thread_name, Counter())[category] += 1
+
+    @staticmethod
+    def _classify(leaf, in_webdriver: bool) -> str:
+        filename = leaf.f_code.co_filename
+        if in_webdriver:
+            return "webdriver"
+        if "sleep(" in linecache.getline(filename, leaf.f_lineno):
+            return "sleep"
+        if filename.endswith(NETWORK_FILES):
+            return "network"
+        if filename.endswith(IDLE_FILES):
+            return "idle"
+        return "cpu"
+
+    def write_collapsed(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CycleProfiler:
+    """Profil d'un cycle (option --profile) : cProfile, piles échantillonnées et tracemalloc.
+
+    Écrit dans `output_dir` :
+    - `cycle.pstats` : statistiques cProfile du thread principal (`python -m pstats cycle.pstats`)
+    - `cycle.collapsed` : piles de tous les threads pour flamegraph.pl / speedscope
+    - `report.txt` : temps d'attente (sleep, WebDriver, HTTP) séparé du CPU Python,
+      fonctions les plus coûteuses et principaux sites d'allocation par module
+
+    tracemalloc ralentit le code Python : les durées CPU sont surestimées, les attentes non.
+    """
+
+    def __init__(self, output_dir: str, sample_interval: float = 0.01, top: int = 15):
+        self.output_dir = Path(output_dir) / time.strftime("cycle-%Y%m%d-%H%M%S")
+        self.top = top
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(sample_interval)
+        self._started: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+    def __enter__(self) -> "CycleProfiler":
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tracemalloc.start(10)
+        self.sampler.start()
+        self._started = (time.perf_counter(), time.process_time(), time.thread_time())
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profile.disable()
+        wall = time.perf_counter() - self._started[0]
+        process_cpu = time.process_time() - self._started[1]
+        main_cpu = time.thread_time() - self._started[2]
+        self.sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stats_path = self.output_dir / "cycle.pstats"
+        self.profile.dump_stats(stats_path)
+        self.sampler.write_collapsed(self.output_dir / "cycle.collapsed")
+
+        lines = self._time_report(wall, process_cpu, main_cpu, pstats.Stats(self.profile))
+        lines += self._sampling_report()
+        lines += self._allocation_report(snapshot, peak)
+        (self.output_dir / "report.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        for line in lines[:7]:
+            logger.info(line)
+        logger.info(f"🔬 Profil du cycle écrit dans {self.output_dir} (report.txt, cycle.pstats, cycle.collapsed)")
+
+    def _time_report(self, wall: float, process_cpu: float, main_cpu: float, stats: pstats.Stats) -> List[str]:
+        waits = {category: 0.0 for category in WAIT_FUNCTIONS}
+        for (filename, _, name), (_, _, _, cumulative, _) in stats.stats.items():
+            for category, matches in WAIT_FUNCTIONS.items():
+                if matches(filename, name):
+                    waits[category] += cumulative
+
+        lines = [
+            f"⏱️ Cycle : {wall:.1f}s (horloge), CPU du processus {process_cpu:.1f}s, CPU Python du thread principal {main_cpu:.1f}s",
+            f"   thread principal en sleep() : {waits['sleep']:.1f}s",
+            f"   thread principal en commandes WebDriver : {waits['webdriver']:.1f}s",
+            f"   thread principal en requêtes HTTP : {waits['http']:.1f}s",
+            f"   thread principal en attente des autres threads (pages détaillées, envois) : {waits['lock']:.1f}s",
+            f"   reste (autres attentes, threads) : {max(0.0, wall - main_cpu - sum(waits.values())):.1f}s",
+            "",
+            f"Fonctions les plus coûteuses en temps propre (thread principal, top {self.top}) :",
+        ]
+        by_own_time = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[: self.top]
+        for (filename, lineno, name), (_, calls, own, cumulative, _) in by_own_time:
+            lines.append(f"   {own:8.3f}s propre {cumulative:8.3f}s cumulé {calls:>8} appels  {_module_of(filename)}:{lineno}({name})")
+        return lines
+
+    def _sampling_report(self) -> List[str]:
+        lines = ["", f"Échantillons par thread (toutes les {self.sampler.interval * 1000:.0f}ms) :"]
+        for thread_name, categories in sorted(self.sampler.categories.items(), key=lambda item: -sum(item[1].values())):
+            total = sum(categories.values())
+            shares = ", ".join(f"{category} {count * 100 / total:.0f}%" for category, count in categories.most_common())
+            lines.append(f"   {thread_name} (~{total * self.sampler.interval:.1f}s) : {shares}")
+        return lines
+
+    def _allocation_report(self, snapshot: tracemalloc.Snapshot, peak: int) -> List[str]:
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, linecache.__file__),
+        ])
+        by_module: Dict[str, List[tracemalloc.Statistic]] = {}
+        for statistic in snapshot.statistics("lineno"):
+            by_module.setdefault(_module_of(statistic.traceback[0].filename), []).append(statistic)
+
+        modules = sorted(by_module.items(), key=lambda item: sum(s.size for s in item[1]), reverse=True)[: self.top]
+        lines = ["", f"Mémoire Python : pic {peak / 1024 / 1024:.1f} Mo ; encore allouée en fin de cycle, par module :"]
+        for module, statistics in modules:
+            lines.append(f"   {module} : {sum(s.size for s in statistics) / 1024:.0f} Ko")
+            for statistic in statistics[:3]:
+                frame = statistic.traceback[0]
+                lines.append(f"      {statistic.size / 1024:8.0f} Ko {statistic.count:>7} blocs  {Path(frame.filename).name}:{frame.lineno}")
+        return lines
@@ -0,0 +1,126 @@
+import json
+import logging
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+logger = logging.getLogger(__name__)
+
+# Motifs Network.setBlockedURLs (jokers *) par catégorie ; le suffixe * couvre les query strings
+BLOCKED_URL_CATEGORIES: Dict[str, List[str]] = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.JPG*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "third_party": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*matomo*",
+        "*xiti.com*",
+        "*hotjar*",
+        "*tile.openstreetmap.org*",
+        "*tiles.stadiamaps.com*",
+        "*api.mapbox.com*",
+        "*api.maptiler.com*",
+    ],
+}
+
+
+def blocked_url_patterns(categories: Iterable[str], extra_patterns: Iterable[str] = ()) -> List[str]:
+    patterns = []
+    for category in categories:
+        if category not in BLOCKED_URL_CATEGORIES:
+            raise ValueError(f"Catégorie de ressources inconnue : {category} (attendu : {', '.join(BLOCKED_URL_CATEGORIES)})")
+        patterns.extend(BLOCKED_URL_CATEGORIES[category])
+    return patterns + list(extra_patterns)
+
+
+class ResourceBlocker:
+    """Bloque dans Chrome (CDP Network.setBlockedURLs) les ressources inutiles au Parser.
+
+    Le blocage n'est actif que pendant `blocking()`, après l'authentification : le login MSE
+    reste intact. Les requêtes bloquées et les octets téléchargés sont lus dans le journal
+    « performance » de Chrome (`goog:loggingPrefs`, voir `logging_prefs`). Les octets évités
+    sont estimés avec la taille moyenne de chaque type de ressource chargé hors blocage.
+    """
+
+    logging_prefs = {"performance": "ALL"}
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        # Type de ressource CDP (Image, Font...) -> [octets, nombre] observés hors blocage
+        self._sizes: Dict[str, List[float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.patterns)
+
+    @contextmanager
+    def blocking(self, driver: "WebDriver") -> Iterator[None]:
+        from selenium.common.exceptions import WebDriverException
+
+        if not self.enabled:
+            yield
+            return
+
+        # Chargements du login / de la vérification de session : non bloqués, servent d'estimation
+        self._read_network_log(driver, learn_sizes=True)
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        try:
+            yield
+        finally:
+            try:
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})
+                self._log_stats(self._read_network_log(driver, learn_sizes=False))
+            except WebDriverException as e:
+                logger.warning(f"Impossible de lever le blocage des ressources : {e}")
+
+    def _read_network_log(self, driver: "WebDriver", learn_sizes: bool) -> Dict[str, Dict[str, float]]:
+        """Vide le journal performance et retourne {"blocked": {type: n}, "loaded": {type: n}, "bytes": {type: octets}}."""
+        from selenium.common.exceptions import WebDriverException
+
+        try:
+            entries = driver.get_log("performance")
+        except WebDriverException:
+            # Driver créé sans goog:loggingPrefs : pas de statistiques
+            return {"blocked": {}, "loaded": {}, "bytes": {}}
+
+        types: Dict[str, str] = {}
+        stats: Dict[str, Dict[str, float]] = {"blocked": {}, "loaded": {}, "bytes": {}}
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message.get("method"), message.get("params", {})
+            if method in ("Network.requestWillBeSent", "Network.responseReceived") and "type" in params:
+                types[params["requestId"]] = params["type"]
+            elif method == "Network.loadingFinished":
+                resource_type = types.get(params["requestId"], "Other")
+                stats["loaded"][resource_type] = stats["loaded"].get(resource_type, 0) + 1
+                stats["bytes"][resource_type] = stats["bytes"].get(resource_type, 0) + params.get("encodedDataLength", 0)
+            elif method == "Network.loadingFailed" and params.get("blockedReason"):
+                resource_type = params.get("type") or types.get(params["requestId"], "Other")
+                stats["blocked"][resource_type] = stats["blocked"].get(resource_type, 0) + 1
+
+        if learn_sizes:
+            for resource_type, loaded in stats["loaded"].items():
+                size = self._sizes.setdefault(resource_type, [0.0, 0])
+                size[0] += stats["bytes"][resource_type]
+                size[1] += loaded
+        return stats
+
+    def _log_stats(self, stats: Dict[str, Dict[str, float]]) -> None:
+        blocked = stats["blocked"]
+        total_blocked = int(sum(blocked.values()))
+        downloaded_kb = sum(stats["bytes"].values()) / 1024
+        saved_kb = sum(
+            count * self._sizes[resource_type][0] / self._sizes[resource_type][1]
+            for resource_type, count in blocked.items()
+            if self._sizes.get(resource_type, [0, 0])[1]
+        ) / 1024
+        details = ", ".join(f"{resource_type}: {int(count)}" for resource_type, count in sorted(blocked.items()))
+        logger.info(
+            f"🚫 {total_blocked} requête(s) bloquée(s) ce cycle ({details or 'aucune'}), "
+            f"~{saved_kb:.0f} Ko évités, {downloaded_kb:.0f} Ko téléchargés"
+        )
@@ -0,0 +1,198 @@
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from src.search_planner import SearchPlan
+
+logger = logging.getLogger(__name__)
+
+WEEK_BUCKETS = 7 * 24
+
+
+def week_bucket(timestamp: float) -> int:
+    """Créneau (jour de la semaine, heure locale) d'un instant : 0 = lundi 0h, 167 = dimanche 23h."""
+    local = time.localtime(timestamp)
+    return local.tm_wday * 24 + local.tm_hour
+
+
+@dataclass
+class AreaState:
+    next_due: float = 0.0  # 0 : jamais vérifiée, à faire tout de suite
+    burst_until: float = 0.0
+    page_cost: float = 2.0  # chargements de page estimés par passage (moyenne glissante)
+
+
+class AdaptiveScheduler:
+    """Fréquence de vérification de chaque zone apprise sur l'heure d'arrivée des logements.
+
+    Les arrivées passées (`StateStore.arrival_history`) donnent pour chaque zone un taux par
+    créneau jour × heure, lissé vers le profil de toutes les zones tant qu'elle a peu
+    d'historique. Le nombre de passages par heure est proportionnel à la racine du taux
+    (répartition qui minimise le délai moyen de détection à nombre de passages égal) et
+    normalisé pour que la moyenne sur la semaine reste d'un passage par `base_interval`.
+    Après une arrivée, la zone est revérifiée à `min_interval` pendant `burst_window`.
+    Les chargements de page puisent dans un seau de jetons qui se remplit au rythme de
+    `max_page_loads_per_hour` (réserve d'une heure) ; par défaut, au rythme de l'attente fixe
+    (un passage sur chaque zone par `base_interval`) avec une réserve de `budget_window`
+    secondes, ce qui laisse les créneaux chauds et les rafales dépasser ce rythme tant que la
+    moyenne tient. Les zones en trop sont reportées.
+    """
+
+    def __init__(
+        self,
+        base_interval: float,
+        min_interval: float,
+        max_interval: float,
+        max_page_loads_per_hour: Optional[int] = None,
+        burst_window: float = 1800,
+        budget_window: float = 86400,
+        history_days: int = 28,
+        jitter: float = 0.15,
+        prior_weight: float = 24.0,
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.max_page_loads_per_hour = max_page_loads_per_hour
+        self.burst_window = burst_window
+        self.budget_window = budget_window
+        self.history_days = history_days
+        self.jitter = jitter
+        self.prior_weight = prior_weight
+        self.areas: Dict[str, AreaState] = {}
+        self._intervals: Dict[str, List[float]] = {}
+        self._default_intervals = [base_interval] * WEEK_BUCKETS
+        # Jetons consommés sous la réserve pleine, et instant de la dernière recharge
+        self._spent = 0.0
+        self._spent_at: Optional[float] = None
+
+    def learn(self, arrivals: Dict[str, List[float]]) -> None:
+        """Recalcule les intervalles par créneau à partir des dates d'arrivée par zone."""
+        global_counts = [0] * WEEK_BUCKETS
+        area_counts: Dict[str, List[int]] = {}
+        for search_url, timestamps in arrivals.items():
+            counts = area_counts.setdefault(search_url, [0] * WEEK_BUCKETS)
+            for timestamp in timestamps:
+                bucket = week_bucket(timestamp)
+                counts[bucket] += 1
+                global_counts[bucket] += 1
+
+        # Profil commun (lissage de Laplace) : sert d'a priori aux zones peu fournies
+        global_total = sum(global_counts)
+        global_shape = [(count + 1) / (global_total + WEEK_BUCKETS) for count in global_counts]
+        self._default_intervals = self._intervals_for(global_shape)
+
+        self._intervals = {}
+        for search_url, counts in area_counts.items():
+            total = sum(counts)
+            shape = [
+                (count + self.prior_weight * prior) / (total + self.prior_weight)
+                for count, prior in zip(counts, global_shape)
+            ]
+            self._intervals[search_url] = self._intervals_for(shape)
+
+        if global_total:
+            hot = sorted(range(WEEK_BUCKETS), key=lambda b: global_shape[b], reverse=True)[:3]
+            hot_slots = ", ".join(f"{['lun', 'mar', 'mer', 'jeu', 'ven', 'sam', 'dim'][b // 24]} {b % 24}h" for b in hot)
+            logger.info(f"📈 Ordonnanceur : {global_total} arrivée(s) sur {self.history_days} jours, créneaux chauds : {hot_slots}")
+
+    def _intervals_for(self, shape: Sequence[float]) -> List[float]:
+        weights = [math.sqrt(p) for p in shape]
+        mean_weight = sum(weights) / len(weights)
+        return [
+            min(self.max_interval, max(self.min_interval, self.base_interval * mean_weight / weight))
+            for weight in weights
+        ]
+
+    def interval(self, search_url: str, now: float) -> float:
+        area = self.areas.get(search_url)
+        if area is not None and now < area.burst_until:
+            return self.min_interval
+        return self._intervals.get(search_url, self._default_intervals)[week_bucket(now)]
+
+    def hourly_budget(self) -> float:
+        """Chargements de page regagnés par heure."""
+        if self.max_page_loads_per_hour is not None:
+            return self.max_page_loads_per_hour
+        return sum(area.page_cost for area in self.areas.values()) * 3600 / self.base_interval
+
+    def budget_capacity(self) -> float:
+        """Réserve maximale de chargements : une heure de plafond explicite, sinon `budget_window`."""
+        if self.max_page_loads_per_hour is not None:
+            return self.max_page_loads_per_hour
+        return self.hourly_budget() * self.budget_window / 3600
+
+    def _budget_left(self, now: float) -> float:
+        if self._spent_at is not None and now > self._spent_at:
+            self._spent = max(0.0, self._spent - (now - self._spent_at) * self.hourly_budget() / 3600)
+        self._spent_at = now if self._spent_at is None else max(self._spent_at, now)
+        return self.budget_capacity() - self._spent
+
+    def record_page_loads(self, page_loads: int, now: Optional[float] = None) -> None:
+        """Décompte des chargements de page du budget (passage sur une zone, vérification de session, login)."""
+        now = time.time() if now is None else now
+        self._budget_left(now)
+        self._spent += page_loads
+
+    def due(self, plans: List[SearchPlan], now: Optional[float] = None) -> List[SearchPlan]:
+        """Zones à vérifier maintenant, les plus en retard d'abord, dans la limite des jetons restants."""
+        now = time.time() if now is None else now
+        # Zones disparues de la configuration : oubliées
+        plan_urls = {plan.search_url for plan in plans}
+        self.areas = {search_url: area for search_url, area in self.areas.items() if search_url in plan_urls}
+        due_plans = [plan for plan in plans if self._area(plan.search_url).next_due <= now]
+        due_plans.sort(key=lambda plan: self.areas[plan.search_url].next_due)
+
+        budget = self._budget_left(now)
+        selected = []
+        for plan in due_plans:
+            cost = self.areas[plan.search_url].page_cost
+            # Toujours au moins une zone si le budget n'est pas épuisé, même si son coût l'excède
+            if selected and cost > budget or budget <= 0:
+                logger.info(f"⏳ Zone reportée (budget de {self.hourly_budget():.0f} chargements/h épuisé) : {plan.search_url}")
+                continue
+            selected.append(plan)
+            budget -= cost
+        return selected
+
+    def record(self, search_url: str, page_loads: int, arrivals: int, now: Optional[float] = None) -> None:
+        """Après un passage sur une zone : coût observé, rafale éventuelle, prochaine échéance."""
+        now = time.time() if now is None else now
+        area = self._area(search_url)
+        if page_loads:
+            self.record_page_loads(page_loads, now)
+            area.page_cost = 0.7 * area.page_cost + 0.3 * page_loads
+        if arrivals:
+            area.burst_until = now + self.burst_window
+        interval = self.interval(search_url, now) * random.uniform(1 - self.jitter, 1 + self.jitter)
+        area.next_due = now + max(self.min_interval * (1 - self.jitter), interval)
+        logger.info(
+            f"🗓️ Prochain passage sur cette zone dans {interval / 60:.0f} min"
+            f"{' (rafale en cours)' if now < area.burst_until else ''}"
+        )
+
+    def postpone(self, delay: float, now: Optional[float] = None) -> None:
+        """Après une erreur de cycle : aucune zone avant `delay` secondes."""
+        now = time.time() if now is None else now
+        for area in self.areas.values():
+            area.next_due = max(area.next_due, now + delay)
+
+    def seconds_until_due(self, now: Optional[float] = None) -> float:
+        """Attente avant la prochaine zone à vérifier, en tenant compte des jetons restants."""
+        now = time.time() if now is None else now
+        if not self.areas:
+            return 0.0
+        next_area = min(self.areas.values(), key=lambda area: area.next_due)
+        wait = next_area.next_due - now
+
+        # Pas assez de jetons pour cette zone : attendre qu'ils se rechargent
+        missing = min(next_area.page_cost, self.budget_capacity()) - self._budget_left(now)
+        if missing > 0 and self.hourly_budget() > 0:
+            wait = max(wait, missing * 3600 / self.hourly_budget())
+        return max(0.0, wait)
+
+    def _area(self, search_url: str) -> AreaState:
+        return self.areas.setdefault(search_url, AreaState())
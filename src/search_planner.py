@@ -0,0 +1,153 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from src.models import Accommodation, UserConf
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Bounds:
+    """Rectangle de recherche CROUS : `bounds=lon1_lat1_lon2_lat2` (coin nord-ouest puis sud-est)."""
+
+    west: float
+    south: float
+    east: float
+    north: float
+
+    @classmethod
+    def from_param(cls, value: str) -> Optional["Bounds"]:
+        try:
+            lon1, lat1, lon2, lat2 = (float(part) for part in value.split("_"))
+        except ValueError:
+            return None
+        return cls(west=min(lon1, lon2), south=min(lat1, lat2), east=max(lon1, lon2), north=max(lat1, lat2))
+
+    def to_param(self) -> str:
+        return f"{self.west}_{self.north}_{self.east}_{self.south}"
+
+    @property
+    def area(self) -> float:
+        return (self.east - self.west) * (self.north - self.south)
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        return self.west <= longitude <= self.east and self.south <= latitude <= self.north
+
+    def expanded(self, margin: float) -> "Bounds":
+        return Bounds(self.west - margin, self.south - margin, self.east + margin, self.north + margin)
+
+    def intersects(self, other: "Bounds") -> bool:
+        return self.west <= other.east and other.west <= self.east and self.south <= other.north and other.south <= self.north
+
+    def union(self, other: "Bounds") -> "Bounds":
+        return Bounds(min(self.west, other.west), min(self.south, other.south), max(self.east, other.east), max(self.north, other.north))
+
+
+def normalize_search_url(search_url: str) -> Tuple[str, Optional[Bounds]]:
+    """Retourne (URL sans `bounds` avec les paramètres triés, rectangle de recherche ou None)."""
+    parts = urlsplit(str(search_url))
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    bounds_values = [value for key, value in params if key == "bounds"]
+    others = sorted((key, value) for key, value in params if key != "bounds")
+    base_url = urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(others), ""))
+    bounds = Bounds.from_param(bounds_values[0]) if len(bounds_values) == 1 else None
+    return base_url, bounds
+
+
+def _with_bounds(base_url: str, bounds: Bounds) -> str:
+    parts = urlsplit(base_url)
+    params = parse_qsl(parts.query, keep_blank_values=True) + [("bounds", bounds.to_param())]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(params), safe="_"), ""))
+
+
+@dataclass
+class SearchPlan:
+    """Une recherche à effectuer et les utilisateurs (avec leur propre rectangle) qu'elle sert."""
+
+    search_url: str
+    users: List[UserConf] = field(default_factory=list)
+    user_bounds: Dict[int, Bounds] = field(default_factory=dict)  # id(UserConf) -> rectangle de l'utilisateur
+
+    @property
+    def merged(self) -> bool:
+        return bool(self.user_bounds)
+
+    def wants(self, user_conf: UserConf, acc: Accommodation) -> bool:
+        """True si le logement est dans le rectangle de cet utilisateur."""
+        bounds = self.user_bounds.get(id(user_conf))
+        if bounds is None or acc.latitude is None or acc.longitude is None:
+            # Sans coordonnées, mieux vaut notifier en trop que manquer un logement
+            return True
+        return bounds.contains(acc.latitude, acc.longitude)
+
+    def route(self, user_conf: UserConf, accommodations: List[Accommodation]) -> List[Accommodation]:
+        return [acc for acc in accommodations if self.wants(user_conf, acc)]
+
+
+class SearchPlanner:
+    """Regroupe les recherches des utilisateurs pour charger chaque zone une seule fois.
+
+    Les URLs identiques (à l'ordre des paramètres près) ne sont chargées qu'une fois. Si le
+    transport fournit les coordonnées des logements, les rectangles `bounds` qui se chevauchent
+    ou sont proches (à `merge_margin` degrés près) sont fusionnés tant que le rectangle englobant
+    ne dépasse pas `max_growth` fois la somme des surfaces fusionnées ; chaque logement est ensuite
+    redistribué aux utilisateurs dont le rectangle le contient.
+    """
+
+    def __init__(self, coalesce: bool = True, merge_margin: float = 0.01, max_growth: float = 1.5):
+        self.coalesce = coalesce
+        self.merge_margin = merge_margin
+        self.max_growth = max_growth
+
+    def plan(self, user_confs: List[UserConf]) -> List[SearchPlan]:
+        exact: Dict[str, SearchPlan] = {}
+        areas: Dict[str, Dict[Bounds, List[UserConf]]] = {}
+
+        for conf in user_confs:
+            base_url, bounds = normalize_search_url(str(conf.search_url))
+            if not self.coalesce or bounds is None:
+                key = str(conf.search_url) if bounds is None else _with_bounds(base_url, bounds)
+                exact.setdefault(key, SearchPlan(search_url=str(conf.search_url))).users.append(conf)
+                continue
+            areas.setdefault(base_url, {}).setdefault(bounds, []).append(conf)
+
+        plans = list(exact.values())
+        for base_url, rectangles in areas.items():
+            for bounds, groups in self._merge(list(rectangles.items())):
+                users = [conf for _, confs in groups for conf in confs]
+                if len(groups) == 1:
+                    # Un seul rectangle : l'URL d'origine, sans filtrage géographique
+                    plans.append(SearchPlan(search_url=str(users[0].search_url), users=users))
+                    continue
+                plan = SearchPlan(search_url=_with_bounds(base_url, bounds), users=users)
+                plan.user_bounds = {id(conf): user_bounds for user_bounds, confs in groups for conf in confs}
+                plans.append(plan)
+
+        logger.info(f"🗺️ {len(plans)} recherche(s) planifiée(s) pour {len(user_confs)} utilisateur(s)")
+        return plans
+
+    def _merge(self, rectangles: List[Tuple[Bounds, List[UserConf]]]) -> List[Tuple[Bounds, List[Tuple[Bounds, List[UserConf]]]]]:
+        """Retourne [(rectangle englobant, [(rectangle d'origine, utilisateurs)])]."""
+        # Quelques dizaines de rectangles au plus : fusion par paires jusqu'à stabilité
+        groups = [(bounds, [(bounds, users)], bounds.area) for bounds, users in rectangles]
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(groups)):
+                for j in range(i + 1, len(groups)):
+                    bounds_i, members_i, area_i = groups[i]
+                    bounds_j, members_j, area_j = groups[j]
+                    if not bounds_i.expanded(self.merge_margin).intersects(bounds_j):
+                        continue
+                    union = bounds_i.union(bounds_j)
+                    if union.area > self.max_growth * (area_i + area_j) and union not in (bounds_i, bounds_j):
+                        continue
+                    groups[i] = (union, members_i + members_j, area_i + area_j)
+                    del groups[j]
+                    merged = True
+                    break
+                if merged:
+                    break
+        return [(bounds, members) for bounds, members, _ in groups]
@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.webdriver import WebDriver
+
+
+logger = logging.getLogger(__name__)
+
+CROUS_ORIGIN = "https://trouverunlogement.lescrous.fr"
+
+# Éléments présents dans la page uniquement quand l'utilisateur est connecté
+LOGGED_IN_MARKERS = ("/mse/logout", "Se déconnecter", "Déconnexion")
+
+# Champs acceptés par Network.setCookies (getAllCookies en renvoie davantage)
+_COOKIE_PARAM_KEYS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+class SessionStore:
+    """Sauvegarde la session CROUS (cookies + storage) pour éviter de rejouer le login MSE à chaque cycle."""
+
+    def __init__(self, path: str = "session.json", max_age: int = 12 * 3600):
+        self.path = Path(path)
+        self.max_age = max_age
+
+    def save(self, driver: "WebDriver") -> None:
+        """Enregistre les cookies de tous les domaines et le storage de l'origine CROUS."""
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+            storage = {}
+            if driver.current_url.startswith(CROUS_ORIGIN):
+                storage = driver.execute_script(
+                    "return {local: Object.assign({}, window.localStorage),"
+                    " session: Object.assign({}, window.sessionStorage)};"
+                ) or {}
+
+            data = {
+                "saved_at": time.time(),
+                "cookies": cookies,
+                "local_storage": storage.get("local", {}),
+                "session_storage": storage.get("session", {}),
+            }
+
+            # Écriture atomique : un crash pendant l'écriture ne corrompt pas la session précédente
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+            logger.info(f"💾 Session sauvegardée ({len(cookies)} cookies)")
+        except Exception as e:
+            logger.warning(f"Impossible de sauvegarder la session : {e}")
+
+    def load(self) -> Dict[str, Any] | None:
+        """Charge la session enregistrée si elle existe et n'est pas trop ancienne."""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Fichier de session illisible, ignoré : {e}")
+            return None
+
+        age = time.time() - data.get("saved_at", 0)
+        if age > self.max_age:
+            logger.info(f"⌛ Session enregistrée trop ancienne ({age / 3600:.1f}h), login complet nécessaire")
+            return None
+        return data
+
+    def clear(self) -> None:
+        """Supprime la session enregistrée (ex: session expirée côté serveur)."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def restore(self, driver: "WebDriver") -> bool:
+        """Réinjecte cookies et storage dans le driver. Retourne False si aucune session exploitable."""
+        data = self.load()
+        if not data:
+            return False
+
+        try:
+            cookies = [self._to_cookie_param(c) for c in data.get("cookies", [])]
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+            local_storage = data.get("local_storage") or {}
+            session_storage = data.get("session_storage") or {}
+            if local_storage or session_storage:
+                # Le storage ne peut être écrit que depuis l'origine concernée
+                driver.get(CROUS_ORIGIN)
+                driver.execute_script(
+                    "for (const [k, v] of Object.entries(arguments[0])) window.localStorage.setItem(k, v);"
+                    "for (const [k, v] of Object.entries(arguments[1])) window.sessionStorage.setItem(k, v);",
+                    local_storage,
+                    session_storage,
+                )
+
+            logger.info(f"♻️ Session restaurée ({len(cookies)} cookies)")
+            return True
+        except Exception as e:
+            logger.warning(f"Impossible de restaurer la session : {e}")
+            return False
+
+    def is_valid(self, driver: "WebDriver", check_url: str) -> bool:
+        """Vérifie que la session restaurée est toujours authentifiée côté CROUS."""
+        try:
+            driver.get(check_url)
+            current_url = driver.current_url
+            if urlsplit(current_url).netloc != urlsplit(CROUS_ORIGIN).netloc:
+                logger.info(f"Session expirée : redirection vers {current_url}")
+                return False
+
+            html = driver.page_source
+            if any(marker in html for marker in LOGGED_IN_MARKERS):
+                return True
+
+            logger.info("Session expirée : aucun indicateur de connexion dans la page")
+            return False
+        except Exception as e:
+            logger.warning(f"Erreur lors de la vérification de la session : {e}")
+            return False
+
+    @staticmethod
+    def _to_cookie_param(cookie: Dict[str, Any]) -> Dict[str, Any]:
+        param = {k: cookie[k] for k in _COOKIE_PARAM_KEYS if k in cookie}
+        # Cookies de session : pas de date d'expiration à transmettre
+        if cookie.get("session") or param.get("expires", -1) < 0:
+            param.pop("expires", None)
+        return param
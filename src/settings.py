@@ -1,8 +1,12 @@
 # pydantic-settings class
 
+from functools import lru_cache
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
+
+from src.models import UserFilters
 
 
 class Settings(BaseSettings):
@@ -36,4 +40,91 @@ class Settings(BaseSettings):
     RESIDENCES_URL: str = Field(default=...)
     RESIDENCES_VILLE: str = Field(default=...)
 
-    FREQUENCE_VERIF: int = Field(...)
\ No newline at end of file
+    FREQUENCE_VERIF: int = Field(...)
+
+    # Ordonnanceur adaptatif (mode --loop, désactivé par défaut) : FREQUENCE_VERIF reste l'intervalle moyen
+    # par zone, resserré aux heures d'arrivée habituelles (secondes). Sans MAX_PAGE_LOADS_PER_HOUR, le budget de
+    # chargements de page se recharge au rythme de l'attente fixe, avec une réserve de SCHEDULER_BUDGET_WINDOW
+    SCHEDULER_ADAPTIVE: bool = False
+    SCHEDULER_MIN_INTERVAL: int = 600
+    SCHEDULER_MAX_INTERVAL: int = 7200
+    SCHEDULER_BURST_WINDOW: int = 1800
+    SCHEDULER_BUDGET_WINDOW: int = 86400
+    SCHEDULER_HISTORY_DAYS: int = 28
+    MAX_PAGE_LOADS_PER_HOUR: Optional[int] = None
+
+    # Base SQLite de l'état (logements vus, envois)
+    STATE_DB: str = "state.db"
+
+    # Message aux utilisateurs qui ont reçu un logement quand son prix change
+    NOTIFY_PRICE_CHANGES: bool = False
+
+    # Historique de chaque carte parsée (CSV gzip partitionnés par jour), vide pour le désactiver
+    HISTORY_DIR: Optional[str] = "history"
+
+    # Fusion des zones de recherche qui se chevauchent (marge en degrés)
+    SEARCH_COALESCE: bool = True
+    SEARCH_MERGE_MARGIN: float = 0.01
+    SEARCH_MERGE_MAX_GROWTH: float = 1.5
+
+    # Filtres par utilisateur, en JSON indexé par ID Telegram, ex. :
+    # USER_FILTERS={"123456": {"max_price": 450, "min_surface": 15, "types": ["Studio", "T1"], "keywords": ["Perpignan"]}}
+    USER_FILTERS: Dict[str, UserFilters] = Field(default_factory=dict)
+
+    # Chrome gardé entre les cycles du mode --loop, recyclé après N cycles ou au-delà d'une mémoire (Mo)
+    DRIVER_MAX_CYCLES: int = 20
+    DRIVER_MAX_RSS_MB: float = 1500
+    CHROME_PROFILE_DIR: Optional[str] = "/dev/shm"  # tmpfs ; dossier temporaire par défaut s'il est absent ou trop petit
+
+    # chromedriver : chemin épinglé, sinon résolu par webdriver_manager et mis en cache entre les redémarrages
+    CHROMEDRIVER_PATH: Optional[str] = None
+    CHROMEDRIVER_CACHE_FILE: str = "chromedriver_path.json"
+    CHROMEDRIVER_CACHE_MAX_AGE: int = 7 * 24 * 3600  # secondes
+
+    # Ressources bloquées dans Chrome pendant le scraping (image, media, font, third_party) et motifs supplémentaires
+    BLOCK_RESOURCES: List[str] = ["image", "media", "font", "third_party"]
+    BLOCKED_URL_PATTERNS: List[str] = Field(default_factory=list)
+
+    # Réutilisation de la session CROUS entre les cycles
+    SESSION_FILE: str = "session.json"
+    SESSION_MAX_AGE: int = 12 * 3600  # secondes
+
+    # Transport du Parser : "driver" (Chrome), "http" (requests avec les cookies du driver)
+    # ou "api" (API JSON de recherche, sans HTML ni pages détaillées)
+    PARSER_TRANSPORT: str = "driver"
+    HTTP_POOL_SIZE: int = 10
+    HTTP_TIMEOUT: float = 15
+    SEARCH_API_URL: str = "https://trouverunlogement.lescrous.fr/api/fr/search/{tool_id}"
+    SEARCH_API_PAGE_SIZE: int = 24
+
+    # Pages de résultats de recherche : parallélisme et nombre maximal de pages par recherche
+    SEARCH_PAGE_CONCURRENCY: int = 4
+    SEARCH_MAX_PAGES: int = 20
+
+    # Récupération des pages détaillées (photos) : parallélisme et timeout par requête
+    DETAIL_CONCURRENCY: int = 4
+    DETAIL_TIMEOUT: float = 20
+
+    # Cache disque des photos des pages détaillées
+    DETAIL_CACHE_FILE: str = "detail_cache.json"
+    DETAIL_CACHE_TTL: int = 7 * 24 * 3600  # secondes
+    DETAIL_CACHE_MAX_ENTRIES: int = 2000
+
+    # Backend BeautifulSoup : "html.parser" (intégré) ou "lxml" (plus rapide, si installé)
+    PARSER_BACKEND: str = "html.parser"
+
+    # Métriques Prometheus : fichier pour le textfile collector (réécrit à chaque cycle) et/ou port HTTP /metrics
+    METRICS_TEXTFILE: Optional[str] = None
+    METRICS_PORT: Optional[int] = None
+
+    # Limites d'envoi Telegram (messages/seconde) appliquées par le TelegramDispatcher
+    TELEGRAM_CHAT_RATE: float = 1.0
+    TELEGRAM_GLOBAL_RATE: float = 30.0
+    TELEGRAM_MEDIA_GROUP_RATE: float = 0.3  # carrousels par seconde et par conversation
+    FILE_ID_CACHE_MAX_AGE: int = 24 * 3600  # durée de réutilisation d'un file_id Telegram (secondes)
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Settings lus une seule fois (.env et variables d'environnement) puis partagés"""
+    return Settings()
@@ -0,0 +1,96 @@
+import builtins
+import logging
+import sys
+from time import perf_counter
+from typing import ContextManager, Dict, List
+
+
+class ImportTimer:
+    """Temps d'import de chaque module (cumulé et propre), comme `python -X importtime`."""
+
+    def __init__(self):
+        self.cumulative: Dict[str, float] = {}
+        self.own: Dict[str, float] = {}
+        self._children: List[float] = []
+        self._original_import = None
+
+    def install(self) -> None:
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Imports relatifs ou déjà faits : comptés dans le module parent
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._children.append(0.0)
+        start = perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = perf_counter() - start
+            children = self._children.pop()
+            self.cumulative[name] = elapsed
+            self.own[name] = elapsed - children
+            if self._children:
+                self._children[-1] += elapsed
+
+    def by_package(self) -> Dict[str, float]:
+        """Temps propre regroupé par paquet tiers (selenium, telepot...) ; les modules src.* restent séparés."""
+        totals: Dict[str, float] = {}
+        for name, duration in self.own.items():
+            key = name if name.startswith("src.") else name.partition(".")[0]
+            totals[key] = totals.get(key, 0.0) + duration
+        return totals
+
+
+class StartupProfile:
+    """Profil du démarrage (option --startup-profile) : imports par module puis étapes d'initialisation.
+
+    Créé à l'import de ce module, que main.py importe en premier pour voir passer les
+    imports suivants ; inactif, seules les étapes sont mesurées (coût négligeable) et rien
+    n'est affiché.
+    """
+
+    def __init__(self, enabled: bool):
+        started = perf_counter()
+        self.enabled = enabled
+        self.imports = ImportTimer()
+        if enabled:
+            self.imports.install()
+        # Importé après install() : pydantic (via src.models) apparaît dans le profil
+        from src.timing import StepTimer
+
+        self.timer = StepTimer()
+        self.timer.started = started
+        self._reported = False
+
+    @classmethod
+    def from_argv(cls, argv: List[str]) -> "StartupProfile":
+        # argparse n'a pas encore tourné : les imports de main.py commencent juste après
+        return cls("--startup-profile" in argv)
+
+    def step(self, name: str) -> ContextManager[None]:
+        return self.timer.step(name)
+
+    def log_report(self, logger: logging.Logger, top: int = 15) -> None:
+        """Affiche le rapport une seule fois (fin du démarrage)."""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        self.imports.uninstall()
+
+        packages = sorted(self.imports.by_package().items(), key=lambda item: item[1], reverse=True)
+        logger.info(f"📦 Imports : {sum(self.imports.own.values()):.2f}s pour {len(self.imports.own)} modules")
+        for name, duration in packages[:top]:
+            logger.info(f"   {name}: {duration * 1000:.0f}ms")
+        self.timer.log_report(logger, "Démarrage")
+
+
+# Profil du processus, créé au premier import (par main.py, avant ses autres imports)
+startup_profile = StartupProfile.from_argv(sys.argv)
@@ -1,19 +1,249 @@
 import json
+import logging
+import sqlite3
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-DATA_FILE = Path("data.json")
+from src.models import Accommodation, SearchProbe
 
+logger = logging.getLogger(__name__)
 
-def load_data() -> Dict[str, Any]:
-    """Charge le JSON (ou crée une structure vide si absent)."""
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {"accommodations": {}}
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    search_url TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    removed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_listings_search_url ON listings(search_url);
+CREATE INDEX IF NOT EXISTS idx_listings_active ON listings(removed_at);
 
+CREATE TABLE IF NOT EXISTS deliveries (
+    listing_id INTEGER NOT NULL,
+    telegram_id TEXT NOT NULL,
+    delivered_at REAL NOT NULL,
+    PRIMARY KEY (listing_id, telegram_id)
+);
 
-def save_data(data: Dict[str, Any]) -> None:
-    """Sauvegarde le JSON."""
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+-- Dernier instantané complet de chaque zone de recherche (disparitions et modifications par zone)
+CREATE TABLE IF NOT EXISTS area_listings (
+    search_url TEXT NOT NULL,
+    listing_id INTEGER NOT NULL,
+    card_hash TEXT,
+    price TEXT,
+    latitude REAL,
+    longitude REAL,
+    PRIMARY KEY (search_url, listing_id)
+);
+
+-- Arrivées de nouveaux logements par zone (hors premier passage), pour l'ordonnanceur
+CREATE TABLE IF NOT EXISTS arrivals (
+    search_url TEXT NOT NULL,
+    listing_id INTEGER NOT NULL,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_arrivals_seen_at ON arrivals(seen_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+LEGACY_SEEN_FILE = Path("seen_ids.json")
+
+
+class StateStore:
+    """État persistant du bot dans une base SQLite (mode WAL).
+
+    Un logement « vu » est une ligne de `listings` sans `removed_at` : les logements disparus
+    gardent leur historique (titre, première et dernière apparition). Chaque écriture est une
+    transaction : un arrêt brutal en cours d'écriture ne perd rien de l'état précédent.
+    """
+
+    def __init__(self, path: str = "state.db", legacy_seen_file: Path = LEGACY_SEEN_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self._add_missing_columns("area_listings", {"card_hash": "TEXT", "price": "TEXT", "latitude": "REAL", "longitude": "REAL"})
+        self._migrate_legacy_json(legacy_seen_file)
+
+    def _add_missing_columns(self, table: str, columns: Dict[str, str]) -> None:
+        """Colonnes ajoutées après la création de la base (CREATE TABLE IF NOT EXISTS ne les crée pas)"""
+        existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        for name, column_type in columns.items():
+            if name not in existing:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+    def _migrate_legacy_json(self, legacy_seen_file: Path) -> None:
+        """Importe une seule fois les IDs de l'ancien seen_ids.json"""
+        if self._get_meta("legacy_json_migrated") or not legacy_seen_file.exists():
+            return
+        try:
+            with open(legacy_seen_file, "r", encoding="utf-8") as f:
+                legacy_ids = json.load(f).get("seen_ids", [])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Impossible de lire {legacy_seen_file} pour la migration : {e}")
+            return
+
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO listings (id, first_seen, last_seen) VALUES (?, ?, ?)",
+                [(int(listing_id), now, now) for listing_id in legacy_ids],
+            )
+            self._set_meta("legacy_json_migrated", str(now))
+        logger.info(f"📦 {len(legacy_ids)} ID(s) migré(s) depuis {legacy_seen_file}")
+
+    def _get_meta(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def seen_ids(self) -> Set[int]:
+        rows = self.conn.execute("SELECT id FROM listings WHERE removed_at IS NULL")
+        seen_ids = {row[0] for row in rows}
+        logger.info(f"📂 {len(seen_ids)} logements déjà vus chargés")
+        return seen_ids
+
+    def titles(self) -> Dict[int, str]:
+        """Titres des logements vus (pour les notifications de disparition après un redémarrage)"""
+        rows = self.conn.execute("SELECT id, title FROM listings WHERE removed_at IS NULL AND title IS NOT NULL")
+        return {listing_id: title for listing_id, title in rows}
+
+    def mark_seen(self, accommodations: Iterable[Accommodation], search_url: str) -> None:
+        """Enregistre les nouveaux logements (ou les réactive s'ils avaient disparu)"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO listings (id, title, search_url, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    search_url = excluded.search_url,
+                    last_seen = excluded.last_seen,
+                    removed_at = NULL
+                """,
+                [(acc.id, acc.title, search_url, now, now) for acc in accommodations if acc.id],
+            )
+
+    def touch(self, listing_ids: Iterable[int]) -> None:
+        """Met à jour la date de dernière apparition des logements toujours en ligne"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE listings SET last_seen = ? WHERE id = ? AND removed_at IS NULL",
+                [(now, listing_id) for listing_id in listing_ids],
+            )
+
+    def mark_removed(self, listing_ids: Iterable[int]) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE listings SET removed_at = ? WHERE id = ? AND removed_at IS NULL",
+                [(now, listing_id) for listing_id in listing_ids],
+            )
+
+    def record_deliveries(self, deliveries: List[tuple[int, str]]) -> None:
+        """Enregistre les couples (logement, utilisateur Telegram) notifiés"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO deliveries (listing_id, telegram_id, delivered_at) VALUES (?, ?, ?)",
+                [(listing_id, str(telegram_id), now) for listing_id, telegram_id in deliveries],
+            )
+
+    def recipients(self, listing_id: int) -> Set[str]:
+        """Utilisateurs Telegram à qui ce logement a été envoyé"""
+        rows = self.conn.execute("SELECT telegram_id FROM deliveries WHERE listing_id = ?", (listing_id,))
+        return {row[0] for row in rows}
+
+    def has_area_snapshot(self, search_url: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM area_listings WHERE search_url = ? LIMIT 1", (search_url,)).fetchone()
+        return row is not None or self._get_meta(f"area_crawled:{search_url}") is not None
+
+    def area_snapshot(self, search_url: str) -> Set[int]:
+        """IDs présents lors du dernier passage complet sur cette zone (à défaut, ceux qui y ont été vus)"""
+        return set(self.area_cards(search_url))
+
+    def area_cards(self, search_url: str) -> Dict[int, Tuple[Optional[str], Optional[str]]]:
+        """ID -> (empreinte de la carte, prix) au dernier passage complet (None si inconnus)"""
+        if self.has_area_snapshot(search_url):
+            rows = self.conn.execute("SELECT listing_id, card_hash, price FROM area_listings WHERE search_url = ?", (search_url,))
+        else:
+            rows = self.conn.execute("SELECT id, NULL, NULL FROM listings WHERE search_url = ? AND removed_at IS NULL", (search_url,))
+        return {listing_id: (card_hash, price) for listing_id, card_hash, price in rows}
+
+    def area_positions(self, search_url: str) -> Dict[int, Tuple[Optional[float], Optional[float]]]:
+        """ID -> (latitude, longitude) au dernier passage complet, pour répartir la zone entre ses utilisateurs"""
+        rows = self.conn.execute("SELECT listing_id, latitude, longitude FROM area_listings WHERE search_url = ?", (search_url,))
+        return {listing_id: (latitude, longitude) for listing_id, latitude, longitude in rows}
+
+    def replace_area_snapshot(self, search_url: str, accommodations: Iterable[Accommodation]) -> None:
+        cards = {
+            acc.id: (acc.card_hash, None if acc.price is None else str(acc.price), acc.latitude, acc.longitude)
+            for acc in accommodations
+            if acc.id
+        }
+        with self.conn:
+            self.conn.execute("DELETE FROM area_listings WHERE search_url = ?", (search_url,))
+            self.conn.executemany(
+                "INSERT INTO area_listings (search_url, listing_id, card_hash, price, latitude, longitude) VALUES (?, ?, ?, ?, ?, ?)",
+                [(search_url, listing_id, *card) for listing_id, card in cards.items()],
+            )
+            # Une zone vide a aussi un instantané
+            self._set_meta(f"area_crawled:{search_url}", str(time.time()))
+
+    def listed_ids(self, search_urls: Iterable[str]) -> Set[int]:
+        """IDs présents dans le dernier instantané d'au moins une de ces zones"""
+        listed: Set[int] = set()
+        for search_url in search_urls:
+            rows = self.conn.execute("SELECT listing_id FROM area_listings WHERE search_url = ?", (search_url,))
+            listed.update(row[0] for row in rows)
+        return listed
+
+    def record_arrivals(self, listing_ids: Iterable[int], search_url: str) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO arrivals (search_url, listing_id, seen_at) VALUES (?, ?, ?)",
+                [(search_url, listing_id, now) for listing_id in listing_ids],
+            )
+
+    def arrival_history(self, since: float) -> Dict[str, List[float]]:
+        """Dates d'arrivée des nouveaux logements par zone depuis `since`"""
+        history: Dict[str, List[float]] = {}
+        rows = self.conn.execute("SELECT search_url, seen_at FROM arrivals WHERE seen_at >= ? ORDER BY seen_at", (since,))
+        for search_url, seen_at in rows:
+            history.setdefault(search_url, []).append(seen_at)
+        return history
+
+    def probe(self, search_url: str) -> SearchProbe | None:
+        """Empreinte des résultats lors du dernier passage complet sur cette zone"""
+        value = self._get_meta(f"probe:{search_url}")
+        return SearchProbe.model_validate_json(value) if value else None
+
+    def save_probe(self, search_url: str, probe: SearchProbe) -> None:
+        with self.conn:
+            self._set_meta(f"probe:{search_url}", probe.model_dump_json())
+
+    def reset(self) -> None:
+        """Oublie les logements vus et les envois (l'import de l'ancien JSON n'est pas rejoué)"""
+        logger.info("🗑️ Suppression de l'historique des logements vus (reset demandé)")
+        with self.conn:
+            self.conn.execute("DELETE FROM deliveries")
+            self.conn.execute("DELETE FROM listings")
+            self.conn.execute("DELETE FROM area_listings")
+            self.conn.execute("DELETE FROM meta WHERE key LIKE 'area_crawled:%' OR key LIKE 'probe:%'")
+
+    def close(self) -> None:
+        self.conn.close()
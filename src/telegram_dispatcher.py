@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from telepot.exception import TooManyRequestsError
+
+from src.metrics import TELEGRAM_FAILURES, TELEGRAM_RATE_LIMITS
+from src.models import Notification
+from src.telegram_notifier import TelegramNotifier, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Seau à jetons asyncio : `rate` jetons par seconde, au plus `capacity` en réserve."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1) -> None:
+        tokens = min(tokens, self.capacity)
+        while True:
+            self._refill()
+            # Pas d'await entre la vérification et la consommation : atomique dans la boucle asyncio
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+@dataclass
+class DeliveryReport:
+    """Issue des envois depuis le dernier join()."""
+    failures: int = 0
+    # (conversation, logement) dont au moins une notification n'est pas partie
+    failed: Set[Tuple[str, int]] = field(default_factory=set)
+
+    def delivered(self, telegram_id: str, listing_id: int) -> bool:
+        return (str(telegram_id), listing_id) not in self.failed
+
+
+class TelegramDispatcher:
+    """Envoie les notifications à toutes les conversations en parallèle depuis une boucle asyncio dédiée.
+
+    Chaque conversation a sa file (l'ordre des messages est conservé) et son seau à jetons ;
+    un seau global plafonne le débit total du bot. Un `retry_after` de Telegram ne met en
+    pause que la conversation concernée. send_notifications() met en file sans bloquer,
+    join() attend la fin des envois et dit, par logement, lesquels ont échoué ; chaque
+    tentative passe par TelegramNotifier.deliver().
+    """
+
+    def __init__(
+        self,
+        notifier: TelegramNotifier,
+        chat_rate: float = 1.0,
+        global_rate: float = 30.0,
+        media_group_rate: float = 0.3,
+        max_workers: int = 8,
+        max_retries: int = 3,
+    ):
+        self.notifier = notifier
+        self.chat_rate = chat_rate
+        self.media_group_rate = media_group_rate
+        self.max_retries = max_retries
+        self._report = DeliveryReport()
+
+        self._global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self._media_group_buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+
+        # Les appels telepot sont bloquants : ils tournent dans un pool de threads
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="telegram")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="telegram-dispatcher", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "TelegramDispatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def send_notifications(self, telegram_id: str, notifications: List[Notification], listing_id: Optional[int] = None) -> None:
+        """Met les notifications en file pour cette conversation (non bloquant).
+
+        Avec `listing_id`, un échec est rapporté pour ce logement par le prochain join().
+        """
+        for notification in notifications:
+            self._loop.call_soon_threadsafe(self._enqueue, str(telegram_id), notification, listing_id)
+
+    def join(self) -> DeliveryReport:
+        """Attend que toutes les files soient vidées. Retourne les échecs depuis le dernier join()."""
+        return asyncio.run_coroutine_threadsafe(self._drain_report(), self._loop).result()
+
+    def close(self) -> None:
+        """Termine les envois en cours puis arrête la boucle et le pool de threads."""
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._executor.shutdown(wait=True)
+
+    def _enqueue(self, telegram_id: str, notification: Notification, listing_id: Optional[int]) -> None:
+        queue = self._queues.get(telegram_id)
+        if queue is None:
+            queue = self._queues[telegram_id] = asyncio.Queue()
+            self._chat_buckets[telegram_id] = TokenBucket(self.chat_rate)
+            self._media_group_buckets[telegram_id] = TokenBucket(self.media_group_rate)
+            self._workers.append(self._loop.create_task(self._chat_worker(telegram_id, queue)))
+        queue.put_nowait((notification, listing_id))
+
+    async def _drain(self) -> None:
+        # Les call_soon_threadsafe déjà programmés s'exécutent avant cette coroutine
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    async def _drain_report(self) -> DeliveryReport:
+        await self._drain()
+        # Relevé dans la boucle : aucun envoi ne peut le modifier en même temps
+        report, self._report = self._report, DeliveryReport()
+        return report
+
+    async def _shutdown(self) -> None:
+        await self._drain()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def _chat_worker(self, telegram_id: str, queue: asyncio.Queue) -> None:
+        while True:
+            notification, listing_id = await queue.get()
+            try:
+                if not await self._deliver(telegram_id, notification):
+                    self._report.failures += 1
+                    if listing_id is not None:
+                        self._report.failed.add((telegram_id, listing_id))
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, telegram_id: str, notification: Notification) -> bool:
+        """True si la notification est partie, False après la dernière tentative."""
+        photos = len(notification.photo_urls[:10])
+        is_media_group = photos > 1
+
+        for attempt in range(self.max_retries):
+            await self._chat_buckets[telegram_id].acquire()
+            if is_media_group:
+                # Chaque photo d'un carrousel compte comme un message pour Telegram
+                await self._media_group_buckets[telegram_id].acquire()
+                await self._global_bucket.acquire(photos)
+            else:
+                await self._global_bucket.acquire()
+
+            try:
+                await self._loop.run_in_executor(self._executor, self.notifier.deliver, telegram_id, notification)
+                return True
+            except TooManyRequestsError as e:
+                TELEGRAM_RATE_LIMITS.inc()
+                retry_after = retry_after_seconds(e)
+                logger.warning(f"Rate limit pour {telegram_id}: pause de {retry_after}s (tentative {attempt + 1}/{self.max_retries})")
+                # Seule cette conversation attend, les autres continuent
+                await asyncio.sleep(retry_after)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'envoi à {telegram_id} (tentative {attempt + 1}/{self.max_retries}): {e}")
+                await asyncio.sleep(2)
+
+        TELEGRAM_FAILURES.inc()
+        logger.error(f"Échec d'envoi définitif à {telegram_id} après {self.max_retries} tentatives")
+        return False
@@ -1,119 +1,107 @@
 import logging
-import time
-from typing import List
+from contextlib import nullcontext
+from typing import List, Optional
 from telepot import Bot  # type: ignore
 from telepot.exception import TooManyRequestsError
+from src.file_id_cache import FileIdCache
+from src.metrics import MEDIA_GROUP_FALLBACKS, TELEGRAM_SEND_SECONDS
 from src.models import Notification
 
 logger = logging.getLogger(__name__)
 
 
+def retry_after_seconds(error: TooManyRequestsError, default: int = 30) -> int:
+    """Délai demandé par Telegram (champ parameters.retry_after de la réponse)"""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        json_data = getattr(error, "json", None) or {}
+        retry_after = json_data.get("parameters", {}).get("retry_after", default)
+    return retry_after
+
+
 class TelegramNotifier:
-    """Sends notifications to a Telegram user, one per accommodation."""
+    """Envoie une notification Telegram (texte, photo ou carrousel), en une seule tentative.
 
-    def __init__(self, bot: Bot, delay_between_messages: float = 1.0):
+    Les retries, le rate limit et la mise en file sont gérés par le TelegramDispatcher.
+    """
+
+    def __init__(self, bot: Bot, file_id_cache: Optional[FileIdCache] = None):
         self.bot = bot
-        self.delay_between_messages = delay_between_messages
+        self.file_id_cache = file_id_cache
 
-    def send_notifications(self, telegram_id: str, notifications: List[Notification]) -> None:
-        """Send each notification separately, with photo carousel if available."""
-        for i, notif in enumerate(notifications):
-            # Ajouter un délai entre les messages (sauf pour le premier)
-            if i > 0:
-                time.sleep(self.delay_between_messages)
-                
-            self._send_single_notification(telegram_id, notif)
+    def deliver(self, telegram_id: str, notification: Notification) -> None:
+        """Une seule tentative d'envoi (sans retry), appelée par le TelegramDispatcher"""
+        photos = len(notification.photo_urls)
+        kind = "media_group" if photos > 1 else "photo" if photos or notification.photo_url else "message"
+        with TELEGRAM_SEND_SECONDS.time(kind=kind):
+            self._deliver(telegram_id, notification)
 
-    def _send_single_notification(self, telegram_id: str, notification: Notification) -> None:
-        """Envoie une notification unique avec gestion du rate limit"""
-        max_retries = 3
-        
-        for attempt in range(max_retries):
+    def _deliver(self, telegram_id: str, notification: Notification) -> None:
+        if notification.photo_urls and len(notification.photo_urls) > 1:
+            # NOUVEAU: Envoyer un carrousel (MediaGroup) pour plusieurs photos
+            logger.info(f"Envoi d'un carrousel de {len(notification.photo_urls)} photos")
+            self._send_media_group(telegram_id, notification)
+        elif notification.photo_urls and len(notification.photo_urls) == 1:
+            # Une seule photo
+            logger.info("Envoi d'une photo unique")
+            self._send_photo(telegram_id, str(notification.photo_urls[0]), notification.message)
+        elif getattr(notification, "photo_url", None):
+            # Ancienne méthode (compatibilité)
+            logger.info("Envoi d'une photo (méthode legacy)")
+            self.bot.sendPhoto(
+                chat_id=telegram_id,
+                photo=str(notification.photo_url),
+                caption=notification.message,
+                parse_mode="HTML"
+            )
+        else:
+            # Pas de photo
+            logger.info("Envoi d'un message texte uniquement")
+            self.bot.sendMessage(
+                chat_id=telegram_id,
+                text=notification.message,
+                parse_mode="HTML"
+            )
+
+    def _upload_lock(self, urls: List[str]):
+        """Verrou tant que des photos n'ont pas de file_id : le premier envoi les télécharge pour tous"""
+        if self.file_id_cache and not all(self.file_id_cache.has(url) for url in urls):
+            return self.file_id_cache.upload_lock(urls)
+        return nullcontext()
+
+    def _media_ref(self, url: str) -> str:
+        """file_id en cache si disponible, sinon l'URL (Telegram télécharge la photo)"""
+        return (self.file_id_cache.get(url) if self.file_id_cache else None) or url
+
+    def _remember_file_id(self, url: str, message: dict) -> None:
+        if self.file_id_cache and message.get("photo"):
+            # La dernière taille est la plus grande
+            self.file_id_cache.put(url, message["photo"][-1]["file_id"])
+
+    def _send_photo(self, telegram_id: str, url: str, caption: str) -> None:
+        with self._upload_lock([url]):
+            photo = self._media_ref(url)
             try:
-                if notification.photo_urls and len(notification.photo_urls) > 1:
-                    # NOUVEAU: Envoyer un carrousel (MediaGroup) pour plusieurs photos
-                    logger.info(f"Envoi d'un carrousel de {len(notification.photo_urls)} photos")
-                    self._send_media_group(telegram_id, notification)
-                elif notification.photo_urls and len(notification.photo_urls) == 1:
-                    # Une seule photo
-                    logger.info("Envoi d'une photo unique")
-                    self.bot.sendPhoto(
-                        chat_id=telegram_id,
-                        photo=str(notification.photo_urls[0]),
-                        caption=notification.message,
-                        parse_mode="HTML"
-                    )
-                elif getattr(notification, "photo_url", None):
-                    # Ancienne méthode (compatibilité)
-                    logger.info("Envoi d'une photo (méthode legacy)")
-                    self.bot.sendPhoto(
-                        chat_id=telegram_id,
-                        photo=str(notification.photo_url),
-                        caption=notification.message,
-                        parse_mode="HTML"
-                    )
-                else:
-                    # Pas de photo
-                    logger.info("Envoi d'un message texte uniquement")
-                    self.bot.sendMessage(
-                        chat_id=telegram_id,
-                        text=notification.message,
-                        parse_mode="HTML"
-                    )
-                
-                # Si on arrive ici, l'envoi a réussi
-                break
-                
-            except TooManyRequestsError as e:
-                retry_after = getattr(e, 'retry_after', 30)
-                logger.warning(f"Rate limit atteint. Attente de {retry_after} secondes (tentative {attempt + 1}/{max_retries})")
-                
-                if attempt < max_retries - 1:  # Pas de sleep à la dernière tentative
-                    time.sleep(retry_after)
-                else:
-                    logger.error(f"Échec d'envoi après {max_retries} tentatives: {e}")
-                    raise
-                    
-            except Exception as e:
-                logger.error(f"Erreur lors de l'envoi (tentative {attempt + 1}/{max_retries}): {e}")
-                
-                if attempt < max_retries - 1:
-                    time.sleep(2)  # Attente courte pour autres erreurs
-                else:
-                    logger.error(f"Échec d'envoi définitif après {max_retries} tentatives")
-                    raise
+                message = self.bot.sendPhoto(chat_id=telegram_id, photo=photo, caption=caption, parse_mode="HTML")
+            except TooManyRequestsError:
+                raise
+            except Exception:
+                if photo != url:
+                    # file_id refusé : le retirer pour que le prochain envoi retélécharge la photo
+                    self.file_id_cache.invalidate([url])
+                raise
+            if photo == url:
+                self._remember_file_id(url, message)
 
     def _send_media_group(self, telegram_id: str, notification: Notification) -> None:
-        """NOUVEAU: Envoie un carrousel de photos via MediaGroup"""
+        """NOUVEAU: Envoie un carrousel de photos via MediaGroup (file_id réutilisés si déjà envoyées)"""
+        urls = [str(photo_url) for photo_url in notification.photo_urls[:10]]  # Max 10 photos
         try:
-            # Préparer les médias pour le carrousel
-            media = []
-            
-            for i, photo_url in enumerate(notification.photo_urls[:10]):  # Max 10 photos
-                media_item = {
-                    'type': 'photo',
-                    'media': str(photo_url)
-                }
-                
-                # Ajouter la caption seulement à la première photo
-                if i == 0:
-                    media_item['caption'] = notification.message
-                    media_item['parse_mode'] = 'HTML'
-                
-                media.append(media_item)
-            
-            logger.info(f"Envoi du carrousel avec {len(media)} photos")
-            
-            # Envoyer le carrousel
-            self.bot.sendMediaGroup(
-                chat_id=telegram_id,
-                media=media
-            )
-            
-            logger.info("Carrousel envoyé avec succès")
+            with self._upload_lock(urls):
+                self._send_media_group_items(telegram_id, notification, urls)
             
         except TooManyRequestsError:
-            # Re-raise pour être gérée par _send_single_notification
+            # Re-raise pour être gérée par le TelegramDispatcher (retry_after)
             raise
             
         except Exception as e:
@@ -121,18 +109,55 @@ class TelegramNotifier:
             # Fallback: envoyer la première photo avec caption
             if notification.photo_urls:
                 logger.info("Fallback: envoi de la première photo uniquement")
+                MEDIA_GROUP_FALLBACKS.inc(fallback="photo")
                 try:
-                    self.bot.sendPhoto(
-                        chat_id=telegram_id,
-                        photo=str(notification.photo_urls[0]),
-                        caption=notification.message,
-                        parse_mode="HTML"
-                    )
+                    self._send_photo(telegram_id, urls[0], notification.message)
                 except Exception as fallback_error:
                     logger.error(f"Erreur fallback: {fallback_error}")
+                    MEDIA_GROUP_FALLBACKS.inc(fallback="text")
                     # Si même le fallback échoue, envoyer juste le texte
                     self.bot.sendMessage(
                         chat_id=telegram_id,
                         text=notification.message,
                         parse_mode="HTML"
-                    )
\ No newline at end of file
+                    )
+
+    def _send_media_group_items(self, telegram_id: str, notification: Notification, urls: List[str]) -> None:
+        # Préparer les médias pour le carrousel
+        media = []
+        
+        for i, url in enumerate(urls):
+            media_item = {
+                'type': 'photo',
+                'media': self._media_ref(url)
+            }
+            
+            # Ajouter la caption seulement à la première photo
+            if i == 0:
+                media_item['caption'] = notification.message
+                media_item['parse_mode'] = 'HTML'
+            
+            media.append(media_item)
+        
+        logger.info(f"Envoi du carrousel avec {len(media)} photos")
+        
+        # Envoyer le carrousel
+        try:
+            messages = self.bot.sendMediaGroup(
+                chat_id=telegram_id,
+                media=media
+            )
+        except TooManyRequestsError:
+            raise
+        except Exception:
+            if self.file_id_cache:
+                # Un file_id refusé ne doit pas être réutilisé
+                self.file_id_cache.invalidate([url for url, item in zip(urls, media) if item['media'] != url])
+            raise
+        
+        # Telegram renvoie un message par photo, dans l'ordre
+        for url, item, message in zip(urls, media, messages or []):
+            if item['media'] == url:
+                self._remember_file_id(url, message)
+        
+        logger.info("Carrousel envoyé avec succès")
\ No newline at end of file
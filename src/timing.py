@@ -0,0 +1,38 @@
+import logging
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator, List
+
+from src.models import StepTiming
+
+
+class StepTimer:
+    """Mesure la durée de chaque étape d'un processus et produit un rapport structuré."""
+
+    def __init__(self):
+        self.steps: List[StepTiming] = []
+        self.started = perf_counter()
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.steps.append(StepTiming(step=name, duration=perf_counter() - start, success=success))
+
+    @property
+    def total(self) -> float:
+        """Durée écoulée depuis la création (les étapes peuvent être imbriquées)."""
+        return perf_counter() - self.started
+
+    def report(self) -> List[dict]:
+        return [s.model_dump() for s in self.steps]
+
+    def log_report(self, logger: logging.Logger, title: str) -> None:
+        logger.info(f"⏱️ {title} : {self.total:.1f}s au total")
+        for s in self.steps:
+            status = "✅" if s.success else "❌"
+            logger.info(f"   {status} {s.step}: {s.duration:.2f}s")
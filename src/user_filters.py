@@ -0,0 +1,112 @@
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from src.models import Accommodation, UserConf
+
+SURFACE_PATTERN = re.compile(r"(\d+(?:[.,]\d+)?)\s*m(?:²|2)")
+WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class ListingFeatures:
+    """Caractéristiques d'un logement extraites une seule fois, quel que soit le nombre d'utilisateurs."""
+
+    price: Optional[float]
+    surface: Optional[float]
+    tokens: Tuple[str, ...]
+    words: FrozenSet[str]
+    text: str
+
+    @classmethod
+    def from_accommodation(cls, acc: Accommodation) -> "ListingFeatures":
+        text = (acc.overview_details or "").casefold()
+        surface_match = SURFACE_PATTERN.search(text)
+        tokens = tuple(WORD_PATTERN.findall(text))
+        return cls(
+            price=acc.price if isinstance(acc.price, float) else None,
+            surface=float(surface_match.group(1).replace(",", ".")) if surface_match else None,
+            tokens=tokens,
+            words=frozenset(tokens),
+            text=text,
+        )
+
+    def has_phrase(self, phrase: Tuple[str, ...]) -> bool:
+        """True si les mots de `phrase` se suivent dans le descriptif (« T1 bis », « studio double »)."""
+        if len(phrase) == 1:
+            return phrase[0] in self.words
+        if not set(phrase) <= self.words:
+            return False
+        return any(self.tokens[i:i + len(phrase)] == phrase for i in range(len(self.tokens) - len(phrase) + 1))
+
+
+def type_phrase(accommodation_type: str) -> Tuple[str, ...]:
+    """Type configuré découpé en mots comme le descriptif : la casse et la ponctuation sont ignorées."""
+    return tuple(WORD_PATTERN.findall(accommodation_type.casefold()))
+
+
+class CompiledFilter:
+    """Règles d'un utilisateur normalisées pour le FilterIndex (une regex pour tous les mots-clés)."""
+
+    def __init__(self, user_conf: UserConf):
+        filters = user_conf.filters
+        self.max_price = filters.max_price
+        self.min_surface = filters.min_surface
+        self.types = frozenset(phrase for phrase in map(type_phrase, filters.types) if phrase)
+        self.keywords = re.compile("|".join(re.escape(k.casefold()) for k in filters.keywords)) if filters.keywords else None
+        self.ignored_ids = frozenset(user_conf.ignored_ids) | frozenset(filters.ignored_ids)
+
+
+class FilterIndex:
+    """Index des filtres d'un groupe d'utilisateurs.
+
+    Les seuils de prix et de surface sont triés (bisect), les types et les IDs ignorés indexés
+    par valeur : un logement n'évalue les mots-clés que pour les utilisateurs restants. Prix ou
+    surface inconnus : le logement est gardé plutôt que manqué.
+    """
+
+    def __init__(self, user_confs: List[UserConf]):
+        self.user_confs = list(user_confs)
+        self.filters = [CompiledFilter(conf) for conf in self.user_confs]
+        everyone = set(range(len(self.filters)))
+
+        by_price = sorted((f.max_price, i) for i, f in enumerate(self.filters) if f.max_price is not None)
+        self._max_prices = [price for price, _ in by_price]
+        self._max_price_users = [i for _, i in by_price]
+        self._no_max_price = everyone - set(self._max_price_users)
+
+        by_surface = sorted((f.min_surface, i) for i, f in enumerate(self.filters) if f.min_surface is not None)
+        self._min_surfaces = [surface for surface, _ in by_surface]
+        self._min_surface_users = [i for _, i in by_surface]
+        self._no_min_surface = everyone - set(self._min_surface_users)
+
+        self._by_type: Dict[Tuple[str, ...], Set[int]] = {}
+        self._ignored: Dict[int, Set[int]] = {}
+        for i, f in enumerate(self.filters):
+            for accommodation_type in f.types:
+                self._by_type.setdefault(accommodation_type, set()).add(i)
+            for ignored_id in f.ignored_ids:
+                self._ignored.setdefault(ignored_id, set()).add(i)
+        self._any_type = {i for i, f in enumerate(self.filters) if not f.types}
+        self._keyword_users = {i for i, f in enumerate(self.filters) if f.keywords is not None}
+
+    def match(self, acc: Accommodation) -> List[UserConf]:
+        """Utilisateurs (dans l'ordre de configuration) dont les règles acceptent ce logement."""
+        features = ListingFeatures.from_accommodation(acc)
+        candidates = set(range(len(self.filters)))
+
+        if features.price is not None:
+            start = bisect_left(self._max_prices, features.price)
+            candidates = self._no_max_price | set(self._max_price_users[start:])
+        if features.surface is not None:
+            end = bisect_right(self._min_surfaces, features.surface)
+            candidates &= self._no_min_surface | set(self._min_surface_users[:end])
+        if self._by_type:
+            candidates &= self._any_type.union(*(users for phrase, users in self._by_type.items() if features.has_phrase(phrase)))
+        candidates -= self._ignored.get(acc.id, set())
+
+        return [
+            self.user_confs[i] for i in sorted(candidates)
+            if i not in self._keyword_users or self.filters[i].keywords.search(features.text)
+        ]
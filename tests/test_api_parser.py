@@ -0,0 +1,94 @@
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from benchmarks.api_stub import FIXTURES_DIR, make_handler
+from src.api_parser import ApiParser, accommodation_from_api, search_payload
+from src.fetchers import FetchError, SearchApiFetcher
+
+SEARCH_URL = "https://trouverunlogement.lescrous.fr/tools/42/search?bounds=2.8_42.75_2.95_42.65"
+
+
+@pytest.fixture
+def api_fetcher():
+    """SearchApiFetcher branché sur le serveur local qui rejoue fixtures/api_search_<n>.json."""
+    servers = []
+
+    def start(size: int) -> SearchApiFetcher:
+        response = json.loads((FIXTURES_DIR / f"api_search_{size}.json").read_text(encoding="utf-8"))
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(response))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        host, port = server.server_address
+        return SearchApiFetcher(requests.Session(), f"http://{host}:{port}/api/fr/search/{{tool_id}}", timeout=5)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_search_payload_reads_tool_and_bounds():
+    tool_id, payload = search_payload(SEARCH_URL + "&page=3", 3, 24)
+    assert tool_id == "42"
+    assert payload["idTool"] == 42 and payload["page"] == 3 and payload["pageSize"] == 24
+    assert payload["location"] == [{"lon": 2.8, "lat": 42.75}, {"lon": 2.95, "lat": 42.65}]
+
+    assert search_payload("https://trouverunlogement.lescrous.fr/tools/42/search", 1, 24)[1]["location"] is None
+    with pytest.raises(FetchError):
+        search_payload("https://trouverunlogement.lescrous.fr/search", 1, 24)
+
+
+def test_accommodation_from_api_converts_rent_photos_and_coordinates():
+    item = json.loads((FIXTURES_DIR / "api_search_1.json").read_text(encoding="utf-8"))["results"]["items"][0]
+    acc = accommodation_from_api(item, "42")
+
+    assert acc.id == item["id"]
+    assert acc.price == min(mode["rent"]["min"] for mode in item["occupationModes"]) / 100
+    assert str(acc.detail_url) == f"https://trouverunlogement.lescrous.fr/tools/42/accommodations/{item['id']}"
+    assert acc.all_images and all(str(src).startswith("https://") for src in acc.all_images)
+    assert acc.image_url == acc.all_images[0]
+    assert acc.latitude == item["residence"]["location"]["lat"]
+    assert acc.card_hash
+    assert accommodation_from_api({"label": "Sans ID"}, "42") is None
+
+
+def test_stream_accommodations_follows_pagination(api_fetcher):
+    fetcher = api_fetcher(50)
+    parser = ApiParser(None, fetcher, page_size=12)
+
+    search_results, stream = parser.stream_accommodations(SEARCH_URL)
+    accommodations = list(stream)
+
+    assert search_results.count == 50
+    assert len(accommodations) == 50 and len({acc.id for acc in accommodations}) == 50
+    assert search_results.accommodations == accommodations
+    assert fetcher.page_loads == 5  # 12 + 12 + 12 + 12 + 2
+    assert all(acc.latitude is not None for acc in accommodations)
+
+
+def test_stream_accommodations_skips_unchanged_results(api_fetcher):
+    # Sonde seulement quand la première page contient tous les résultats
+    fetcher = api_fetcher(1)
+    parser = ApiParser(None, fetcher)
+    search_results, stream = parser.stream_accommodations(SEARCH_URL)
+    list(stream)
+
+    unchanged, stream = parser.stream_accommodations(SEARCH_URL, previous_probe=search_results.probe)
+    assert unchanged.unchanged and list(stream) == []
+    assert unchanged.count == 1
+    assert fetcher.page_loads == 2
+
+
+def test_stream_accommodations_with_no_result(api_fetcher):
+    fetcher = api_fetcher(0)
+    parser = ApiParser(None, fetcher, page_size=12)
+
+    search_results, stream = parser.stream_accommodations(SEARCH_URL)
+
+    assert list(stream) == []
+    assert search_results.count == 0 and not search_results.unchanged
+    assert fetcher.page_loads == 1
@@ -0,0 +1,67 @@
+from benchmarks.bench_parser import FIXTURES_DIR
+from src.card_diff import diff_cards
+from src.detail_cache import DetailCache
+from src.models import Accommodation
+from src.parser import SEARCH_RESULTS_ONLY, Parser, _card_model, _is_accommodation_card
+
+
+def acc(listing_id, price, card_hash):
+    return Accommodation(id=listing_id, title=f"Logement {listing_id}", price=price, card_hash=card_hash)
+
+
+def test_added_removed_and_modified_cards():
+    previous = {1: ("h1", "400.0"), 2: ("h2", "380.0"), 3: ("h3", "350.0")}
+    diff = diff_cards(previous, [acc(1, 400.0, "h1"), acc(2, 380.0, "h2-photo"), acc(4, 300.0, "h4")])
+
+    assert [a.id for a in diff.added] == [4]
+    assert diff.removed == {3}
+    assert [(a.id, previous_price) for a, previous_price in diff.modified] == [(2, "380.0")]
+    # Carte modifiée au même prix (autre photo) : pas un changement de prix
+    assert diff.price_changes() == []
+
+
+def test_price_changes_keep_the_previous_price():
+    diff = diff_cards({1: ("h1", "400.0"), 2: ("h2", None)}, [acc(1, 385.0, "h1b"), acc(2, 300.0, "h2b")])
+
+    assert [(a.id, a.price, previous_price) for a, previous_price in diff.price_changes()] == [(1, 385.0, "400.0")]
+    assert len(diff.modified) == 2
+
+
+def test_snapshot_without_hashes_reports_no_modification():
+    # Instantané antérieur aux empreintes, ou carte sans empreinte
+    diff = diff_cards({1: (None, None), 2: ("h2", "380.0")}, [acc(1, 400.0, "h1"), acc(2, 360.0, None)])
+    assert diff.modified == [] and diff.added == [] and diff.removed == set()
+
+
+def test_duplicates_and_missing_ids_are_ignored():
+    cards = [acc(1, 400.0, "h1"), acc(1, 400.0, "h1"), Accommodation(id=None, title="Sans ID", price=None)]
+    diff = diff_cards({}, cards)
+    assert [a.id for a in diff.added] == [1]
+
+
+def test_detail_cache_entry_is_stale_once_the_card_changes(tmp_path):
+    cache = DetailCache(str(tmp_path / "detail_cache.json"))
+    cache.put(1, ["https://example.org/1.jpg"], card_hash="h1")
+    cache.put(2, ["https://example.org/2.jpg"])
+
+    assert cache.get(1, "h1") == ["https://example.org/1.jpg"]
+    assert cache.get(1, "h1b") is None
+    # Entrée invalidée : plus servie, même avec l'ancienne empreinte
+    assert cache.get(1, "h1") is None
+    # Entrée sans empreinte (cache antérieur) : toujours servie
+    assert cache.get(2, "h2") == ["https://example.org/2.jpg"]
+
+
+def test_unchanged_card_reuses_the_validated_model_without_sharing_photos():
+    parser = Parser(None)
+    html = (FIXTURES_DIR / "search_1.html").read_text(encoding="utf-8")
+    card = parser._make_soup(html, SEARCH_RESULTS_ONLY).find("li", class_=_is_accommodation_card)
+
+    first = parser._parse_accommodation_card(card)
+    hits = _card_model.cache_info().hits
+    second = parser._parse_accommodation_card(card)
+
+    assert _card_model.cache_info().hits == hits + 1
+    assert first == second and first is not second
+    first.all_images.append("https://example.org/1.jpg")
+    assert second.all_images == [] and parser._parse_accommodation_card(card).all_images == []
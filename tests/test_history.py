@@ -0,0 +1,57 @@
+import time
+from datetime import date
+
+from src.history import SnapshotHistory, area_key, complete_members_length
+from src.models import Accommodation
+
+SEARCH_URL = "https://trouverunlogement.lescrous.fr/tools/42/search?bounds=2.8_42.75_2.95_42.65"
+NOON = time.mktime(date.today().timetuple()) + 12 * 3600
+
+
+def acc(listing_id, price="400 €"):
+    return Accommodation(id=listing_id, title=f"Logement {listing_id}", price=price)
+
+
+def partition(tmp_path):
+    return tmp_path / f"day={date.today().isoformat()}" / f"area={area_key(SEARCH_URL)}.csv.gz"
+
+
+def test_passes_are_aggregated_per_listing(tmp_path):
+    history = SnapshotHistory(str(tmp_path))
+    history.record(SEARCH_URL, [acc(1), acc(2)], seen_at=NOON)
+    history.record_presence(SEARCH_URL, [1], seen_at=NOON + 600)
+    history.record(SEARCH_URL, [acc(1, "380 €")], seen_at=NOON + 1200)
+
+    listings = SnapshotHistory(str(tmp_path)).listings(days=1)
+    assert set(listings) == {1, 2}
+    assert listings[1].first_seen == NOON and listings[1].last_seen == NOON + 1200
+    assert listings[1].observations == 3
+    assert listings[1].prices == ["400 €", "380 €"]
+    assert listings[2].lifetime == 0
+
+
+def test_torn_tail_is_truncated_before_the_next_pass(tmp_path):
+    history = SnapshotHistory(str(tmp_path))
+    history.record(SEARCH_URL, [acc(1)], seen_at=NOON)
+    path = partition(tmp_path)
+    intact = path.stat().st_size
+    history.record(SEARCH_URL, [acc(2)], seen_at=NOON + 600)
+    # Arrêt pendant l'écriture du second passage
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 5)
+    assert complete_members_length(path.read_bytes()) == intact
+
+    # Nouveau processus : la fin tronquée est retirée avant d'ajouter le passage suivant
+    SnapshotHistory(str(tmp_path)).record(SEARCH_URL, [acc(3)], seen_at=NOON + 1200)
+
+    assert complete_members_length(path.read_bytes()) == path.stat().st_size
+    assert set(SnapshotHistory(str(tmp_path)).listings(days=1)) == {1, 3}
+
+
+def test_area_pattern_selects_partitions(tmp_path):
+    history = SnapshotHistory(str(tmp_path))
+    history.record(SEARCH_URL, [acc(1)], seen_at=NOON)
+    history.record("https://trouverunlogement.lescrous.fr/tools/42/search?bounds=5.3_43.3_5.4_43.2", [acc(2)], seen_at=NOON)
+
+    assert set(history.listings(days=1, pattern="2.8_42.75")) == {1}
+    assert set(history.listings(days=1)) == {1, 2}
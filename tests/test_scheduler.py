@@ -0,0 +1,109 @@
+import time
+
+import pytest
+
+from src.scheduler import WEEK_BUCKETS, AdaptiveScheduler, week_bucket
+from src.search_planner import SearchPlan
+
+NOW = time.mktime((2026, 10, 12, 10, 0, 0, 0, 0, -1))  # lundi 10h, heure locale
+
+
+def scheduler(**kwargs):
+    options = dict(base_interval=1800, min_interval=600, max_interval=7200, jitter=0.0)
+    options.update(kwargs)
+    return AdaptiveScheduler(**options)
+
+
+def plans(*urls):
+    return [SearchPlan(search_url=url) for url in urls]
+
+
+def test_square_root_allocation_keeps_the_weekly_mean_at_base_interval():
+    sched = scheduler(min_interval=1, max_interval=10**6)
+    # Arrivées concentrées le lundi à 10h
+    sched.learn({"a": [NOW + week * 7 * 86400 for week in range(-4, 0) for _ in range(5)]})
+
+    intervals = sched._intervals["a"]
+    assert intervals[week_bucket(NOW)] == min(intervals)
+    assert sched.interval("a", NOW) < 1800 < sched.interval("a", NOW + 12 * 3600)
+    # Même nombre de passages par semaine que l'attente fixe
+    assert sum(1 / interval for interval in intervals) / WEEK_BUCKETS == pytest.approx(1 / 1800)
+
+
+def test_intervals_stay_within_bounds_and_burst_after_an_arrival():
+    sched = scheduler()
+    sched.learn({"a": [NOW - 7 * 86400] * 50})
+    assert all(600 <= interval <= 7200 for interval in sched._intervals["a"])
+
+    sched.record("a", page_loads=1, arrivals=1, now=NOW + 3 * 3600)
+    assert sched.interval("a", NOW + 3 * 3600 + 60) == 600
+    assert sched.interval("a", NOW + 3 * 3600 + 1800) != 600
+
+
+def test_default_budget_refills_at_the_fixed_interval_load():
+    sched = scheduler(max_page_loads_per_hour=None)
+    sched.due(plans("a", "b"), now=NOW)
+    for url in ("a", "b"):
+        sched.areas[url].page_cost = 3.0
+    # Deux zones de 3 pages toutes les 30 minutes, réserve d'une journée à ce rythme
+    assert sched.hourly_budget() == pytest.approx(12.0)
+    assert sched.budget_capacity() == pytest.approx(12.0 * 24)
+    assert scheduler(max_page_loads_per_hour=40).budget_capacity() == 40
+
+
+def test_hot_hour_runs_faster_than_the_fixed_interval_with_the_default_budget():
+    sched = scheduler(base_interval=1200)
+    sched.learn({"a": [NOW + week * 7 * 86400 for week in range(-4, 0) for _ in range(5)]})
+    assert sched.interval("a", NOW) == 600
+
+    checks, now = 0, NOW
+    while now < NOW + 3600:
+        sched.record_page_loads(1, now)  # vérification de session du cycle
+        for plan in sched.due(plans("a"), now=now):
+            sched.record(plan.search_url, page_loads=2, arrivals=0, now=now)
+            checks += 1
+        now += max(60.0, sched.seconds_until_due(now=now))
+    assert checks == 6
+
+
+def test_due_areas_most_overdue_first_within_budget():
+    sched = scheduler(max_page_loads_per_hour=5)
+    all_plans = plans("a", "b", "c")
+    sched.due(all_plans, now=NOW)
+    sched.areas["a"].next_due = NOW - 10
+    sched.areas["b"].next_due = NOW - 300
+    sched.areas["c"].next_due = NOW + 300
+
+    assert [plan.search_url for plan in sched.due(all_plans, now=NOW)] == ["b", "a"]
+
+    # Jetons épuisés par les chargements hors zone (vérification de session, login)
+    sched.record_page_loads(5, now=NOW)
+    assert sched.due(all_plans, now=NOW) == []
+    # Deux jetons (coût de b) regagnés en 2 / 5 d'heure
+    assert sched.seconds_until_due(now=NOW) == pytest.approx(1440)
+    # c est aussi échue, mais il ne reste qu'un jeton après a et b
+    assert [plan.search_url for plan in sched.due(all_plans, now=NOW + 3600)] == ["b", "a"]
+
+
+def test_first_due_area_runs_even_if_its_cost_exceeds_the_budget():
+    sched = scheduler(max_page_loads_per_hour=3)
+    all_plans = plans("a", "b")
+    sched.due(all_plans, now=NOW)
+    sched.areas["a"].page_cost = 5.0
+
+    assert [plan.search_url for plan in sched.due(all_plans, now=NOW)] == ["a"]
+
+
+def test_record_postpone_and_forgotten_areas():
+    sched = scheduler(max_page_loads_per_hour=100)
+    sched.due(plans("a", "b"), now=NOW)
+    sched.record("a", page_loads=4, arrivals=0, now=NOW)
+    assert sched.areas["a"].page_cost == pytest.approx(0.7 * 2.0 + 0.3 * 4)
+    assert sched.areas["a"].next_due == pytest.approx(NOW + sched.interval("a", NOW))
+
+    sched.postpone(900, now=NOW)
+    assert sched.areas["b"].next_due == NOW + 900
+    assert sched.seconds_until_due(now=NOW) == pytest.approx(900)
+
+    sched.due(plans("a"), now=NOW)
+    assert set(sched.areas) == {"a"}
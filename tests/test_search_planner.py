@@ -0,0 +1,107 @@
+from src.models import Accommodation, SearchResults, UserConf
+from src.search_planner import Bounds, SearchPlanner, normalize_search_url
+from src.storage import StateStore
+from src.telegram_dispatcher import DeliveryReport
+
+TOOL_URL = "https://trouverunlogement.lescrous.fr/tools/32/search"
+
+
+def user(name, bounds):
+    return UserConf(conf_title=name, telegram_id=name, search_url=f"{TOOL_URL}?bounds={bounds}")
+
+
+def listing(latitude, longitude):
+    return Accommodation(id=1, title="Studio", price=None, latitude=latitude, longitude=longitude)
+
+
+def test_bounds_param_roundtrip_normalizes_corners():
+    bounds = Bounds.from_param("2.9_42.6_2.8_42.7")
+    assert bounds == Bounds(west=2.8, south=42.6, east=2.9, north=42.7)
+    assert Bounds.from_param(bounds.to_param()) == bounds
+    assert Bounds.from_param("pas_des_nombres") is None
+
+
+def test_identical_urls_in_any_param_order_share_one_plan():
+    a = UserConf(conf_title="a", telegram_id="1", search_url=f"{TOOL_URL}?page=1&bounds=2.8_42.7_2.9_42.6")
+    b = UserConf(conf_title="b", telegram_id="2", search_url=f"{TOOL_URL}?bounds=2.8_42.7_2.9_42.6&page=1")
+    assert normalize_search_url(str(a.search_url)) == normalize_search_url(str(b.search_url))
+
+    plans = SearchPlanner(coalesce=False).plan([a, b])
+    assert len(plans) == 1 and plans[0].users == [a, b]
+
+
+def test_overlapping_bounds_are_merged_and_routed_per_user():
+    west = user("west", "2.80_42.70_2.90_42.60")
+    east = user("east", "2.85_42.70_2.95_42.60")
+    plans = SearchPlanner(max_growth=1.5).plan([west, east])
+
+    assert len(plans) == 1
+    plan = plans[0]
+    assert plan.merged
+    assert "bounds=2.8_42.7_2.95_42.6" in plan.search_url
+    assert plan.wants(west, listing(42.65, 2.82)) and not plan.wants(east, listing(42.65, 2.82))
+    assert plan.wants(east, listing(42.65, 2.93)) and not plan.wants(west, listing(42.65, 2.93))
+    # Sans coordonnées, le logement est gardé pour tout le monde
+    assert plan.wants(west, listing(None, None)) and plan.wants(east, listing(None, None))
+
+
+def test_nearby_bounds_within_margin_are_merged():
+    a = user("a", "2.80_42.70_2.90_42.60")
+    b = user("b", "2.905_42.70_3.00_42.60")
+    assert len(SearchPlanner(merge_margin=0.01).plan([a, b])) == 1
+    assert len(SearchPlanner(merge_margin=0.001).plan([a, b])) == 2
+
+
+def test_distant_bounds_stay_separate_when_union_grows_too_much():
+    # Carrés qui se touchent par un coin : l'englobant (4) dépasse 1.5 fois leur somme (2)
+    a = user("a", "2.0_43.0_3.0_42.0")
+    b = user("b", "3.0_44.0_4.0_43.0")
+    plans = SearchPlanner(max_growth=1.5).plan([a, b])
+    assert len(plans) == 2
+    assert {plan.search_url for plan in plans} == {str(a.search_url), str(b.search_url)}
+    assert not any(plan.merged for plan in plans)
+
+
+def test_contained_bounds_merge_into_the_larger_one():
+    outer = user("outer", "2.0_43.0_3.0_42.0")
+    inner = user("inner", "2.4_42.6_2.5_42.5")
+    plans = SearchPlanner(max_growth=1.0).plan([outer, inner])
+    assert len(plans) == 1
+    assert "bounds=2.0_43.0_3.0_42.0" in plans[0].search_url
+
+
+def test_chain_of_overlaps_merges_transitively():
+    users = [user(str(i), f"{2.0 + i * 0.08}_42.7_{2.1 + i * 0.08}_42.6") for i in range(4)]
+    plans = SearchPlanner(max_growth=2.0).plan(users)
+    assert len(plans) == 1
+    assert sorted(u.conf_title for u in plans[0].users) == ["0", "1", "2", "3"]
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.messages = []
+
+    def send_notifications(self, telegram_id, notifications, listing_id=None):
+        self.messages += [(telegram_id, notification.message) for notification in notifications]
+
+    def join(self):
+        return DeliveryReport()
+
+
+def test_unchanged_merged_area_reports_no_listing_per_user_rectangle(tmp_path):
+    from main import report_unchanged_area
+
+    west = user("west", "2.80_42.70_2.90_42.60")
+    east = user("east", "2.85_42.70_2.95_42.60")
+    plan = SearchPlanner().plan([west, east])[0]
+    state_store = StateStore(str(tmp_path / "state.db"), tmp_path / "absent.json")
+    # Dernier passage : un seul logement, dans le rectangle de west uniquement
+    west_listing = Accommodation(id=1, title="Studio", price=None, latitude=42.65, longitude=2.82)
+    state_store.replace_area_snapshot(plan.search_url, [west_listing])
+
+    notifier = RecordingNotifier()
+    unchanged = SearchResults(search_url=plan.search_url, count=1, accommodations=[], unchanged=True)
+    report_unchanged_area(plan, unchanged, set(), state_store, notifier)
+    state_store.close()
+
+    assert notifier.messages == [("east", "❌ Aucun logement disponible actuellement.")]
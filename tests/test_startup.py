@@ -0,0 +1,11 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_importing_main_does_not_load_browser_or_telegram_packages():
+    code = "import sys, main; print(sorted(m for m in ('selenium', 'telepot', 'webdriver_manager') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
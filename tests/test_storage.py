@@ -0,0 +1,118 @@
+import json
+import sqlite3
+
+import pytest
+
+from src.models import Accommodation
+from src.storage import StateStore
+
+SEARCH_URL = "https://trouverunlogement.lescrous.fr/tools/32/search?bounds=2.8_42.7_2.9_42.6"
+
+
+def acc(listing_id, title=None, price=None, card_hash=None):
+    return Accommodation(id=listing_id, title=title or f"Résidence {listing_id}", price=price, card_hash=card_hash)
+
+
+@pytest.fixture
+def store(tmp_path):
+    state_store = StateStore(str(tmp_path / "state.db"), tmp_path / "seen_ids.json")
+    yield state_store
+    state_store.close()
+
+
+def test_legacy_json_is_migrated_once(tmp_path):
+    legacy = tmp_path / "seen_ids.json"
+    legacy.write_text(json.dumps({"seen_ids": [1, 2]}))
+    StateStore(str(tmp_path / "state.db"), legacy).close()
+
+    legacy.write_text(json.dumps({"seen_ids": [3]}))
+    state_store = StateStore(str(tmp_path / "state.db"), legacy)
+    assert state_store.seen_ids() == {1, 2}
+    state_store.close()
+
+
+def test_mark_seen_removed_and_reactivated(store):
+    store.mark_seen([acc(1), acc(2)], SEARCH_URL)
+    store.mark_removed([2])
+    assert store.seen_ids() == {1}
+    assert store.titles() == {1: "Résidence 1"}
+
+    store.mark_seen([acc(2, "Nouveau titre")], SEARCH_URL)
+    assert store.seen_ids() == {1, 2}
+    assert store.titles()[2] == "Nouveau titre"
+
+
+def test_state_survives_reopening(tmp_path):
+    path = str(tmp_path / "state.db")
+    state_store = StateStore(path, tmp_path / "absent.json")
+    state_store.mark_seen([acc(7)], SEARCH_URL)
+    state_store.record_deliveries([(7, "123")])
+    state_store.close()
+
+    reopened = StateStore(path, tmp_path / "absent.json")
+    assert reopened.seen_ids() == {7}
+    assert reopened.conn.execute("SELECT listing_id, telegram_id FROM deliveries").fetchall() == [(7, "123")]
+    reopened.close()
+
+
+def test_reset_forgets_listings_but_not_legacy_migration(tmp_path):
+    legacy = tmp_path / "seen_ids.json"
+    legacy.write_text(json.dumps({"seen_ids": [1]}))
+    state_store = StateStore(str(tmp_path / "state.db"), legacy)
+    state_store.replace_area_snapshot(SEARCH_URL, [acc(1)])
+    state_store.record_deliveries([(1, "123")])
+
+    state_store.reset()
+    assert state_store.seen_ids() == set()
+    assert not state_store.has_area_snapshot(SEARCH_URL)
+    assert state_store.conn.execute("SELECT COUNT(*) FROM deliveries").fetchone() == (0,)
+    state_store.close()
+
+    # L'ancien JSON n'est pas réimporté après un reset
+    assert StateStore(str(tmp_path / "state.db"), legacy).seen_ids() == set()
+
+
+
+def test_schema_migration_adds_card_columns(tmp_path):
+    path = str(tmp_path / "state.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE area_listings (search_url TEXT NOT NULL, listing_id INTEGER NOT NULL, PRIMARY KEY (search_url, listing_id))")
+    conn.execute("INSERT INTO area_listings VALUES (?, ?)", (SEARCH_URL, 5))
+    conn.commit()
+    conn.close()
+
+    state_store = StateStore(path, tmp_path / "absent.json")
+    assert state_store.area_cards(SEARCH_URL) == {5: (None, None)}
+    state_store.replace_area_snapshot(SEARCH_URL, [acc(5, price=410.0, card_hash="abc")])
+    assert state_store.area_cards(SEARCH_URL) == {5: ("abc", "410.0")}
+    state_store.close()
+
+
+def test_area_snapshot_replaces_previous_pass(store):
+    # Zone jamais parcourue : les logements vus dans cette zone, sans empreinte
+    store.mark_seen([acc(1)], SEARCH_URL)
+    assert not store.has_area_snapshot(SEARCH_URL)
+    assert store.area_cards(SEARCH_URL) == {1: (None, None)}
+
+    store.replace_area_snapshot(SEARCH_URL, [acc(1, card_hash="h1"), acc(2, price=380.0, card_hash="h2")])
+    store.replace_area_snapshot(SEARCH_URL, [acc(2, price=360.0, card_hash="h3")])
+    assert store.area_cards(SEARCH_URL) == {2: ("h3", "360.0")}
+    assert store.area_snapshot(SEARCH_URL) == {2}
+
+    # Une zone devenue vide garde un instantané (vide)
+    store.replace_area_snapshot(SEARCH_URL, [])
+    assert store.has_area_snapshot(SEARCH_URL)
+    assert store.area_cards(SEARCH_URL) == {}
+
+
+def test_recipients_are_the_users_who_received_the_listing(store):
+    store.record_deliveries([(1, "123"), (1, 456), (2, "123")])
+    store.record_deliveries([(1, "123")])
+
+    assert store.recipients(1) == {"123", "456"}
+    assert store.recipients(3) == set()
+
+
+def test_area_positions_follow_the_snapshot(store):
+    store.replace_area_snapshot(SEARCH_URL, [Accommodation(id=1, title="Studio", price=None, latitude=42.65, longitude=2.82), acc(2)])
+    assert store.area_positions(SEARCH_URL) == {1: (42.65, 2.82), 2: (None, None)}
@@ -0,0 +1,73 @@
+from src.models import Notification
+from src.telegram_dispatcher import TelegramDispatcher
+
+
+class FakeNotifier:
+    """Remplace TelegramNotifier : échoue toujours pour les conversations de `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def deliver(self, telegram_id, notification):
+        if telegram_id in self.failing:
+            raise RuntimeError("chat introuvable")
+        self.sent.append((telegram_id, notification.message))
+
+
+def dispatcher(notifier):
+    return TelegramDispatcher(notifier, chat_rate=1000, global_rate=1000, media_group_rate=1000, max_retries=1)
+
+
+def test_join_reports_failed_listings_per_chat():
+    notifier = FakeNotifier(failing={"2"})
+    with dispatcher(notifier) as telegram:
+        telegram.send_notifications("1", [Notification(message="logement 10")], listing_id=10)
+        telegram.send_notifications("2", [Notification(message="logement 10")], listing_id=10)
+        telegram.send_notifications("2", [Notification(message="❌ Aucun logement disponible actuellement.")])
+
+        report = telegram.join()
+
+    assert notifier.sent == [("1", "logement 10")]
+    assert report.failures == 2
+    assert report.failed == {("2", 10)}
+    assert report.delivered("1", 10) and not report.delivered(2, 10)
+
+
+def test_report_is_reset_after_join():
+    notifier = FakeNotifier(failing={"1"})
+    with dispatcher(notifier) as telegram:
+        telegram.send_notifications("1", [Notification(message="logement 10")], listing_id=10)
+        assert telegram.join().failed == {("1", 10)}
+
+        notifier.failing.clear()
+        telegram.send_notifications("1", [Notification(message="logement 10")], listing_id=10)
+        report = telegram.join()
+
+    assert report.failures == 0 and report.failed == set()
+    assert notifier.sent == [("1", "logement 10")]
+
+
+def test_failed_listing_stays_unseen_and_is_retried_only_for_missing_users(tmp_path):
+    from main import settle_deliveries
+    from src.models import Accommodation
+    from src.storage import StateStore
+
+    search_url = "https://trouverunlogement.lescrous.fr/tools/32/search"
+    state_store = StateStore(str(tmp_path / "state.db"), tmp_path / "absent.json")
+    accommodations = [Accommodation(id=10, title="Studio", price=None), Accommodation(id=11, title="T1", price=None)]
+    seen_ids, id_to_name = set(), {}
+
+    with dispatcher(FakeNotifier(failing={"2"})) as telegram:
+        deliveries = []
+        for acc in accommodations:
+            for telegram_id in ("1", "2") if acc.id == 10 else ("1",):
+                telegram.send_notifications(telegram_id, [Notification(message=acc.title)], listing_id=acc.id)
+                deliveries.append((acc.id, telegram_id))
+        sent = settle_deliveries(telegram, state_store, deliveries, accommodations, search_url, seen_ids, id_to_name)
+
+    assert [acc.id for acc in sent] == [11]
+    assert seen_ids == {11} and state_store.seen_ids() == {11}
+    # Au prochain cycle, le logement 10 ne repart que vers la conversation 2
+    assert state_store.recipients(10) == {"1"}
+    state_store.close()
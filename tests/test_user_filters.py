@@ -0,0 +1,77 @@
+import pytest
+
+from src.models import Accommodation, UserConf, UserFilters
+from src.user_filters import FilterIndex, ListingFeatures
+
+SEARCH_URL = "https://trouverunlogement.lescrous.fr/tools/32/search"
+
+
+def user(name, ignored_ids=(), **filters):
+    return UserConf(conf_title=name, telegram_id=name, search_url=SEARCH_URL, ignored_ids=list(ignored_ids), filters=UserFilters(**filters))
+
+
+def listing(price=400.0, overview="1 rue X 66000 Perpignan\nIndividuel\nStudio 18 m²", listing_id=1):
+    return Accommodation(id=listing_id, title="Résidence", price=price, overview_details=overview)
+
+
+def names(users):
+    return [u.conf_title for u in users]
+
+
+@pytest.mark.parametrize("price, expected", [(449.99, ["450", "none"]), (450.0, ["450", "none"]), (450.01, ["none"])])
+def test_max_price_is_inclusive(price, expected):
+    index = FilterIndex([user("450", max_price=450), user("none")])
+    assert names(index.match(listing(price=price))) == expected
+
+
+@pytest.mark.parametrize("overview, expected", [("Studio 17,5 m²", ["none"]), ("Studio 18 m²", ["18", "none"]), ("Studio 18.5 m2", ["18", "none"])])
+def test_min_surface_is_inclusive(overview, expected):
+    index = FilterIndex([user("18", min_surface=18), user("none")])
+    assert names(index.match(listing(overview=overview))) == expected
+
+
+def test_unknown_price_or_surface_keeps_the_listing():
+    index = FilterIndex([user("strict", max_price=300, min_surface=30)])
+    assert names(index.match(listing(price="Prix non communiqué", overview="Studio"))) == ["strict"]
+
+
+def test_types_and_keywords_are_case_insensitive():
+    index = FilterIndex([user("t1", types=["T1"]), user("studio", types=["studio"]), user("perpi", keywords=["PERPIGNAN"]), user("nice", keywords=["Nice"])])
+    assert names(index.match(listing())) == ["studio", "perpi"]
+    assert names(index.match(listing(overview="Résidence à Nice\nT1 20 m²"))) == ["t1", "nice"]
+
+
+def test_ignored_ids_from_conf_and_filters():
+    from_filters = UserConf(conf_title="filters", telegram_id="filters", search_url=SEARCH_URL, filters=UserFilters(ignored_ids=[1]))
+    index = FilterIndex([user("conf", ignored_ids=[1]), from_filters, user("other")])
+    assert names(index.match(listing(listing_id=1))) == ["other"]
+    assert names(index.match(listing(listing_id=2))) == ["conf", "filters", "other"]
+
+
+def test_multi_word_types_match_as_phrases():
+    index = FilterIndex([user("t1 bis", types=["T1 bis"]), user("t1", types=["t1"]), user("double", types=["Studio  double"])])
+    assert names(index.match(listing(overview="Résidence\nT1 bis 22 m²"))) == ["t1 bis", "t1"]
+    assert names(index.match(listing(overview="Résidence\nT1 22 m² bis"))) == ["t1"]
+    assert names(index.match(listing(overview="Studio double, 20 m²"))) == ["double"]
+    assert ListingFeatures.from_accommodation(listing(overview="T1-bis")).has_phrase(("t1", "bis"))
+
+
+COMBINED_USERS = [
+    user("a", max_price=350),
+    user("b", max_price=500, min_surface=20),
+    user("c", types=["T2"], keywords=["Perpignan"]),
+    user("d", ignored_ids=[3], min_surface=15),
+    user("e"),
+]
+
+
+@pytest.mark.parametrize("listing_id, price, overview, expected", [
+    (1, 320.0, "Perpignan\nT2 25 m²", ["a", "b", "c", "d", "e"]),
+    (2, 350.0, "Studio 15 m²", ["a", "d", "e"]),
+    (3, 510.0, "T2 40 m² Perpignan", ["c", "e"]),
+    (4, None, "Chambre 9 m²", ["a", "e"]),
+    (5, 420.0, "T1", ["b", "d", "e"]),
+])
+def test_combined_rules(listing_id, price, overview, expected):
+    index = FilterIndex(COMBINED_USERS)
+    assert names(index.match(listing(price=price, overview=overview, listing_id=listing_id))) == expected